@@ -10,13 +10,22 @@ This agent:
 5. Stores in IPFS  
 6. Publishes INGESTION_SNAPSHOT events
 7. Schedules periodic monitoring
+
+Sources can be fetched one at a time (fetch_all_sources) or concurrently
+with asyncio (fetch_all_sources_async), bounded by a global concurrency cap,
+a per-host cap and a per-source timeout.
 """
 
+import asyncio
 import uuid
 from datetime import datetime
-from typing import Dict, Optional
+from enum import Enum
+from typing import Any, Dict, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+import httpx
 
-from agents.agent_1_ingestion import tools
+from agents.agent_1_ingestion import parsers, tools
 from schemas.events import (
     EventEnvelope,
     EventType,
@@ -27,14 +36,29 @@ from schemas.events import (
     StorageInfo,
     VersionInfo,
 )
+from utils.blob_store import BlobStore, create_blob_store
+from utils.chunk_store import ChunkStore
 from utils.config import load_sources_config
+from utils.dom_merkle import build_fingerprint, encode_fingerprint, fingerprint_summary
 from utils.event_bus import EventBus
+from utils.http_client import create_async_client
 from utils.ipfs_client import IPFSClient
 from utils.logger import get_logger, bind_trace_id
+from utils.page_text_cache import PageTextCache
+from utils.version_state import VersionState, VersionStateStore, create_version_state_store
 
 logger = get_logger(__name__)
 
 
+class FetchStatus(str, Enum):
+    """Outcome of a fetch that published no snapshot"""
+    UNCHANGED = "unchanged"  # 304 Not Modified, or a feed with no new items
+    FAILED = "failed"
+
+
+FetchOutcome = Union[EventEnvelope, FetchStatus]
+
+
 class IngestionAgent:
     """
     Agent 1: Discovery & Ingestion
@@ -47,29 +71,145 @@ class IngestionAgent:
         event_bus: EventBus,
         ipfs_client: IPFSClient,
         sources_config_path: str = "config/sources.yaml",
+        state_store: Optional[VersionStateStore] = None,
+        blob_store: Optional[BlobStore] = None,
     ):
         self.event_bus = event_bus
         self.ipfs_client = ipfs_client
         
+        # Out-of-band data referenced from snapshots (full DOM fingerprints);
+        # the event bus's claim-check store unless one is given
+        self.blob_store = (
+            blob_store or getattr(event_bus, 'blob_store', None) or create_blob_store(ipfs_client)
+        )
+        
         # Load source configurations
         config = load_sources_config(sources_config_path)
         self.sources = config['sources']
         self.settings = config['settings']
         
-        # Track last hashes for version detection
-        self.last_hashes: Dict[str, str] = {}
+        # Last published hash + HTTP validators per source, persisted so a
+        # restart does not re-publish every unchanged source as a new version
+        self.state_store = state_store or create_version_state_store(self.settings)
+        self._states: Dict[str, Optional[VersionState]] = {}
+        
+        # Extracted PDF page text by content hash (re-issued PDFs only
+        # re-extract amended pages)
+        self.page_cache = PageTextCache(self.settings.get('pdf_page_cache_path'))
+        
+        # Content-defined chunking: only chunks not stored before are uploaded
+        self.chunk_store: Optional[ChunkStore] = None
+        if self.settings.get('chunked_storage', False):
+            self.chunk_store = ChunkStore(
+                ipfs_client,
+                index_path=self.settings.get('chunk_index_path'),
+                min_chunked_size=self.settings.get('chunked_storage_min_bytes', 65536),
+            )
         
         logger.info("agent_initialized", agent="agent-1-ingestion", sources=len(self.sources))
     
-    def fetch_source(self, source_config: Dict) -> Optional[EventEnvelope]:
+    def _version_state(self, source_id: str) -> Optional[VersionState]:
+        """Last known version of a source (loaded from the store on first use)"""
+        if source_id not in self._states:
+            self._states[source_id] = self.state_store.get(source_id)
+        return self._states[source_id]
+    
+    def _validators(self, source_id: str) -> Dict[str, str]:
+        """ETag / Last-Modified of the last published version, for conditional GETs"""
+        state = self._version_state(source_id)
+        return state.validators() if state else {}
+    
+    def _previous_hash(self, source_id: str) -> Optional[str]:
+        """Hash of the last published version of a source"""
+        state = self._version_state(source_id)
+        return state.last_hash if state else None
+    
+    def _previous_region_hash(self, source_id: str) -> Optional[str]:
+        """Listing-region hash of the last published version of an HTML source"""
+        state = self._version_state(source_id)
+        return state.region_hash if state else None
+    
+    def _record_version(
+        self,
+        source_id: str,
+        url: str,
+        content_hash: str,
+        response_headers: Optional[Dict[str, str]] = None,
+        seen_items: Optional[Dict[str, str]] = None,
+        region_hash: Optional[str] = None,
+    ) -> None:
+        """Persist hash and validators once a snapshot has been published"""
+        validators = tools.response_validators(response_headers or {})
+        state = VersionState(
+            source_id=source_id,
+            url=url,
+            last_hash=content_hash,
+            region_hash=region_hash,
+            etag=validators.get('etag'),
+            last_modified=validators.get('last_modified'),
+            fetched_at=datetime.utcnow(),
+            seen_items=seen_items or {},
+        )
+        self.state_store.put(state)
+        self._states[source_id] = state
+    
+    def _store_content(self, content, stream=None) -> Tuple[StorageInfo, Dict[str, Any]]:
+        """
+        Store a snapshot body in IPFS.
+        
+        With settings.chunked_storage the body is split into content-defined
+        chunks and only new chunks are uploaded; ipfs_cid is then the CID of
+        the chunk manifest. Otherwise the body is uploaded whole (from
+        `stream` when given).
+        
+        Returns:
+            (StorageInfo, storage stats for the snapshot metadata)
+        """
+        if self.chunk_store is None:
+            if stream is not None:
+                ipfs_cid = self.ipfs_client.add_stream(stream)
+            else:
+                ipfs_cid = self.ipfs_client.add(content)
+            storage = StorageInfo(
+                ipfs_cid=ipfs_cid,
+                ipfs_gateway_url=self.ipfs_client.get_gateway_url(ipfs_cid),
+            )
+            return storage, {}
+        
+        manifest = self.chunk_store.store(content)
+        manifest_cid = self.chunk_store.put_manifest(manifest)
+        storage = StorageInfo(
+            ipfs_cid=manifest_cid,
+            ipfs_gateway_url=self.ipfs_client.get_gateway_url(manifest_cid),
+            chunked=True,
+            chunk_hashes=manifest.chunk_hashes,
+        )
+        stats = {
+            'chunks': len(manifest.chunks),
+            'new_chunks': manifest.new_chunks,
+            'new_bytes': manifest.new_bytes,
+        }
+        logger.info("snapshot_stored", cid=manifest_cid, **stats)
+        return storage, stats
+    
+    def fetch_source(
+        self,
+        source_config: Dict,
+        prefetched: Optional[Any] = None,
+    ) -> FetchOutcome:
         """
         Fetch content from a single regulatory source.
         
         Args:
             source_config: Source configuration dict
+            prefetched: Content already downloaded by the async fetch path
+                (FetchResult for html, PDFDownload for pdf, FeedResult for rss).
+                When given, the network fetch is skipped.
             
         Returns:
-            EventEnvelope with INGESTION_SNAPSHOT, or None if failed
+            EventEnvelope with INGESTION_SNAPSHOT, FetchStatus.UNCHANGED when
+            the source answered 304 Not Modified (or a feed had no new items),
+            FetchStatus.FAILED on error
         """
         source_id = source_config['id']
         source_url = source_config['url']
@@ -92,52 +232,77 @@ class IngestionAgent:
             
             # Fetch based on type
             if source_type == 'html':
-                result = self._fetch_html_source(source_config, validated_url)
+                result = self._fetch_html_source(source_config, validated_url, prefetched)
             elif source_type == 'pdf':
-                result = self._fetch_pdf_source(source_config, validated_url)
+                result = self._fetch_pdf_source(source_config, validated_url, prefetched)
             elif source_type == 'rss':
-                result = self._fetch_rss_source(source_config, validated_url)
+                result = self._fetch_rss_source(source_config, validated_url, prefetched)
             else:
                 raise ValueError(f"Unknown source type: {source_type}")
             
-            if result:
+            if isinstance(result, EventEnvelope):
                 logger.info("fetch_complete", source_id=source_id, snapshot_id=result.event_id)
             
             return result
         
         except Exception as e:
             logger.error("fetch_failed", source_id=source_id, error=str(e), exc_info=True)
-            return None
+            return FetchStatus.FAILED
     
-    def _fetch_html_source(self, source_config: Dict, url: str) -> EventEnvelope:
+    def _fetch_html_source(
+        self,
+        source_config: Dict,
+        url: str,
+        fetch_result: Optional[tools.FetchResult] = None,
+    ) -> FetchOutcome:
         """Fetch HTML source and create snapshot"""
         source_id = source_config['id']
         
         # Fetch HTML
-        fetch_result = tools.fetch_html(url)
-        
-        # Extract text
+        if fetch_result is None:
+            fetch_result = tools.fetch_html(url, validators=self._validators(source_id))
+        
+        # 304: nothing to parse, hash, store or publish
+        if fetch_result.not_modified:
+            logger.info("source_not_modified", source_id=source_id)
+            return FetchStatus.UNCHANGED
+        
+        # Parse once: metadata, DOM fingerprint, links, and the listing
+        # region picked out by the source's parser. The snapshot text comes
+        # from the region (whole body when no selector matched), so the
+        # page-wide visible-text pass is skipped
         html_text = fetch_result.content.decode(fetch_result.encoding)
-        extracted_text = tools.normalize_text(html_text)
-        
-        # Extract metadata
-        metadata = tools.extract_metadata(html_text, fetch_result.content_type)
-        metadata['dom_tree'] = tools.capture_dom_tree(html_text)
-        metadata['external_links'] = len(tools.list_links(html_text, url))
+        root = tools.parse_html(fetch_result.content, fetch_result.encoding)
+        analysis = tools.analyze_html(root, url, include_text=False)
+        region = parsers.get_parser(source_config.get('parser')).parse(root, url)
+        extracted_text = region.text
+        
+        metadata = analysis['metadata']
+        metadata['dom_tree'] = analysis['dom_tree']
+        # Full tree out of band; the event carries its root hash and reference
+        fingerprint = build_fingerprint(root)
+        metadata['dom_merkle'] = fingerprint_summary(
+            fingerprint, self.blob_store.put(encode_fingerprint(fingerprint)), self.blob_store.kind
+        )
+        metadata['external_links'] = len(analysis['links'])
+        metadata['parser'] = region.parser
+        metadata['region_matched'] = region.matched
+        metadata['items'] = region.items
         
-        # Compute hash
+        # Compute hashes: the stored page, and the listing region used for
+        # change detection (navigation / banners / footers do not count)
         content_hash = tools.compute_sha256(fetch_result.content)
+        region_hash = region.sha256
         
-        # Detect version change
+        # Detect version change on the region; previous_hash stays on the
+        # same (full page) basis as hashes.sha256
+        previous_hash = self._previous_hash(source_id)
         is_new_version = tools.detect_new_version(
-            content_hash,
-            self.last_hashes.get(source_id)
+            region_hash, self._previous_region_hash(source_id)
         )
-        self.last_hashes[source_id] = content_hash
         
         # Store in IPFS
-        ipfs_cid = self.ipfs_client.add(fetch_result.content)
-        ipfs_gateway_url = self.ipfs_client.get_gateway_url(ipfs_cid)
+        storage, storage_stats = self._store_content(fetch_result.content)
         
         # Create snapshot
         snapshot_id = f"snap-{source_id}-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}"
@@ -159,17 +324,16 @@ class IngestionAgent:
             ),
             hashes=HashData(
                 sha256=content_hash,
+                region_sha256=region_hash,
             ),
-            storage=StorageInfo(
-                ipfs_cid=ipfs_cid,
-                ipfs_gateway_url=ipfs_gateway_url,
-            ),
-            metadata=metadata,
+            storage=storage,
+            metadata={**metadata, **storage_stats},
             version_info=VersionInfo(
                 is_new_version=is_new_version,
-                previous_hash=self.last_hashes.get(source_id),
+                previous_hash=previous_hash,
                 change_detected=is_new_version,
             ),
+            tls_evidence=fetch_result.tls_evidence,
         )
         
         # Create event
@@ -183,33 +347,73 @@ class IngestionAgent:
         
         # Publish to event bus
         self.event_bus.publish(event)
+        self._record_version(
+            source_id, url, content_hash, fetch_result.headers, region_hash=region_hash
+        )
         
         return event
     
-    def _fetch_pdf_source(self, source_config: Dict, url: str) -> EventEnvelope:
+    def _fetch_pdf_source(
+        self,
+        source_config: Dict,
+        url: str,
+        download: Optional[tools.PDFDownload] = None,
+    ) -> FetchOutcome:
         """Fetch PDF source and create snapshot"""
         source_id = source_config['id']
         
-        # Fetch PDF
-        pdf_bytes = tools.fetch_pdf(url)
+        # Stream PDF to a spooled temp file (hashed while downloading)
+        if download is None:
+            download = tools.download_pdf(
+                url,
+                validators=self._validators(source_id),
+                **self._pdf_download_limits(),
+            )
+        
+        # 304: nothing to extract, hash, store or publish
+        if download is None:
+            logger.info("source_not_modified", source_id=source_id)
+            return FetchStatus.UNCHANGED
+        
+        with download:
+            return self._publish_pdf_snapshot(source_config, url, download)
+    
+    def _pdf_download_limits(self) -> Dict[str, int]:
+        """Size limits for streamed PDF downloads, from settings"""
+        return {
+            'max_bytes': int(self.settings.get('max_content_size_mb', 50) * 1024 * 1024),
+            'spool_bytes': int(self.settings.get('pdf_spool_memory_mb', 8) * 1024 * 1024),
+        }
+    
+    def _publish_pdf_snapshot(
+        self,
+        source_config: Dict,
+        url: str,
+        download: tools.PDFDownload,
+    ) -> EventEnvelope:
+        """Extract, store and publish a downloaded PDF"""
+        source_id = source_config['id']
         
-        # Extract text
-        extracted_text = tools.extract_text_pdf(pdf_bytes)
+        # Extract text straight from the spooled buffer / mmap
+        extracted_text = tools.extract_text_pdf(
+            download,
+            workers=self.settings.get('pdf_extract_workers', 1),
+            page_cache=self.page_cache,
+        )
         normalized_text = tools.normalize_text(extracted_text)
         
-        # Compute hash
-        content_hash = tools.compute_sha256(pdf_bytes)
+        # Hash was computed incrementally during download
+        content_hash = download.sha256
         
         # Detect version change
-        is_new_version = tools.detect_new_version(
-            content_hash,
-            self.last_hashes.get(source_id)
-        )
-        self.last_hashes[source_id] = content_hash
+        previous_hash = self._previous_hash(source_id)
+        is_new_version = tools.detect_new_version(content_hash, previous_hash)
         
-        # Store in IPFS
-        ipfs_cid = self.ipfs_client.add(pdf_bytes)
-        ipfs_gateway_url = self.ipfs_client.get_gateway_url(ipfs_cid)
+        # Store in IPFS (streamed / chunked from the same buffer)
+        if self.chunk_store is None:
+            storage, storage_stats = self._store_content(None, stream=download.stream())
+        else:
+            storage, storage_stats = self._store_content(download.buffer())
         
         # Create snapshot
         snapshot_id = f"snap-{source_id}-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}"
@@ -225,21 +429,19 @@ class IngestionAgent:
             content=ContentData(
                 extracted_text=normalized_text,
                 content_type='application/pdf',
-                size_bytes=len(pdf_bytes),
+                size_bytes=download.size,
             ),
             hashes=HashData(
                 sha256=content_hash,
             ),
-            storage=StorageInfo(
-                ipfs_cid=ipfs_cid,
-                ipfs_gateway_url=ipfs_gateway_url,
-            ),
-            metadata={'format': 'PDF'},
+            storage=storage,
+            metadata={'format': 'PDF', **storage_stats},
             version_info=VersionInfo(
                 is_new_version=is_new_version,
-                previous_hash=self.last_hashes.get(source_id),
+                previous_hash=previous_hash,
                 change_detected=is_new_version,
             ),
+            tls_evidence=download.tls_evidence,
         )
         
         # Create and publish event
@@ -252,63 +454,125 @@ class IngestionAgent:
         )
         
         self.event_bus.publish(event)
+        self._record_version(source_id, url, content_hash, download.headers)
         return event
     
-    def _fetch_rss_source(self, source_config: Dict, url: str) -> EventEnvelope:
-        """Fetch RSS feed and create snapshot"""
+    def _fetch_rss_source(
+        self,
+        source_config: Dict,
+        url: str,
+        feed: Optional[tools.FeedResult] = None,
+    ) -> FetchOutcome:
+        """
+        Fetch RSS feed and publish one snapshot per new or updated item.
+        
+        Items already published (same guid, same text) are skipped, so a poll
+        that adds one circular sends one item downstream, not the whole feed.
+        Returns the last published event, or FetchStatus.UNCHANGED if no item
+        changed.
+        """
         source_id = source_config['id']
         
-        # Fetch RSS
-        items = tools.fetch_rss(url)
+        # Fetch RSS (conditional GET with the feed's stored validators)
+        if feed is None:
+            feed = tools.fetch_rss(url, validators=self._validators(source_id))
         
-        # Convert to text
-        rss_text = '\n\n'.join([
-            f"Title: {item['title']}\nLink: {item['link']}\nPublished: {item['published']}\nSummary: {item['summary']}"
-            for item in items
-        ])
+        if feed.not_modified:
+            logger.info("source_not_modified", source_id=source_id)
+            return FetchStatus.UNCHANGED
         
-        # Compute hash
-        content_hash = tools.compute_sha256(rss_text)
+        state = self._version_state(source_id)
+        seen_items = state.seen_items if state else {}
+        changed = tools.changed_feed_items(feed.items, seen_items)
         
-        # Detect version change
-        is_new_version = tools.detect_new_version(
-            content_hash,
-            self.last_hashes.get(source_id)
+        logger.info(
+            "rss_items_changed",
+            source_id=source_id,
+            items=len(feed.items),
+            changed=len(changed),
         )
-        self.last_hashes[source_id] = content_hash
+        
+        # Items in the current feed (older ones have rotated out)
+        current_items = {
+            item['guid']: tools.compute_sha256(tools.feed_item_text(item))
+            for item in feed.items
+        }
+        # What downstream has seen so far; updated as each item goes out
+        published = {guid: digest for guid, digest in seen_items.items() if guid in current_items}
+        
+        event = None
+        try:
+            for item, status in changed:
+                event = self._publish_rss_item(source_config, url, item, status, seen_items)
+                published[item['guid']] = current_items[item['guid']]
+        except Exception:
+            # Keep the items that did go out. The feed's validators are not
+            # stored, so the next poll refetches it and retries the rest
+            self._record_version(source_id, url, tools.feed_hash(published), None, published)
+            raise
+        
+        self._record_version(source_id, url, tools.feed_hash(current_items), feed.headers, current_items)
+        
+        return event or FetchStatus.UNCHANGED
+    
+    def _publish_rss_item(
+        self,
+        source_config: Dict,
+        feed_url: str,
+        item: Dict,
+        status: str,
+        seen_items: Dict[str, str],
+    ) -> EventEnvelope:
+        """Store and publish a single feed item as its own snapshot"""
+        source_id = source_config['id']
+        
+        item_text = tools.feed_item_text(item)
+        content_hash = tools.compute_sha256(item_text)
+        previous_hash = seen_items.get(item['guid'])
+        
+        # Item snapshots point at the item itself when it has a usable link
+        try:
+            item_url = tools.validate_url(item['link'])
+        except ValueError:
+            item_url = feed_url
         
         # Store in IPFS
-        ipfs_cid = self.ipfs_client.add(rss_text)
-        ipfs_gateway_url = self.ipfs_client.get_gateway_url(ipfs_cid)
+        storage, storage_stats = self._store_content(item_text)
         
         # Create snapshot
-        snapshot_id = f"snap-{source_id}-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}"
+        snapshot_id = (
+            f"snap-{source_id}-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}-{content_hash[:8]}"
+        )
         
         payload = IngestionSnapshotPayload(
             snapshot_id=snapshot_id,
             source=SourceInfo(
                 name=source_config['name'],
-                url=url,
+                url=item_url,
                 type='rss',
             ),
             fetched_at=datetime.utcnow(),
             content=ContentData(
-                extracted_text=rss_text,
+                extracted_text=item_text,
                 content_type='application/rss+xml',
-                size_bytes=len(rss_text),
+                size_bytes=len(item_text),
             ),
             hashes=HashData(
                 sha256=content_hash,
             ),
-            storage=StorageInfo(
-                ipfs_cid=ipfs_cid,
-                ipfs_gateway_url=ipfs_gateway_url,
-            ),
-            metadata={'items_count': len(items)},
+            storage=storage,
+            metadata={
+                'feed_url': feed_url,
+                'guid': item['guid'],
+                'item_status': status,
+                'title': item['title'],
+                'published': item['published'],
+                **storage_stats,
+            },
             version_info=VersionInfo(
-                is_new_version=is_new_version,
-                previous_hash=self.last_hashes.get(source_id),
-                change_detected=is_new_version,
+                is_new_version=True,
+                previous_hash=previous_hash,
+                change_detected=status == 'updated',
             ),
         )
         
@@ -324,27 +588,153 @@ class IngestionAgent:
         self.event_bus.publish(event)
         return event
     
-    def fetch_all_sources(self) -> int:
+    def fetch_all_sources(self) -> Dict[str, int]:
         """
         Fetch all enabled sources.
         
         Returns:
-            Number of successful fetches
+            Counts of sources that published, were unchanged, and failed
         """
         logger.info("fetching_all_sources", total_sources=len(self.sources))
         
-        successful = 0
+        results = []
         for source in self.sources:
             if not source.get('enabled', True):
                 logger.debug("source_disabled", source_id=source['id'])
                 continue
             
-            result = self.fetch_source(source)
-            if result:
-                successful += 1
+            results.append(self.fetch_source(source))
+        
+        return self._tally(results)
+    
+    def _tally(self, results) -> Dict[str, int]:
+        """Count fetch outcomes and log the sweep summary"""
+        counts = {
+            'published': sum(1 for r in results if isinstance(r, EventEnvelope)),
+            'unchanged': sum(1 for r in results if r is FetchStatus.UNCHANGED),
+            'failed': sum(1 for r in results if r is FetchStatus.FAILED),
+        }
+        logger.info("fetch_complete", **counts, total=len(self.sources))
+        return counts
+    
+    async def fetch_all_sources_async(self) -> Dict[str, int]:
+        """
+        Fetch all enabled sources concurrently.
+        
+        Network I/O for every source runs at once on a shared httpx client,
+        limited by settings.max_concurrent_fetches overall and
+        settings.max_concurrent_per_host per domain. Each source gets its own
+        timeout (source 'timeout_seconds', else settings.request_timeout_seconds),
+        so one slow regulator cannot hold up the sweep. A task waits for its
+        host's slot before taking a global one, so a busy host never holds
+        global slots idle. Both slots are released once the download is
+        done; parsing, IPFS upload and publishing then reuse the blocking
+        pipeline in worker threads.
+        
+        Returns:
+            Counts of sources that published, were unchanged, and failed
+        """
+        enabled = [s for s in self.sources if s.get('enabled', True)]
+        logger.info("fetching_all_sources", total_sources=len(self.sources), mode="async")
+        
+        global_limit = asyncio.Semaphore(self.settings.get('max_concurrent_fetches', 10))
+        host_limits: Dict[str, asyncio.Semaphore] = {}
+        per_host = self.settings.get('max_concurrent_per_host', 2)
+        
+        async with create_async_client(
+            max_connections=self.settings.get('max_concurrent_fetches', 10),
+        ) as client:
+            async def _bounded(source: Dict) -> FetchOutcome:
+                host = urlparse(source['url']).netloc
+                host_limit = host_limits.setdefault(host, asyncio.Semaphore(per_host))
+                async with host_limit, global_limit:
+                    prefetched = await self._prefetch_async(source, client)
+                return await self._process_prefetched(source, prefetched)
+            
+            results = await asyncio.gather(*(_bounded(s) for s in enabled))
+        
+        return self._tally(results)
+    
+    async def fetch_source_async(
+        self,
+        source_config: Dict,
+        client: Optional[httpx.AsyncClient] = None,
+    ) -> FetchOutcome:
+        """
+        Fetch a single source with async I/O, then run the snapshot pipeline.
+        
+        Args:
+            source_config: Source configuration dict
+            client: Optional shared httpx.AsyncClient
+            
+        Returns:
+            EventEnvelope with INGESTION_SNAPSHOT, FetchStatus.UNCHANGED or
+            FetchStatus.FAILED (see fetch_source)
+        """
+        prefetched = await self._prefetch_async(source_config, client)
+        return await self._process_prefetched(source_config, prefetched)
+    
+    async def _prefetch_async(
+        self,
+        source_config: Dict,
+        client: Optional[httpx.AsyncClient] = None,
+    ) -> Any:
+        """
+        Network stage of fetch_source_async.
+        
+        Returns:
+            FetchResult / PDFDownload / FeedResult, or a FetchStatus when
+            there is nothing to process
+        """
+        source_id = source_config['id']
+        source_type = source_config['type']
+        timeout = source_config.get(
+            'timeout_seconds',
+            self.settings.get('request_timeout_seconds', 30),
+        )
+        
+        try:
+            url = tools.validate_url(source_config['url'])
+            
+            if source_type == 'html':
+                fetch = tools.async_fetch_html(
+                    url, timeout=timeout, client=client, validators=self._validators(source_id)
+                )
+            elif source_type == 'pdf':
+                fetch = tools.async_download_pdf(
+                    url,
+                    timeout=timeout,
+                    client=client,
+                    validators=self._validators(source_id),
+                    **self._pdf_download_limits(),
+                )
+            elif source_type == 'rss':
+                fetch = tools.async_fetch_rss(
+                    url, timeout=timeout, client=client, validators=self._validators(source_id)
+                )
+            else:
+                raise ValueError(f"Unknown source type: {source_type}")
+            
+            prefetched = await asyncio.wait_for(fetch, timeout=timeout)
+        
+        except asyncio.TimeoutError:
+            logger.error("fetch_timeout", source_id=source_id, timeout=timeout)
+            return FetchStatus.FAILED
+        except Exception as e:
+            logger.error("fetch_failed", source_id=source_id, error=str(e))
+            return FetchStatus.FAILED
         
-        logger.info("fetch_complete", successful=successful, total=len(self.sources))
-        return successful
+        if prefetched is None or getattr(prefetched, 'not_modified', False):
+            logger.info("source_not_modified", source_id=source_id)
+            return FetchStatus.UNCHANGED
+        
+        return prefetched
+    
+    async def _process_prefetched(self, source_config: Dict, prefetched: Any) -> FetchOutcome:
+        """Parse, store and publish downloaded content in a worker thread"""
+        if isinstance(prefetched, FetchStatus):
+            return prefetched
+        return await asyncio.to_thread(self.fetch_source, source_config, prefetched)
 
 
 def main():
@@ -352,23 +742,30 @@ def main():
     from utils.config import config
     
     # Initialize clients
-    event_bus = EventBus(
-        redis_host=config.redis.host,
-        redis_port=config.redis.port,
-        stream_name=config.redis.stream_name,
-    )
-    
     ipfs_client = IPFSClient(
         api_host=config.ipfs.api_host,
         api_port=config.ipfs.api_port,
         gateway_url=config.ipfs.gateway_url,
     )
     
+    blob_store = create_blob_store(ipfs_client)
+    
+    event_bus = EventBus(
+        redis_host=config.redis.host,
+        redis_port=config.redis.port,
+        stream_name=config.redis.stream_name,
+        blob_store=blob_store,
+        claim_check_threshold=config.redis.claim_check_threshold,
+    )
+    
     # Create agent
     agent = IngestionAgent(event_bus, ipfs_client)
     
     # Fetch all sources
-    agent.fetch_all_sources()
+    if agent.settings.get('concurrent_fetch', False):
+        asyncio.run(agent.fetch_all_sources_async())
+    else:
+        agent.fetch_all_sources()
 
 
 if __name__ == "__main__":
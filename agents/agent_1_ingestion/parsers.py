@@ -0,0 +1,197 @@
+"""
+Agent 1: Source-specific HTML parsers.
+
+Each source in config/sources.yaml names a `parser`. A parser knows where
+the circular listing lives on that regulator's page and pulls out just that
+region, plus one structured item per circular. Change detection and hashing
+run on the region, so navigation menus, footers and rotating banners no
+longer produce false "new version" events.
+
+Selectors are compiled XPath (lxml, evaluated in C) and run on the tree
+already parsed by tools.parse_html - the page is not parsed again.
+"""
+
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+
+from lxml import etree
+from pydantic import BaseModel
+
+from agents.agent_1_ingestion.tools import compute_sha256, normalize_text
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _has_class(name: str) -> str:
+    """XPath predicate matching one class in a space-separated class list"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# Page chrome that is never part of a listing
+_BOILERPLATE = (
+    "ancestor::script or ancestor::style or ancestor::noscript or "
+    "ancestor::nav or ancestor::header or ancestor::footer or ancestor::aside"
+)
+
+_XPATH_TEXT = etree.XPath(f".//text()[not({_BOILERPLATE})]", smart_strings=False)
+
+
+class ParsedRegion(BaseModel):
+    """Listing region extracted from a page"""
+    parser: str
+    matched: bool  # False when no region selector matched (whole body used)
+    text: str
+    items: List[Dict[str, str]]
+    sha256: str
+
+
+class SourceParser:
+    """
+    Region + item extractor for one page layout.
+
+    Args:
+        name: Registry name (the `parser` value in sources.yaml)
+        region_xpaths: Candidate selectors for the listing region, tried in
+            order; the first one that matches wins
+        item_xpath: Selector for one item, relative to the region
+        field_xpaths: Item field name -> selector relative to the item
+            (string results; the 'link' field is resolved against the page URL)
+        fallback_xpath: Region used when no region selector matches
+    """
+
+    def __init__(
+        self,
+        name: str,
+        region_xpaths: List[str],
+        item_xpath: str,
+        field_xpaths: Dict[str, str],
+        fallback_xpath: str = "//body",
+    ):
+        self.name = name
+        self._regions = [etree.XPath(xpath) for xpath in region_xpaths]
+        self._fallback = etree.XPath(fallback_xpath)
+        self._item = etree.XPath(item_xpath)
+        self._fields = {
+            field: etree.XPath(f"string({xpath})", smart_strings=False)
+            for field, xpath in field_xpaths.items()
+        }
+
+    def parse(self, root, base_url: str) -> ParsedRegion:
+        """
+        Extract the listing region and its items from a parsed page.
+
+        Args:
+            root: Element tree from tools.parse_html
+            base_url: Page URL, for resolving item links
+
+        Returns:
+            ParsedRegion; sha256 covers the items when any were found,
+            otherwise the region text
+        """
+        regions, matched = [], False
+        for selector in self._regions:
+            regions = selector(root)
+            if regions:
+                matched = True
+                break
+        if not regions:
+            regions = self._fallback(root) or [root]
+
+        items = []
+        for region in regions:
+            for node in self._item(region):
+                item = {field: ' '.join(xpath(node).split()) for field, xpath in self._fields.items()}
+                if item.get('link'):
+                    item['link'] = urljoin(base_url, item['link'])
+                if any(item.values()):
+                    items.append(item)
+
+        text = normalize_text(' '.join(
+            chunk for region in regions for chunk in _XPATH_TEXT(region)
+        ))
+
+        if items:
+            fingerprint = '\n'.join('\t'.join(item.values()) for item in items)
+        else:
+            fingerprint = text
+
+        logger.debug("region_parsed", parser=self.name, matched=matched, items=len(items))
+
+        return ParsedRegion(
+            parser=self.name,
+            matched=matched,
+            text=text,
+            items=items,
+            sha256=compute_sha256(fingerprint),
+        )
+
+
+# =============================================================================
+# REGISTRY
+# =============================================================================
+
+PARSERS: Dict[str, SourceParser] = {}
+
+
+def register_parser(parser: SourceParser) -> SourceParser:
+    """Add a parser to the registry (replaces one with the same name)"""
+    PARSERS[parser.name] = parser
+    return parser
+
+
+def get_parser(name: Optional[str]) -> SourceParser:
+    """Look up a parser by name, falling back to generic_html"""
+    parser = PARSERS.get(name or 'generic_html')
+    if parser is None:
+        logger.warning("unknown_parser", parser=name, fallback="generic_html")
+        parser = PARSERS['generic_html']
+    return parser
+
+
+# RBI "Notifications" listing: one table row per circular, with a dated
+# header row per day
+register_parser(SourceParser(
+    name='rbi_notifications',
+    region_xpaths=[
+        f"//table[{_has_class('tablebg')}]",
+        "//div[@id='doublescroll']//table",
+    ],
+    item_xpath=".//tr[td//a[@href]]",
+    field_xpaths={
+        'title': "(td//a[@href])[1]",
+        'link': "(td//a[@href])[1]/@href",
+        'date': "td[last()]",
+    },
+))
+
+# SEBI circulars listing: date cell followed by a titled link
+register_parser(SourceParser(
+    name='sebi_circulars',
+    region_xpaths=[
+        "//table[@id='sample_1']",
+        f"//div[{_has_class('table-responsive')}]//table",
+    ],
+    item_xpath=".//tr[td//a[@href]]",
+    field_xpaths={
+        'date': "td[1]",
+        'title': "(td//a[@href])[1]",
+        'link': "(td//a[@href])[1]/@href",
+    },
+))
+
+# Anything else: the main content area, items are its links
+register_parser(SourceParser(
+    name='generic_html',
+    region_xpaths=[
+        "//main",
+        "//*[@role='main']",
+        "//article",
+        f"//*[@id='content' or @id='main-content' or {_has_class('main-content')}]",
+    ],
+    item_xpath=f".//a[@href][normalize-space()][not({_BOILERPLATE})]",
+    field_xpaths={
+        'title': ".",
+        'link': "@href",
+    },
+))
@@ -6,13 +6,19 @@ Security: All tools validate inputs, sanitize URLs, and have rate limits.
 """
 
 import hashlib
+import io
+import mmap
+import tempfile
 import time
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from urllib.parse import urljoin, urlparse
 
+import httpx
 import requests
 from bs4 import BeautifulSoup
+from lxml import etree
 try:
     import PyPDF2
     PYPDF2_AVAILABLE = True
@@ -21,7 +27,9 @@ except ImportError:
 import feedparser
 from pydantic import BaseModel, HttpUrl
 
+from utils.http_client import create_async_client, get_session, tls_evidence
 from utils.logger import get_logger
+from utils.page_text_cache import PageTextCache
 
 logger = get_logger(__name__)
 
@@ -35,6 +43,8 @@ class FetchResult(BaseModel):
     content_type: str
     encoding: str
     fetch_time: float
+    not_modified: bool = False  # True when a conditional GET returned 304
+    tls_evidence: Optional[Dict[str, Any]] = None  # see utils.http_client.tls_evidence
 
 
 # =============================================================================
@@ -45,6 +55,7 @@ def fetch_html(
     url: str,
     headers: Optional[Dict[str, str]] = None,
     timeout: int = 30,
+    validators: Optional[Dict[str, str]] = None,
 ) -> FetchResult:
     """
     Fetch HTML content from URL with TLS metadata capture.
@@ -58,9 +69,12 @@ def fetch_html(
         url: Target URL to fetch
         headers: Optional custom headers
         timeout: Request timeout in seconds
+        validators: Optional {'etag', 'last_modified'} from the previous
+            fetch; sent as If-None-Match / If-Modified-Since
         
     Returns:
-        FetchResult with content and metadata
+        FetchResult with content and metadata (not_modified=True and empty
+        content when the server answered 304)
         
     Raises:
         ValueError: If URL is invalid
@@ -71,32 +85,37 @@ def fetch_html(
     if not parsed.scheme in ['http', 'https']:
         raise ValueError(f"Invalid URL scheme: {parsed.scheme}")
     
-    # Default headers
-    if headers is None:
-        headers = {
-            'User-Agent': 'Seraphs-Bot/2.0 (Compliance Intelligence System)',
-        }
+    # User-Agent comes from the shared session
+    headers = {**(headers or {}), **conditional_headers(validators)}
     
     logger.info("fetching_html", url=url)
     start_time = time.time()
     
     try:
-        response = requests.get(url, headers=headers, timeout=timeout)
-        response.raise_for_status()
+        # Streamed so the TLS session can be read before the body is
+        with get_session().get(url, headers=headers, timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+            evidence = tls_evidence(response)
+            content = response.content
         
         fetch_time = time.time() - start_time
         
+        if response.status_code == 304:
+            logger.info("fetch_not_modified", url=url, time=fetch_time)
+            return _not_modified_result(url, response.headers, fetch_time)
+        
         result = FetchResult(
             url=url,
             status_code=response.status_code,
-            content=response.content,
+            content=content,
             headers=dict(response.headers),
             content_type=response.headers.get('Content-Type', 'text/html'),
             encoding=response.encoding or 'utf-8',
             fetch_time=fetch_time,
+            tls_evidence=evidence,
         )
         
-        logger.info("fetch_success", url=url, size=len(response.content), time=fetch_time)
+        logger.info("fetch_success", url=url, size=len(content), time=fetch_time)
         return result
     
     except requests.RequestException as e:
@@ -104,36 +123,252 @@ def fetch_html(
         raise
 
 
+def conditional_headers(validators: Optional[Dict[str, str]]) -> Dict[str, str]:
+    """
+    Build conditional request headers from stored validators.
+    
+    Returns:
+        Dict with If-None-Match and/or If-Modified-Since (empty if unknown)
+    """
+    headers = {}
+    if validators:
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+    return headers
+
+
+def response_validators(headers) -> Dict[str, str]:
+    """Extract {'etag', 'last_modified'} from response headers"""
+    lowered = {k.lower(): v for k, v in dict(headers).items()}
+    validators = {}
+    if lowered.get('etag'):
+        validators['etag'] = lowered['etag']
+    if lowered.get('last-modified'):
+        validators['last_modified'] = lowered['last-modified']
+    return validators
+
+
+def _not_modified_result(url: str, headers, fetch_time: float) -> FetchResult:
+    """Build the empty FetchResult returned for a 304 response"""
+    return FetchResult(
+        url=url,
+        status_code=304,
+        content=b'',
+        headers=dict(headers),
+        content_type=headers.get('Content-Type', 'text/html'),
+        encoding='utf-8',
+        fetch_time=fetch_time,
+        not_modified=True,
+    )
+
+
 # =============================================================================
 # TOOL 2: fetch_pdf
 # =============================================================================
 
-def fetch_pdf(url: str, timeout: int = 60) -> bytes:
+def fetch_pdf(
+    url: str,
+    timeout: int = 60,
+    validators: Optional[Dict[str, str]] = None,
+    max_bytes: int = 50 * 1024 * 1024,
+) -> Optional[bytes]:
     """
-    Download PDF file from URL.
+    Download a PDF file into memory.
+    
+    Streams through download_pdf (same signature and size checks) and
+    returns the body as bytes, for callers that need the whole document.
     
     Args:
         url: URL to PDF
         timeout: Request timeout
+        validators: Optional etag / last_modified for a conditional GET
+        max_bytes: Abort once the body (or its Content-Length) exceeds this
         
     Returns:
-        PDF content as bytes
+        PDF content as bytes, or None if the server answered 304
     """
-    logger.info("fetching_pdf", url=url)
-    
-    response = requests.get(
-        url,
-        headers={'User-Agent': 'Seraphs-Bot/2.0'},
-        timeout=timeout,
+    download = download_pdf(
+        url, timeout=timeout, validators=validators, max_bytes=max_bytes, spool_bytes=max_bytes
     )
-    response.raise_for_status()
+    if download is None:
+        return None
+    with download:
+        return download.stream().read()
+
+
+PDF_MAGIC = b'%PDF'
+
+
+class PDFDownload:
+    """
+    A PDF streamed to memory, spilling to a temp file once it gets large.
+    
+    The body is written chunk by chunk as it arrives, with the SHA-256 and
+    size computed on the way, so the document exists in full exactly once
+    (in a BytesIO up to spool_bytes, in a temp file above it). Readers get
+    zero-copy access: a memoryview of the in-memory buffer, or an mmap of
+    the temp file.
+    
+    Use as a context manager (or call close()) to release the temp file.
+    """
+    
+    def __init__(self, url: str, spool_bytes: int):
+        self.url = url
+        self.size = 0
+        self.head = b''  # first bytes of the body, for the signature check
+        self.headers: Dict[str, str] = {}
+        self.tls_evidence: Optional[Dict[str, Any]] = None
+        self.spool_bytes = spool_bytes
+        self._memory: Optional[io.BytesIO] = io.BytesIO()
+        self._disk = None
+        self._hasher = hashlib.sha256()
+        self._mmap: Optional[mmap.mmap] = None
+    
+    def write(self, chunk: bytes) -> None:
+        """Append a downloaded chunk"""
+        if self._memory is not None and self.size + len(chunk) > self.spool_bytes:
+            self._roll_over()
+        (self._disk if self._memory is None else self._memory).write(chunk)
+        self._hasher.update(chunk)
+        if len(self.head) < len(PDF_MAGIC):
+            self.head = (self.head + chunk)[:len(PDF_MAGIC)]
+        self.size += len(chunk)
+    
+    def _roll_over(self) -> None:
+        """Move the body written so far from memory to a temp file"""
+        self._disk = tempfile.TemporaryFile()
+        self._disk.write(self._memory.getbuffer())
+        self._memory.close()
+        self._memory = None
+    
+    @property
+    def sha256(self) -> str:
+        """SHA-256 of the downloaded body"""
+        return self._hasher.hexdigest()
+    
+    @property
+    def in_memory(self) -> bool:
+        """True while the body has not rolled over to disk"""
+        return self._memory is not None
+    
+    def stream(self):
+        """
+        Seekable, read-only file-like view over the body (no copy).
+        
+        Returns the in-memory BytesIO or an mmap of the temp file,
+        rewound to the start.
+        """
+        if self.in_memory:
+            buffer = self._memory
+        else:
+            if self._mmap is None:
+                self._disk.flush()
+                self._mmap = mmap.mmap(self._disk.fileno(), 0, access=mmap.ACCESS_READ)
+            buffer = self._mmap
+        buffer.seek(0)
+        return buffer
+    
+    def buffer(self) -> memoryview:
+        """Zero-copy memoryview over the body"""
+        stream = self.stream()
+        return stream.getbuffer() if isinstance(stream, io.BytesIO) else memoryview(stream)
     
-    # Verify it's actually a PDF
-    if not response.content.startswith(b'%PDF'):
+    def close(self) -> None:
+        """Release the mmap and temp file"""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._memory is not None:
+            self._memory.close()
+        if self._disk is not None:
+            self._disk.close()
+    
+    def __enter__(self) -> "PDFDownload":
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _check_pdf_size(url: str, declared: Optional[str], max_bytes: int) -> None:
+    """Reject a download whose Content-Length is already over the limit"""
+    if declared and declared.isdigit() and int(declared) > max_bytes:
+        raise ValueError(f"PDF too large: {declared} bytes > limit {max_bytes} ({url})")
+
+
+def _write_pdf_chunk(download: PDFDownload, chunk: bytes, max_bytes: int) -> None:
+    """
+    Validate and append one chunk of a streamed PDF.
+    
+    The signature is checked against everything received so far, so a
+    body whose first chunks are shorter than %PDF is not misjudged.
+    """
+    if not PDF_MAGIC.startswith((download.head + chunk)[:len(PDF_MAGIC)]):
         raise ValueError("Response is not a valid PDF")
+    if download.size + len(chunk) > max_bytes:
+        raise ValueError(f"PDF exceeds size limit of {max_bytes} bytes ({download.url})")
+    download.write(chunk)
+
+
+def _finish_pdf(download: PDFDownload) -> None:
+    """Reject a body that ended before a full PDF signature arrived"""
+    if download.head != PDF_MAGIC:
+        raise ValueError("Response is not a valid PDF")
+
+
+def download_pdf(
+    url: str,
+    timeout: int = 60,
+    validators: Optional[Dict[str, str]] = None,
+    max_bytes: int = 50 * 1024 * 1024,
+    spool_bytes: int = 8 * 1024 * 1024,
+    chunk_size: int = 256 * 1024,
+) -> Optional[PDFDownload]:
+    """
+    Stream a PDF into a spooled temp file without buffering it in memory.
+    
+    Args:
+        url: URL to PDF
+        timeout: Request timeout
+        validators: Optional etag / last_modified for a conditional GET
+        max_bytes: Abort once the body (or its Content-Length) exceeds this
+        spool_bytes: Keep bodies up to this size in memory, larger on disk
+        chunk_size: Read size while streaming
+        
+    Returns:
+        PDFDownload (caller closes it), or None if the server answered 304
+        
+    Raises:
+        ValueError: If the body is not a PDF or exceeds max_bytes
+    """
+    logger.info("downloading_pdf", url=url)
+    
+    headers = conditional_headers(validators)
     
-    logger.info("pdf_fetched", url=url, size=len(response.content))
-    return response.content
+    with get_session().get(url, headers=headers, timeout=timeout, stream=True) as response:
+        response.raise_for_status()
+        
+        if response.status_code == 304:
+            logger.info("pdf_not_modified", url=url)
+            return None
+        
+        _check_pdf_size(url, response.headers.get('Content-Length'), max_bytes)
+        
+        download = PDFDownload(url, spool_bytes)
+        download.headers = dict(response.headers)
+        download.tls_evidence = tls_evidence(response)
+        try:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                _write_pdf_chunk(download, chunk, max_bytes)
+            _finish_pdf(download)
+        except BaseException:
+            download.close()
+            raise
+    
+    logger.info("pdf_downloaded", url=url, size=download.size, spooled_to_disk=not download.in_memory)
+    return download
 
 
 # =============================================================================
@@ -156,11 +391,11 @@ def fetch_api(
     Returns:
         JSON response as dict
     """
-    headers = {'User-Agent': 'Seraphs-Bot/2.0'}
+    headers = {}
     if auth_token:
         headers['Authorization'] = f'Bearer {auth_token}'
     
-    response = requests.get(endpoint, headers=headers, params=params, timeout=30)
+    response = get_session().get(endpoint, headers=headers, params=params)
     response.raise_for_status()
     
     return response.json()
@@ -170,68 +405,532 @@ def fetch_api(
 # TOOL 4: fetch_rss
 # =============================================================================
 
-def fetch_rss(feed_url: str) -> List[Dict]:
+class FeedResult(BaseModel):
+    """Result from fetching an RSS/Atom feed"""
+    url: str
+    items: List[Dict[str, str]]
+    headers: Dict[str, str] = {}
+    not_modified: bool = False  # True when a conditional GET returned 304
+
+
+def fetch_rss(
+    feed_url: str,
+    validators: Optional[Dict[str, str]] = None,
+) -> FeedResult:
     """
     Parse RSS feed and return items.
     
     Args:
         feed_url: URL to RSS feed
+        validators: Optional etag / last_modified, passed to feedparser's
+            conditional GET support
         
     Returns:
-        List of feed items with title, link, published date
+        FeedResult with items (title, link, published, guid, ...) or
+        not_modified=True when the feed answered 304
     """
     logger.info("fetching_rss", url=feed_url)
     
-    feed = feedparser.parse(feed_url)
+    validators = validators or {}
+    feed = feedparser.parse(
+        feed_url,
+        etag=validators.get('etag'),
+        modified=validators.get('last_modified'),
+    )
+    headers = {k: str(v) for k, v in feed.get('headers', {}).items()}
+    
+    if feed.get('status') == 304:
+        logger.info("fetch_not_modified", url=feed_url)
+        return FeedResult(url=feed_url, items=[], headers=headers, not_modified=True)
+    
+    items = _feed_items(feed)
     
+    logger.info("rss_parsed", url=feed_url, items=len(items))
+    return FeedResult(url=feed_url, items=items, headers=headers)
+
+
+def _feed_items(feed) -> List[Dict]:
+    """Convert parsed feedparser entries to plain item dicts"""
     items = []
     for entry in feed.entries:
-        items.append({
+        item = {
             'title': entry.get('title', ''),
             'link': entry.get('link', ''),
             'published': entry.get('published', ''),
+            'updated': entry.get('updated', ''),
             'summary': entry.get('summary', ''),
-        })
+        }
+        # Feeds without <guid>/<id> are keyed by link, then by title
+        item['guid'] = entry.get('id') or item['link'] or item['title']
+        items.append(item)
+    return items
+
+
+def feed_item_text(item: Dict) -> str:
+    """Text of a single feed item, as stored and hashed for its snapshot"""
+    return (
+        f"Title: {item['title']}\nLink: {item['link']}\n"
+        f"Published: {item['published']}\nSummary: {item['summary']}"
+    )
+
+
+def changed_feed_items(
+    items: List[Dict],
+    seen_items: Dict[str, str],
+) -> List[Tuple[Dict, str]]:
+    """
+    Select feed items that are new or whose content changed.
+    
+    Args:
+        items: Items from fetch_rss
+        seen_items: guid -> sha256 of feed_item_text from the previous poll
+        
+    Returns:
+        List of (item, 'new' | 'updated') in feed order
+    """
+    changed = []
+    for item in items:
+        previous = seen_items.get(item['guid'])
+        if previous is None:
+            changed.append((item, 'new'))
+        elif previous != compute_sha256(feed_item_text(item)):
+            changed.append((item, 'updated'))
+    return changed
+
+
+def feed_hash(item_hashes: Dict[str, str]) -> str:
+    """Hash of a feed from its guid -> item hash map (order independent)"""
+    return compute_sha256('\n'.join(sorted(item_hashes.values())))
+
+
+# =============================================================================
+# ASYNC VARIANTS: fetch_html / fetch_pdf / fetch_api / fetch_rss
+# =============================================================================
+# Same contracts as the blocking tools above, built on httpx.AsyncClient so
+# IngestionAgent.fetch_all_sources_async can gather many sources at once.
+# Pass a shared client to reuse connections across calls; without one a
+# short-lived client (same policy, see utils.http_client) is opened for the
+# single request.
+
+@asynccontextmanager
+async def _async_client(
+    client: Optional[httpx.AsyncClient],
+    timeout: float,
+) -> AsyncIterator[httpx.AsyncClient]:
+    """Yield the caller's client, or a temporary one closed on exit"""
+    if client is not None:
+        yield client
+        return
+    
+    async with create_async_client(timeout=timeout) as temp_client:
+        yield temp_client
+
+
+async def async_fetch_html(
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: int = 30,
+    client: Optional[httpx.AsyncClient] = None,
+    validators: Optional[Dict[str, str]] = None,
+) -> FetchResult:
+    """
+    Async version of fetch_html.
+    
+    Args:
+        url: Target URL to fetch
+        headers: Optional custom headers
+        timeout: Request timeout in seconds
+        client: Optional shared httpx.AsyncClient
+        validators: Optional etag / last_modified for a conditional GET
+        
+    Returns:
+        FetchResult with content and metadata
+        
+    Raises:
+        ValueError: If URL is invalid
+        httpx.HTTPError: If fetch fails
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ['http', 'https']:
+        raise ValueError(f"Invalid URL scheme: {parsed.scheme}")
+    
+    headers = {**(headers or {}), **conditional_headers(validators)}
+    
+    logger.info("fetching_html", url=url, mode="async")
+    start_time = time.time()
+    
+    try:
+        async with _async_client(client, timeout) as http:
+            response = await http.get(url, headers=headers, timeout=timeout)
+        
+        fetch_time = time.time() - start_time
+        
+        # httpx treats every non-2xx as an error, so check 304 first
+        if response.status_code == 304:
+            logger.info("fetch_not_modified", url=url, time=fetch_time)
+            return _not_modified_result(url, response.headers, fetch_time)
+        response.raise_for_status()
+        
+        result = FetchResult(
+            url=url,
+            status_code=response.status_code,
+            content=response.content,
+            headers=dict(response.headers),
+            content_type=response.headers.get('Content-Type', 'text/html'),
+            encoding=response.encoding or 'utf-8',
+            fetch_time=fetch_time,
+            tls_evidence=tls_evidence(response),
+        )
+        
+        logger.info("fetch_success", url=url, size=len(response.content), time=fetch_time)
+        return result
+    
+    except httpx.HTTPError as e:
+        logger.error("fetch_failed", url=url, error=str(e))
+        raise
+
+
+async def async_fetch_pdf(
+    url: str,
+    timeout: int = 60,
+    client: Optional[httpx.AsyncClient] = None,
+    validators: Optional[Dict[str, str]] = None,
+    max_bytes: int = 50 * 1024 * 1024,
+) -> Optional[bytes]:
+    """
+    Async version of fetch_pdf (streams through async_download_pdf).
+    
+    Args:
+        url: URL to PDF
+        timeout: Request timeout
+        client: Optional shared httpx.AsyncClient
+        validators: Optional etag / last_modified for a conditional GET
+        max_bytes: Abort once the body (or its Content-Length) exceeds this
+        
+    Returns:
+        PDF content as bytes, or None if the server answered 304
+    """
+    download = await async_download_pdf(
+        url,
+        timeout=timeout,
+        client=client,
+        validators=validators,
+        max_bytes=max_bytes,
+        spool_bytes=max_bytes,
+    )
+    if download is None:
+        return None
+    with download:
+        return download.stream().read()
+
+
+async def async_download_pdf(
+    url: str,
+    timeout: int = 60,
+    client: Optional[httpx.AsyncClient] = None,
+    validators: Optional[Dict[str, str]] = None,
+    max_bytes: int = 50 * 1024 * 1024,
+    spool_bytes: int = 8 * 1024 * 1024,
+) -> Optional[PDFDownload]:
+    """
+    Async version of download_pdf.
+    
+    Args:
+        url: URL to PDF
+        timeout: Request timeout
+        client: Optional shared httpx.AsyncClient
+        validators: Optional etag / last_modified for a conditional GET
+        max_bytes: Abort once the body (or its Content-Length) exceeds this
+        spool_bytes: Keep bodies up to this size in memory, larger on disk
+        
+    Returns:
+        PDFDownload (caller closes it), or None if the server answered 304
+    """
+    logger.info("downloading_pdf", url=url, mode="async")
+    
+    headers = conditional_headers(validators)
+    
+    async with _async_client(client, timeout) as http:
+        async with http.stream('GET', url, headers=headers, timeout=timeout) as response:
+            if response.status_code == 304:
+                logger.info("pdf_not_modified", url=url)
+                return None
+            response.raise_for_status()
+            
+            _check_pdf_size(url, response.headers.get('Content-Length'), max_bytes)
+            
+            download = PDFDownload(url, spool_bytes)
+            download.headers = dict(response.headers)
+            download.tls_evidence = tls_evidence(response)
+            try:
+                async for chunk in response.aiter_bytes():
+                    _write_pdf_chunk(download, chunk, max_bytes)
+                _finish_pdf(download)
+            except BaseException:
+                download.close()
+                raise
+    
+    logger.info("pdf_downloaded", url=url, size=download.size, spooled_to_disk=not download.in_memory)
+    return download
+
+
+async def async_fetch_api(
+    endpoint: str,
+    auth_token: Optional[str] = None,
+    params: Optional[Dict] = None,
+    client: Optional[httpx.AsyncClient] = None,
+) -> Dict:
+    """
+    Async version of fetch_api.
+    
+    Args:
+        endpoint: API endpoint URL
+        auth_token: Optional Bearer token
+        params: Query parameters
+        client: Optional shared httpx.AsyncClient
+        
+    Returns:
+        JSON response as dict
+    """
+    headers = {}
+    if auth_token:
+        headers['Authorization'] = f'Bearer {auth_token}'
+    
+    async with _async_client(client, 30) as http:
+        response = await http.get(endpoint, headers=headers, params=params, timeout=30)
+        response.raise_for_status()
+    
+    return response.json()
+
+
+async def async_fetch_rss(
+    feed_url: str,
+    timeout: int = 30,
+    client: Optional[httpx.AsyncClient] = None,
+    validators: Optional[Dict[str, str]] = None,
+) -> FeedResult:
+    """
+    Async version of fetch_rss.
+    
+    The feed is downloaded with httpx and handed to feedparser as bytes,
+    since feedparser's own fetching is blocking.
+    
+    Args:
+        feed_url: URL to RSS feed
+        timeout: Request timeout
+        client: Optional shared httpx.AsyncClient
+        validators: Optional etag / last_modified for a conditional GET
+        
+    Returns:
+        FeedResult with items, or not_modified=True on 304
+    """
+    logger.info("fetching_rss", url=feed_url, mode="async")
+    
+    headers = conditional_headers(validators)
+    
+    async with _async_client(client, timeout) as http:
+        response = await http.get(feed_url, headers=headers, timeout=timeout)
+        if response.status_code == 304:
+            logger.info("fetch_not_modified", url=feed_url)
+            return FeedResult(
+                url=feed_url, items=[], headers=dict(response.headers), not_modified=True
+            )
+        response.raise_for_status()
+    
+    feed = feedparser.parse(response.content)
+    items = _feed_items(feed)
     
     logger.info("rss_parsed", url=feed_url, items=len(items))
-    return items
+    return FeedResult(url=feed_url, items=items, headers=dict(response.headers))
 
 
 # =============================================================================
 # TOOL 5: extract_text_pdf
 # =============================================================================
 
-def extract_text_pdf(pdf_bytes: bytes) -> str:
+def extract_text_pdf(
+    pdf_bytes: "bytes | PDFDownload",
+    workers: int = 1,
+    page_cache: Optional[PageTextCache] = None,
+    min_pages_for_pool: int = 16,
+) -> str:
     """
     Extract text from PDF using PyPDF2.
     
+    Pages whose content stream hash is already in page_cache are not
+    extracted again. With workers > 1 and at least min_pages_for_pool
+    uncached pages, the remaining pages are split across a process pool.
+    The joined text is the same in every mode.
+    
+    A PDFDownload is read in place through its zero-copy stream rather
+    than being materialized as bytes.
+    
     Args:
-        pdf_bytes: PDF content as bytes
+        pdf_bytes: PDF content as bytes, or a PDFDownload
+        workers: Number of worker processes (1 = extract in-process)
+        page_cache: Optional PageTextCache keyed by page content hash
+        min_pages_for_pool: Smallest uncached page count worth a pool
         
     Returns:
         Extracted text
     """
-    import io
-    
     if not PYPDF2_AVAILABLE:
         raise ImportError("PyPDF2 not installed. Run: pip install PyPDF2")
     
-    logger.info("extracting_pdf_text", size=len(pdf_bytes))
+    if isinstance(pdf_bytes, PDFDownload):
+        size = pdf_bytes.size
+        pdf_reader = PyPDF2.PdfReader(pdf_bytes.stream())
+    else:
+        size = len(pdf_bytes)
+        pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+    
+    logger.info("extracting_pdf_text", size=size)
     
-    pdf_file = io.BytesIO(pdf_bytes)
-    pdf_reader = PyPDF2.PdfReader(pdf_file)
+    pages = pdf_reader.pages
+    page_count = len(pages)
     
-    text_parts = []
-    for page_num, page in enumerate(pdf_reader.pages):
-        text = page.extract_text()
-        text_parts.append(text)
+    # Reuse text for pages seen before
+    page_hashes: List[Optional[str]] = [None] * page_count
+    cached: Dict[str, str] = {}
+    if page_cache is not None:
+        page_hashes = [page_content_hash(page) for page in pages]
+        cached = page_cache.get_many(h for h in page_hashes if h)
+    
+    todo = [i for i in range(page_count) if page_hashes[i] not in cached]
+    
+    if workers > 1 and len(todo) >= min_pages_for_pool:
+        extracted = _extract_pages_parallel(pdf_bytes, todo, workers)
+    else:
+        extracted = {i: pages[i].extract_text() for i in todo}
+    
+    if page_cache is not None:
+        page_cache.put_many({
+            page_hashes[i]: text for i, text in extracted.items() if page_hashes[i]
+        })
+    
+    text_parts = [
+        extracted[i] if i in extracted else cached[page_hashes[i]]
+        for i in range(page_count)
+    ]
     
     full_text = '\n\n'.join(text_parts)
-    logger.info("pdf_text_extracted", pages=len(pdf_reader.pages), chars=len(full_text))
+    logger.info(
+        "pdf_text_extracted",
+        pages=page_count,
+        extracted=len(todo),
+        cached=page_count - len(todo),
+        chars=len(full_text),
+    )
     
     return full_text
 
 
+def page_content_hash(page) -> Optional[str]:
+    """
+    Hash a PDF page's content stream plus the resources text comes from.
+    
+    Fonts are included because their ToUnicode maps decide what text the
+    same drawing operators produce. Form XObjects are included (their
+    streams, fonts and nested forms) because text is extracted from them
+    too.
+    
+    Returns:
+        SHA-256 hex digest, or None for pages without a content stream
+    """
+    contents = page.get_contents()
+    if contents is None:
+        return None
+    
+    hasher = hashlib.sha256(contents.get_data())
+    _hash_resources(hasher, page.get('/Resources'), set())
+    return hasher.hexdigest()
+
+
+def _hash_resources(hasher, resources, seen: set) -> None:
+    """Feed fonts and Form XObjects of a resource dictionary into hasher"""
+    resources = resources.get_object() if resources else None
+    if not resources:
+        return
+    
+    fonts = resources.get('/Font')
+    if fonts:
+        fonts = fonts.get_object()
+        for name in sorted(fonts):
+            font = fonts[name].get_object()
+            hasher.update(f"{name}:{font.get('/BaseFont')}".encode())
+            to_unicode = font.get('/ToUnicode')
+            if to_unicode is not None:
+                hasher.update(to_unicode.get_object().get_data())
+    
+    xobjects = resources.get('/XObject')
+    if xobjects:
+        xobjects = xobjects.get_object()
+        for name in sorted(xobjects):
+            ref = xobjects[name]
+            form = ref.get_object()
+            if form.get('/Subtype') != '/Form':
+                continue
+            hasher.update(f"{name}:form".encode())
+            # Forms shared by several names (or nesting themselves) count once
+            key = getattr(ref, 'idnum', None) or id(form)
+            if key in seen:
+                continue
+            seen.add(key)
+            hasher.update(form.get_data())
+            _hash_resources(hasher, form.get('/Resources'), seen)
+
+
+def _extract_pages_parallel(
+    pdf: "bytes | PDFDownload",
+    indices: List[int],
+    workers: int,
+) -> Dict[int, str]:
+    """Extract the given pages across a process pool"""
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    
+    # Each worker receives the document once, in its initializer. Forked
+    # workers inherit the parent's stream (mmap / buffer) without a copy;
+    # spawned workers need it pickled as bytes.
+    context = multiprocessing.get_context()
+    if isinstance(pdf, PDFDownload):
+        source = pdf.stream() if context.get_start_method() == 'fork' else bytes(pdf.buffer())
+    else:
+        source = pdf
+    
+    # Several batches per worker so one slow page range doesn't idle the rest
+    batch_size = max(1, -(-len(indices) // (workers * 4)))
+    batches = [indices[i:i + batch_size] for i in range(0, len(indices), batch_size)]
+    
+    extracted: Dict[int, str] = {}
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_page_worker,
+        initargs=(source,),
+    ) as pool:
+        futures = [pool.submit(_extract_page_batch, batch) for batch in batches]
+        for batch, future in zip(batches, futures):
+            extracted.update(zip(batch, future.result()))
+    
+    return extracted
+
+
+_worker_reader = None
+
+
+def _init_page_worker(source) -> None:
+    """Process-pool initializer: open the PDF once per worker"""
+    global _worker_reader
+    stream = io.BytesIO(source) if isinstance(source, bytes) else source
+    _worker_reader = PyPDF2.PdfReader(stream)
+
+
+def _extract_page_batch(indices: List[int]) -> List[str]:
+    """Process-pool worker: extract text for a batch of page indices"""
+    return [_worker_reader.pages[i].extract_text() for i in indices]
+
+
 # =============================================================================
 # TOOL 6: ocr_pdf_scanned (Placeholder - requires Tesseract)
 # =============================================================================
@@ -304,6 +1003,12 @@ def normalize_text(raw_text: str) -> str:
     """
     import re
     
+    # Fast path: collapsing whitespace first leaves a printable string when
+    # there is nothing to remove, which gives the same result in C speed
+    collapsed = ' '.join(raw_text.split())
+    if collapsed.isprintable():
+        return collapsed
+    
     # Remove non-printable characters
     text = ''.join(char for char in raw_text if char.isprintable() or char.isspace())
     
@@ -477,3 +1182,125 @@ def extract_metadata(html: str, content_type: str) -> Dict:
             metadata['keywords'] = [k.strip() for k in content.split(',')]
     
     return metadata
+
+
+# =============================================================================
+# TOOL 16: analyze_html (single-parse HTML stage)
+# =============================================================================
+# extract_metadata, capture_dom_tree and list_links each build their own
+# BeautifulSoup tree. analyze_html parses the document once with lxml and
+# derives all three plus the visible text from that tree using compiled
+# XPath expressions, which run in C.
+
+_NON_TEXT_TAGS = "ancestor::script or ancestor::style or ancestor::template"
+
+_XPATH_ALL_TEXT = etree.XPath(
+    f"//text()[not({_NON_TEXT_TAGS})]", smart_strings=False
+)
+_XPATH_VISIBLE_TEXT = etree.XPath(
+    f"//body//text()[not({_NON_TEXT_TAGS} or ancestor::noscript)]", smart_strings=False
+)
+_XPATH_TITLE = etree.XPath("//title")
+_XPATH_NAMED_META = etree.XPath("//meta[@name]")
+_XPATH_HREFS = etree.XPath("//a[@href]/@href", smart_strings=False)
+
+
+def parse_html(html: str | bytes, encoding: str = 'utf-8'):
+    """
+    Parse HTML into an lxml element tree.
+    
+    Strings are encoded first because lxml rejects str input that carries
+    an XML encoding declaration. A plain etree parser is used rather than
+    lxml.html's, which pays for a Python class lookup on every element.
+    
+    Args:
+        html: HTML content
+        encoding: Encoding of bytes input
+        
+    Returns:
+        Root <html> element
+    """
+    if isinstance(html, str):
+        html, encoding = html.encode('utf-8'), 'utf-8'
+    
+    parser = etree.HTMLParser(encoding=encoding)
+    root = etree.fromstring(html, parser=parser)
+    if root is None:
+        root = etree.fromstring(b'<html></html>', parser=parser)
+    return root
+
+
+def analyze_html(
+    html: "str | bytes | etree._Element",
+    base_url: str,
+    encoding: str = 'utf-8',
+    include_text: bool = True,
+) -> Dict:
+    """
+    Parse HTML once and extract metadata, links, DOM fingerprint and text.
+    
+    Produces the same metadata / dom_tree / links as extract_metadata,
+    capture_dom_tree and list_links, but the visible text excludes markup,
+    scripts, styles and <head> content.
+    
+    Args:
+        html: HTML content, or a tree already built by parse_html
+        base_url: Base URL for resolving relative links
+        encoding: Encoding of bytes input
+        include_text: Collect the visible text (skip when the caller takes
+            its text from a parser region instead)
+        
+    Returns:
+        Dict with metadata, dom_tree, links and text (normalized; None when
+        include_text is False)
+    """
+    root = html if isinstance(html, etree._Element) else parse_html(html, encoding)
+    
+    metadata = {
+        'title': None,
+        'author': None,
+        'date': None,
+        'keywords': [],
+    }
+    
+    titles = _XPATH_TITLE(root)
+    if titles:
+        metadata['title'] = ''.join(titles[0].itertext()).strip()
+    
+    for meta in _XPATH_NAMED_META(root):
+        name = meta.get('name', '').lower()
+        content = meta.get('content', '')
+        
+        if name == 'author':
+            metadata['author'] = content
+        elif name == 'date':
+            metadata['date'] = content
+        elif name == 'keywords':
+            metadata['keywords'] = [k.strip() for k in content.split(',')]
+    
+    links = [urljoin(base_url, href) for href in _XPATH_HREFS(root)]
+    
+    # Root node fingerprint, matching capture_dom_tree (BeautifulSoup counts
+    # text runs between elements as children too)
+    children_count = (1 if root.text else 0) + sum(
+        1 + (1 if child.tail else 0) for child in root
+    )
+    dom_tree = {
+        'tag': root.tag,
+        'depth': 0,
+        'children_count': children_count,
+    }
+    all_text = ''.join(t.strip() for t in _XPATH_ALL_TEXT(root))
+    if all_text:
+        dom_tree['text_hash'] = compute_sha256(all_text)[:16]
+    
+    text = normalize_text(' '.join(_XPATH_VISIBLE_TEXT(root))) if include_text else None
+    
+    logger.debug("html_analyzed", links=len(links), chars=len(text or ''))
+    
+    return {
+        'metadata': metadata,
+        'dom_tree': dom_tree,
+        'links': links,
+        'text': text,
+    }
@@ -3,44 +3,123 @@ Agent 2: Authenticity & Oracle - Simplified (No structured logging)
 """
 
 import json
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
 from agents.agent_2_auth import tools
+from utils.merkle import MerkleAccumulator, parse_digest
+from utils.config import load_agent_settings
+from utils.verification_cache import (
+    CERTIFICATE,
+    DNS,
+    REPUTATION,
+    VerificationCache,
+    create_verification_cache,
+)
 
 
 class AuthenticityAgent:
     """Agent 2: Authenticity & Oracle"""
     
-    def __init__(self, consensus_threshold: float = 0.6):
+    def __init__(
+        self,
+        consensus_threshold: float = 0.6,
+        independent_consensus: bool = False,
+        consensus_fetches: int = 3,
+        consensus_quorum: Optional[int] = None,
+        consensus_egress: Optional[List[Optional[str]]] = None,
+        batch_concurrency: int = 8,
+        per_domain_concurrency: int = 2,
+        verification_cache: Optional[VerificationCache] = None,
+        sources_config_path: Optional[str] = None,
+    ):
+        """
+        Args:
+            consensus_threshold: Consensus score below which HITL is required
+            independent_consensus: Re-fetch the URL to confirm the content hash
+                even when the snapshot carries TLS evidence from ingestion
+            consensus_fetches: Number of parallel re-fetches for consensus
+            consensus_quorum: Matching hashes that end consensus early
+                (default: majority of consensus_fetches)
+            consensus_egress: Proxy URLs (None = direct) the re-fetches
+                are spread over
+            batch_concurrency: Snapshots verified at once by verify_batch
+            per_domain_concurrency: Of those, at most this many per domain
+            verification_cache: Per-domain cache for DNS, certificate and
+                reputation checks (default: built from
+                settings.verification_cache_*; backend redis shares it
+                between workers)
+            sources_config_path: sources.yaml whose settings select the
+                verification cache when it is not passed in (None: in memory)
+        """
         self.consensus_threshold = consensus_threshold
+        self.independent_consensus = independent_consensus
+        self.consensus_fetches = consensus_fetches
+        self.consensus_quorum = consensus_quorum
+        self.consensus_egress = consensus_egress
+        self.batch_concurrency = batch_concurrency
+        self.per_domain_concurrency = per_domain_concurrency
+        self.verification_cache = verification_cache or create_verification_cache(
+            load_agent_settings(sources_config_path)
+        )
+        # Every verified snapshot hash since start-up; batches append to it
+        self.snapshot_log = MerkleAccumulator()
         print(f"[INFO] Agent 2 initialized (consensus threshold: {consensus_threshold})")
     
     def verify_snapshot(self, snapshot: Dict) -> Dict:
-        """Verify authenticity of a snapshot"""
+        """
+        Verify authenticity of a snapshot.
+        
+        Snapshots carrying 'tls_evidence' (recorded by Agent 1 during its
+        fetch) are verified from that evidence without touching the network;
+        the URL is only re-fetched when independent_consensus is set. Older
+        snapshots without evidence fall back to live TLS / certificate checks
+        and multi-fetch consensus.
+        """
         snapshot_id = snapshot['snapshot_id']
         url = snapshot['url']
         content_hash = snapshot['sha256']
+        evidence = snapshot.get('tls_evidence')
         
         print(f"\n[INFO] Verifying: {snapshot_id}")
         print(f"  Source: {snapshot['source']}")
         print(f"  URL: {url}")
         
-        # TLS proof
-        tls_proof_result = tools.tls_proof(url, content_hash)
+        domain = urlparse(url).netloc
+        cache = self.verification_cache
         
-        # Certificate verification
-        cert_result = tools.cert_chain_verify(url)
+        if evidence:
+            # A new certificate invalidates everything cached for the domain
+            cache.observe_certificate(domain, evidence.get('peer_cert_sha256'))
+            tls_proof_result = tools.tls_proof_from_evidence(url, content_hash, evidence)
+            cert_result = tools.cert_chain_from_evidence(url, evidence)
+        else:
+            tls_proof_result = tools.tls_proof(url, content_hash)
+            # The certificate seen on this live connection, not a cached one:
+            # a new fingerprint drops the domain's cached checks before use
+            cache.observe_certificate(domain, tls_proof_result.get('cert_fingerprint'))
+            cert_result = cache.get_or_check(CERTIFICATE, domain, lambda: tools.cert_chain_verify(url))
         
         # Multi-source consensus
-        consensus_result = tools.multi_fetch_consensus(url, n=3)
+        if evidence and not self.independent_consensus:
+            consensus_result = tools.evidence_consensus(content_hash)
+        else:
+            consensus_result = tools.concurrent_fetch_consensus(
+                url,
+                n=self.consensus_fetches,
+                quorum=self.consensus_quorum,
+                egress=self.consensus_egress,
+            )
         
         # DNS verification
-        from urllib.parse import urlparse
-        domain = urlparse(url).netloc
-        dns_result = tools.dns_verification(domain)
+        dns_result = cache.get_or_check(DNS, domain, lambda: tools.dns_verification(domain))
         
         # Domain authenticity
-        auth_check = tools.domain_authenticity_check(domain)
+        auth_check = cache.get_or_check(
+            REPUTATION, domain, lambda: tools.domain_authenticity_check(domain)
+        )
         
         # Timestamp
         timestamp_result = tools.timestamp_proof(content_hash)
@@ -105,29 +184,92 @@ class AuthenticityAgent:
             return True
         return False
     
+    def _verify_or_error(self, snapshot: Dict) -> Dict:
+        """verify_snapshot; errors become results"""
+        try:
+            # A hash the snapshot log cannot take fails the item before any checks
+            parse_digest(snapshot["sha256"])
+            return self.verify_snapshot(snapshot)
+        except Exception as e:
+            print(f"[ERROR] Verification failed for {snapshot.get('snapshot_id')}: {e}")
+            return {
+                "snapshot_id": snapshot.get("snapshot_id"),
+                "verified": False,
+                "error": str(e),
+                "hitl_required": True
+            }
+    
+    def _verify_all(self, snapshots: List[Dict]) -> List[Dict]:
+        """
+        Verify snapshots in a thread pool, scheduled per domain.
+        
+        Each domain has a queue; a snapshot is only submitted when its
+        domain has fewer than per_domain_concurrency verifications running,
+        taking domains round-robin. Pool threads never wait on a domain, so
+        while one domain is at its limit the others keep the pool busy.
+        """
+        queues: Dict[str, deque] = {}
+        for index, snapshot in enumerate(snapshots):
+            queues.setdefault(urlparse(snapshot.get("url", "")).netloc, deque()).append(index)
+        
+        workers = max(1, self.batch_concurrency)
+        per_domain = max(1, self.per_domain_concurrency)
+        running = dict.fromkeys(queues, 0)
+        ready = deque(queues)  # domains with queued snapshots
+        results: List[Optional[Dict]] = [None] * len(snapshots)
+        pending = {}
+        
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while ready or pending:
+                blocked = 0
+                while ready and len(pending) < workers and blocked < len(ready):
+                    domain = ready.popleft()
+                    if running[domain] >= per_domain:
+                        ready.append(domain)
+                        blocked += 1
+                        continue
+                    index = queues[domain].popleft()
+                    running[domain] += 1
+                    pending[pool.submit(self._verify_or_error, snapshots[index])] = (index, domain)
+                    if queues[domain]:
+                        ready.append(domain)
+                    blocked = 0
+                
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, domain = pending.pop(future)
+                    running[domain] -= 1
+                    results[index] = future.result()
+        
+        return results
+    
     def verify_batch(self, snapshots: List[Dict]) -> Dict:
-        """Verify batch of snapshots"""
+        """
+        Verify batch of snapshots.
+        
+        Up to batch_concurrency snapshots are verified at once (at most
+        per_domain_concurrency per domain), so a batch takes about as long
+        as its slowest domain. Results keep the input order, and verified
+        hashes are appended to snapshot_log in that order; merkle_root is
+        the log's root after the batch and each result records its
+        merkle_leaf_index for inclusion_proof().
+        """
         print(f"\n[INFO] Verifying batch of {len(snapshots)} snapshots...")
         
-        results = []
-        all_hashes = []
-        
-        for snapshot in snapshots:
-            try:
-                auth_proof = self.verify_snapshot(snapshot)
-                results.append(auth_proof)
-                all_hashes.append(snapshot["sha256"])
-            except Exception as e:
-                print(f"[ERROR] Verification failed for {snapshot.get('snapshot_id')}: {e}")
-                results.append({
-                    "snapshot_id": snapshot.get("snapshot_id"),
-                    "verified": False,
-                    "error": str(e),
-                    "hitl_required": True
-                })
-        
-        # Build Merkle tree
-        merkle_result = tools.merkle_aggregate(all_hashes)
+        results = self._verify_all(snapshots)
+        
+        # Extend the Merkle log (O(log n) per snapshot, nothing rehashed)
+        appended = 0
+        for snapshot, result in zip(snapshots, results):
+            if "error" not in result:
+                result["merkle_leaf_index"] = self.snapshot_log.append(snapshot["sha256"])
+                appended += 1
+        
+        merkle_result = {
+            "merkle_root": self.snapshot_log.root_hex() if len(self.snapshot_log) else None,
+            "leaves": len(self.snapshot_log),
+            "appended": appended,
+        }
         
         # Store proof
         proof_bundle = {
@@ -155,3 +297,10 @@ class AuthenticityAgent:
         print(f"  Require HITL: {output['hitl_count']}")
         
         return output
+    
+    def inclusion_proof(self, leaf_index: int) -> Dict:
+        """Proof that snapshot merkle_leaf_index is under the current merkle_root"""
+        return {
+            "merkle_root": self.snapshot_log.root_hex(),
+            **self.snapshot_log.proof(leaf_index).to_dict(),
+        }
@@ -3,12 +3,18 @@ Agent 2: Authenticity & Oracle - Simplified Tools (No structured logging)
 """
 
 import hashlib
-import json
+import ssl
+import threading
 import time
-from datetime import datetime
-from typing import Dict, List
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
 from urllib.parse import urlparse
-import requests
+
+from utils.http_client import get_session, tls_evidence
+from utils.merkle import MerkleAccumulator
+from utils.proof_codec import encode_proof
 
 
 def tls_proof(url: str, content_hash: str) -> Dict:
@@ -16,14 +22,20 @@ def tls_proof(url: str, content_hash: str) -> Dict:
     print(f"[INFO] Generating TLS proof for: {url}")
     
     try:
-        response = requests.get(url, timeout=10, verify=True, stream=True)
+        # Headers only; closing the streamed response hands the connection
+        # back to the pool
+        with get_session().get(url, timeout=10, verify=True, stream=True) as response:
+            status_code = response.status_code
+            evidence = tls_evidence(response) or {}
         
         return {
             "verified": True,
             "method": "ssl_verification",
             "url": url,
             "timestamp": datetime.utcnow().isoformat() + "Z",
-            "status_code": response.status_code,
+            "status_code": status_code,
+            # Certificate presented on this connection (None over plain HTTP)
+            "cert_fingerprint": evidence.get('peer_cert_sha256'),
         }
     except Exception as e:
         print(f"[ERROR] TLS proof failed for {url}: {e}")
@@ -38,10 +50,12 @@ def tls_proof(url: str, content_hash: str) -> Dict:
 def cert_chain_verify(url: str) -> Dict:
     """Verify SSL certificate"""
     try:
-        requests.get(url, timeout=10, verify=True)
+        with get_session().get(url, timeout=10, verify=True, stream=True) as response:
+            evidence = tls_evidence(response) or {}
         return {
             "valid": True,
             "url": url,
+            "cert_fingerprint": evidence.get('peer_cert_sha256'),
             "verified_at": datetime.utcnow().isoformat() + "Z"
         }
     except Exception as e:
@@ -63,7 +77,7 @@ def multi_fetch_consensus(url: str, n: int = 3) -> Dict:
             if i > 0:
                 time.sleep(0.5)
             
-            response = requests.get(url, timeout=10)
+            response = get_session().get(url, timeout=10)
             content_hash = hashlib.sha256(response.content).hexdigest()
             hashes.append(content_hash)
             print(f"  Attempt {i+1}: {content_hash[:16]}...")
@@ -101,27 +115,199 @@ def multi_fetch_consensus(url: str, n: int = 3) -> Dict:
     }
 
 
+class _Cancelled(Exception):
+    """Raised inside a consensus fetch once quorum made it unnecessary"""
+
+
+def _consensus_fetch(url: str, proxy: Optional[str], timeout: float, cancel: threading.Event) -> str:
+    """Stream one copy of url and hash it, giving up as soon as cancel is set"""
+    kwargs = {'proxies': {'http': proxy, 'https': proxy}} if proxy else {}
+    hasher = hashlib.sha256()
+    with get_session().get(url, timeout=timeout, stream=True, **kwargs) as response:
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            if cancel.is_set():
+                raise _Cancelled()
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def concurrent_fetch_consensus(
+    url: str,
+    n: int = 3,
+    quorum: Optional[int] = None,
+    egress: Optional[List[Optional[str]]] = None,
+    timeout: float = 10,
+) -> Dict:
+    """
+    Fetch url n times in parallel and stop at the first quorum of matching hashes.
+    
+    Args:
+        url: URL to fetch
+        n: Number of fetches to issue
+        quorum: Matching hashes needed to stop early (default: majority of n)
+        egress: Proxy URL per fetch (None = direct), cycled over the n
+            fetches, so copies come through different egress points and
+            resolvers
+        timeout: Per-fetch timeout in seconds
+        
+    Returns:
+        Same shape as multi_fetch_consensus, plus 'quorum' and 'early_stop'.
+        The score is matching / finished fetches; cancelled stragglers do
+        not count against it.
+    """
+    quorum = quorum or n // 2 + 1
+    egress = egress or [None]
+    print(f"[INFO] Concurrent consensus ({n} fetches, quorum {quorum}): {url}")
+    
+    cancel = threading.Event()
+    hashes: List[Optional[str]] = []
+    counts: Counter = Counter()
+    pool = ThreadPoolExecutor(max_workers=n)
+    pending = {
+        pool.submit(_consensus_fetch, url, egress[i % len(egress)], timeout, cancel)
+        for i in range(n)
+    }
+    
+    try:
+        while pending and (not counts or counts.most_common(1)[0][1] < quorum):
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    content_hash = future.result()
+                    counts[content_hash] += 1
+                    hashes.append(content_hash)
+                    print(f"  Fetch {len(hashes)}: {content_hash[:16]}...")
+                except Exception as e:
+                    hashes.append(None)
+                    print(f"  Fetch {len(hashes)}: FAILED - {e}")
+    finally:
+        # Stragglers stop at their next chunk; don't wait for them
+        cancel.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+    
+    early_stop = bool(pending)
+    if early_stop:
+        print(f"[INFO] Quorum reached, cancelled {len(pending)} straggler(s)")
+    
+    if not counts:
+        return {
+            "consensus_score": 0.0,
+            "sources_checked": len(hashes),
+            "successful_fetches": 0,
+            "hashes": hashes,
+            "majority_hash": None,
+            "quorum": quorum,
+            "early_stop": early_stop,
+        }
+    
+    majority_hash, count = counts.most_common(1)[0]
+    consensus_score = round(count / len(hashes), 2)
+    
+    print(f"[SUCCESS] Consensus score: {consensus_score}")
+    
+    return {
+        "consensus_score": consensus_score,
+        "sources_checked": len(hashes),
+        "successful_fetches": sum(counts.values()),
+        "hashes": hashes,
+        "majority_hash": majority_hash,
+        "all_match": len(counts) == 1,
+        "quorum": quorum,
+        "early_stop": early_stop,
+    }
+
+
+# =============================================================================
+# Verification from ingestion TLS evidence (no network)
+# =============================================================================
+# Agent 1 records the TLS session it fetched the snapshot over
+# (utils.http_client.tls_evidence). These check that evidence instead of
+# opening new connections to the regulator.
+
+def _host_matches(host: str, pattern: str) -> bool:
+    """RFC 6125 style match, wildcard allowed in the left-most label only"""
+    host, pattern = host.lower(), pattern.lower()
+    if pattern.startswith('*.'):
+        return host.count('.') == pattern.count('.') and host.endswith(pattern[1:])
+    return host == pattern
+
+
+def tls_proof_from_evidence(url: str, content_hash: str, evidence: Dict) -> Dict:
+    """TLS proof built from the session Agent 1 fetched the content over"""
+    host = urlparse(url).hostname or ''
+    same_host = evidence.get('host', '').lower() == host.lower()
+    
+    return {
+        "verified": bool(evidence.get('verified')) and same_host,
+        "method": "ingestion_tls_evidence",
+        "url": url,
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "protocol": evidence.get('protocol'),
+        "cipher": evidence.get('cipher'),
+        "server_cert_fingerprint": evidence.get('peer_cert_sha256'),
+        "captured_at": evidence.get('captured_at'),
+        "witness": hashlib.sha256(
+            f"{evidence.get('peer_cert_sha256')}:{content_hash}".encode()
+        ).hexdigest(),
+    }
+
+
+def cert_chain_from_evidence(url: str, evidence: Dict, now: Optional[float] = None) -> Dict:
+    """Check the recorded certificate: chain validated, hostname, expiry"""
+    host = urlparse(url).hostname or ''
+    names = evidence.get('subject_alt_names') or []
+    errors = []
+    
+    if not evidence.get('verified'):
+        errors.append("chain not validated during fetch")
+    if not any(_host_matches(host, name) for name in names):
+        errors.append(f"certificate does not cover {host}")
+    
+    not_after = evidence.get('not_after')
+    if not_after:
+        expires = ssl.cert_time_to_seconds(not_after)
+        # Valid when fetched is what matters; later expiry is fine
+        if now is None:
+            captured = evidence.get('captured_at')
+            now = (
+                datetime.fromisoformat(captured.rstrip('Z')).replace(tzinfo=timezone.utc).timestamp()
+                if captured else time.time()
+            )
+        if expires < now:
+            errors.append("certificate expired at fetch time")
+    
+    result = {
+        "valid": not errors,
+        "url": url,
+        "issuer": evidence.get('issuer'),
+        "not_after": not_after,
+        "chain": evidence.get('cert_chain_sha256', []),
+        "verified_at": datetime.utcnow().isoformat() + "Z",
+    }
+    if errors:
+        result["error"] = "; ".join(errors)
+    return result
+
+
+def evidence_consensus(content_hash: str) -> Dict:
+    """Consensus over the single ingestion fetch (no independent re-fetch)"""
+    return {
+        "consensus_score": 1.0,
+        "sources_checked": 1,
+        "successful_fetches": 1,
+        "hashes": [content_hash],
+        "majority_hash": content_hash,
+        "all_match": True,
+        "independent": False,
+    }
+
+
 def merkle_aggregate(data_hashes: List[str]) -> Dict:
-    """Build Merkle tree"""
+    """Build Merkle tree over hex SHA-256 digests (see utils.merkle)"""
     if not data_hashes:
         return {"merkle_root": None, "leaves": 0}
     
-    current_level = data_hashes.copy()
-    
-    while len(current_level) > 1:
-        next_level = []
-        
-        for i in range(0, len(current_level), 2):
-            left = current_level[i]
-            right = current_level[i + 1] if i + 1 < len(current_level) else left
-            
-            combined = left + right
-            parent_hash = hashlib.sha256(combined.encode()).hexdigest()
-            next_level.append(parent_hash)
-        
-        current_level = next_level
-    
-    merkle_root = current_level[0]
+    merkle_root = MerkleAccumulator(data_hashes).root_hex()
     
     print(f"[SUCCESS] Merkle root: {merkle_root[:32]}...")
     
@@ -132,9 +318,9 @@ def merkle_aggregate(data_hashes: List[str]) -> Dict:
 
 
 def store_proof_ipfs(proof: dict) -> str:
-    """Simulate IPFS storage"""
-    proof_json = json.dumps(proof, sort_keys=True)
-    proof_hash = hashlib.sha256(proof_json.encode()).hexdigest()
+    """Simulate IPFS storage of the proof's compact CBOR encoding"""
+    proof_bytes = encode_proof(proof)
+    proof_hash = hashlib.sha256(proof_bytes).hexdigest()
     
     cid = f"QmProof{proof_hash[:40]}"
     return cid
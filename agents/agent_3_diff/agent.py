@@ -4,9 +4,16 @@ Main agent logic for detecting and classifying changes.
 """
 
 import json
+import os
+import tempfile
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 from agents.agent_3_diff import tools
+from utils.blob_store import BlobStore, create_blob_store
+from utils.config import load_agent_settings
+from utils.embedding_cache import EmbeddingCache
+from utils.minhash import InMemoryLSHIndex, LSHIndex, create_lsh_index
+from utils.version_history import InMemoryVersionHistory, VersionHistory, create_version_history
 
 
 class DiffAgent:
@@ -16,27 +23,207 @@ class DiffAgent:
     Analyzes changes between document versions and classifies significance.
     """
     
-    def __init__(self):
-        self.version_history = {}  # Store previous versions (in-memory for MVP)
+    # Snapshot fields not kept in the version history (text is stored
+    # separately; raw HTML is not needed once dom_merkle exists)
+    _HISTORY_EXCLUDE = ("text", "raw_html")
+    
+    def __init__(
+        self,
+        section_index: bool = False,
+        version_history: Optional[VersionHistory] = None,
+        batch_workers: int = 1,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        detect_duplicates: bool = True,
+        duplicate_index: Optional[LSHIndex] = None,
+        duplicate_threshold: float = 0.9,
+        sources_config_path: Optional[str] = None,
+        blob_store: Optional[BlobStore] = None,
+    ):
+        """
+        Args:
+            section_index: Keep a section index with each snapshot
+                (snapshot["sections"]) and diff only the sections whose
+                hashes changed
+            version_history: Where analyzed versions are kept, so the
+                previous version of a source need not be passed in
+                (default: built from settings.version_history_*, see
+                utils.version_history.create_version_history)
+            batch_workers: Worker processes for analyze_batch (1 = serial)
+            embedding_cache: Section embeddings by section hash (default:
+                kept at settings.embedding_cache_path, which also shares
+                them with batch workers; in-memory without that setting)
+            detect_duplicates: Flag snapshots and sections that near-duplicate
+                content already processed for another source
+            duplicate_index: utils.minhash.LSHIndex to use (default:
+                built from settings.lsh_index_*, see create_lsh_index)
+            duplicate_threshold: Minimum estimated Jaccard similarity
+            sources_config_path: sources.yaml whose settings select the
+                stores that are not passed in (None: all in memory)
+            blob_store: Where Agent 1 put full DOM fingerprints (default:
+                utils.blob_store.create_blob_store, opened on first use)
+        """
+        self.sources_config_path = sources_config_path
+        self.settings = load_agent_settings(sources_config_path)
+        self.version_history = version_history or create_version_history(self.settings)
+        self.section_index = section_index
+        self.batch_workers = batch_workers
+        self.embedding_cache = embedding_cache or EmbeddingCache(self.settings.get('embedding_cache_path'))
+        self.blob_store = blob_store
+        self.duplicate_threshold = duplicate_threshold
+        self.duplicate_index = duplicate_index
+        if detect_duplicates and duplicate_index is None:
+            self.duplicate_index = create_lsh_index(self.settings)
         print("[INFO] Agent 3 initialized (Diff & Change Classifier)")
     
+    def _load_blob(self, ref: str) -> bytes:
+        """Blob store get(), opening the configured store on first use"""
+        if self.blob_store is None:
+            self.blob_store = create_blob_store()
+        return self.blob_store.get(ref)
+    
+    @staticmethod
+    def _source_id(snapshot: Dict) -> Optional[str]:
+        source = snapshot.get("source")
+        if isinstance(source, dict):
+            source = source.get("id") or source.get("name")
+        return source
+    
+    def previous_version(self, source_id: str) -> Optional[Dict]:
+        """Latest stored snapshot of a source (None if never analyzed)"""
+        stored = self.version_history.latest(source_id)
+        if stored is None:
+            return None
+        return {**stored.meta, "text": stored.text}
+    
+    @classmethod
+    def _should_record(cls, snapshot: Dict, previous_snapshot: Optional[Dict]) -> bool:
+        """Whether the snapshot becomes its source's latest version"""
+        if not cls._source_id(snapshot):
+            return False
+        return not (previous_snapshot is not None and previous_snapshot.get("sha256")
+                    and previous_snapshot.get("sha256") == snapshot.get("sha256"))
+    
+    def _record_version(self, snapshot: Dict, previous_snapshot: Optional[Dict]) -> bool:
+        """Store the snapshot as its source's latest version (unless unchanged)"""
+        if not self._should_record(snapshot, previous_snapshot):
+            return False
+        meta = {k: v for k, v in snapshot.items() if k not in self._HISTORY_EXCLUDE}
+        self.version_history.append(self._source_id(snapshot), snapshot.get("text", ""), meta)
+        return True
+    
+    def _index_sections(self, snapshot: Dict, previous_snapshot: Optional[Dict]) -> None:
+        """Attach section indexes, reusing the previous one for unchanged content"""
+        if "sections" not in snapshot:
+            if (previous_snapshot and previous_snapshot.get("sections") is not None
+                    and previous_snapshot.get("sha256")
+                    and previous_snapshot.get("sha256") == snapshot.get("sha256")):
+                snapshot["sections"] = previous_snapshot["sections"]
+            else:
+                snapshot["sections"] = tools.section_index(snapshot.get("text", ""))
+        if previous_snapshot is not None and "sections" not in previous_snapshot:
+            # Snapshots stored before section indexing was enabled
+            previous_snapshot["sections"] = tools.section_index(previous_snapshot.get("text", ""))
+    
     def analyze_changes(self, snapshot: Dict, previous_snapshot: Optional[Dict] = None) -> Dict:
         """
         Analyze changes in a snapshot compared to previous version.
         
+        The snapshot is then stored in the version history as the
+        latest version of its source.
+        
         Args:
             snapshot: Current snapshot (from Agent 2)
-            previous_snapshot: Previous version (None for first fetch)
+            previous_snapshot: Previous version (default: latest version of
+                the source in the version history; None there = first fetch)
             
         Returns:
             Change analysis result
         """
+        source_id = self._source_id(snapshot)
+        if previous_snapshot is None and source_id:
+            previous_snapshot = self.previous_version(source_id)
+        
+        result = self._analyze(snapshot, previous_snapshot)
+        self._record_version(snapshot, previous_snapshot)
+        self._flag_duplicates(snapshot, previous_snapshot, result)
+        return result
+    
+    def _wants_duplicate_check(self, result: Dict) -> bool:
+        """Only new content (first fetch or changed) is checked"""
+        return self.duplicate_index is not None and bool(
+            result.get("is_first_fetch") or result.get("change_detected")
+        )
+    
+    @staticmethod
+    def _duplicate_inputs(snapshot: Dict, previous_snapshot: Optional[Dict]) -> Tuple:
+        """(sections, previous sections, document signature) for find_near_duplicates"""
+        text = snapshot.get("text", "")
+        sections = snapshot.get("sections") or tools.section_index(text)
+        previous_sections = None
+        if previous_snapshot is not None:
+            previous_sections = previous_snapshot.get("sections") or tools.section_index(
+                previous_snapshot.get("text", "")
+            )
+        return sections, previous_sections, tools.minhash_signature(text)
+    
+    def _flag_duplicates(
+        self,
+        snapshot: Dict,
+        previous_snapshot: Optional[Dict],
+        result: Dict,
+        inputs: Optional[Tuple] = None,
+    ) -> None:
+        """
+        Mark new or changed content already processed for another source.
+        
+        Sets near_duplicate_of / duplicate_sections on the result; a
+        near-duplicate document gets skip_llm_extraction so Agent 4 links
+        to the earlier extraction instead of running it again.
+        """
+        if not self._wants_duplicate_check(result):
+            return
+        
+        sections, previous_sections, document_signature = (
+            inputs or self._duplicate_inputs(snapshot, previous_snapshot)
+        )
+        duplicates = tools.find_near_duplicates(
+            self.duplicate_index,
+            snapshot.get("snapshot_id"),
+            self._source_id(snapshot),
+            snapshot.get("text", ""),
+            sections,
+            previous_sections,
+            document_signature=document_signature,
+            threshold=self.duplicate_threshold,
+        )
+        result["near_duplicate_of"] = duplicates["near_duplicate_of"]
+        result["duplicate_sections"] = duplicates["duplicate_sections"][:20]
+        result["skip_llm_extraction"] = duplicates["near_duplicate_of"] is not None
+    
+    def _analyze(self, snapshot: Dict, previous_snapshot: Optional[Dict]) -> Dict:
+        """Change analysis of snapshot against previous_snapshot (no history access)"""
+        changes = self._compare(snapshot, previous_snapshot)
+        if not isinstance(changes, _Changes):
+            return changes
+        return self._classify(changes, self._semantic_diff(snapshot, previous_snapshot, changes))
+    
+    def _compare(self, snapshot: Dict, previous_snapshot: Optional[Dict]):
+        """
+        Text and structural comparison (everything but the embeddings).
+        
+        Returns:
+            The final result for a first fetch or an unchanged snapshot,
+            else _Changes for _classify
+        """
         snapshot_id = snapshot.get("snapshot_id")
         source = snapshot.get("source", "unknown")
         
         print(f"\n[INFO] Analyzing changes: {snapshot_id}")
         print(f"  Source: {source}")
         
+        if self.section_index:
+            self._index_sections(snapshot, previous_snapshot)
+        
         # If no previous version, mark as first fetch
         if previous_snapshot is None:
             print("  Status: FIRST FETCH (no comparison)")
@@ -75,18 +262,31 @@ class DiffAgent:
         # Perform diff analysis
         print("  Status: CHANGES DETECTED - analyzing...")
         
+        # One diff, shared by every analysis below
+        diff = tools.compute_diff(
+            previous_text,
+            current_text,
+            previous_snapshot.get("sections") if self.section_index else None,
+            snapshot.get("sections") if self.section_index else None
+        )
+        
         # Text diff
-        diff_result = tools.text_diff(previous_text, current_text)
+        diff_result = tools.text_diff(previous_text, current_text, diff=diff)
         
-        # Structural diff (if HTML available)
+        # Structural diff: DOM Merkle fingerprints from Agent 1 when both
+        # snapshots have them, else parse raw HTML if available
         structural_diff = {"has_structural_change": False}
-        # Note: Would need raw_html from snapshot for full structural diff
-        
-        # Semantic similarity
-        similarity = tools.semantic_similarity(previous_text, current_text)
-        
-        # Classify severity
-        severity = tools.classify_change_severity(diff_result, similarity)
+        if snapshot.get("dom_merkle") and previous_snapshot.get("dom_merkle"):
+            structural_diff = tools.structural_diff_merkle(
+                previous_snapshot["dom_merkle"],
+                snapshot["dom_merkle"],
+                load=self._load_blob
+            )
+        elif snapshot.get("raw_html") and previous_snapshot.get("raw_html"):
+            structural_diff = tools.structural_diff_html(
+                previous_snapshot["raw_html"],
+                snapshot["raw_html"]
+            )
         
         # Classify change types
         change_types = tools.classify_change_type(diff_result, structural_diff)
@@ -95,27 +295,66 @@ class DiffAgent:
         changed_sections = tools.extract_changed_sections(
             previous_text,
             current_text,
-            context_lines=2
+            context_lines=2,
+            diff=diff
         )
         
         # Detect new obligations
-        new_obligations = tools.detect_new_obligations(previous_text, current_text)
+        new_obligations = tools.detect_new_obligations(previous_text, current_text, diff=diff)
         
-        # Generate summary
-        summary = tools.generate_change_summary(diff_result, severity, change_types)
+        # Sections for the semantic diff
+        previous_sections = previous_snapshot.get("sections")
+        if previous_sections is None:
+            previous_sections = tools.section_index(previous_text)
+        sections = snapshot.get("sections")
+        if sections is None:
+            sections = tools.section_index(current_text)
+        
+        return _Changes(
+            snapshot_id=snapshot_id,
+            diff_result=diff_result,
+            change_types=change_types,
+            changed_sections_count=len(changed_sections),
+            new_obligations=new_obligations,
+            change_hash=tools.compute_change_hash(previous_hash, current_hash),
+            previous_sections=previous_sections,
+            sections=sections,
+        )
+    
+    def _semantic_diff(self, snapshot: Dict, previous_snapshot: Dict, changes: "_Changes") -> Dict:
+        """
+        Semantic similarity, section by section: only changed sections are
+        embedded, and embeddings are cached by section hash
+        """
+        return tools.semantic_section_diff(
+            previous_snapshot.get("text", ""),
+            snapshot.get("text", ""),
+            changes.previous_sections,
+            changes.sections,
+            embedding_cache=self.embedding_cache
+        )
+    
+    def _classify(self, changes: "_Changes", semantic: Dict) -> Dict:
+        """Final result for a changed snapshot, from _compare and _semantic_diff"""
+        diff_result = changes.diff_result
+        new_obligations = changes.new_obligations
+        similarity = semantic["similarity"]
+        
+        # Classify severity
+        severity = tools.classify_change_severity(diff_result, similarity)
         
-        # Compute change hash
-        change_hash = tools.compute_change_hash(previous_hash, current_hash)
+        # Generate summary
+        summary = tools.generate_change_summary(diff_result, severity, changes.change_types)
         
         # Determine if HITL required
         hitl_required = severity in ["CRITICAL", "MAJOR"] or len(new_obligations) > 0
         
         result = {
-            "snapshot_id": snapshot_id,
+            "snapshot_id": changes.snapshot_id,
             "change_detected": True,
             "is_first_fetch": False,
             "severity": severity,
-            "change_types": change_types,
+            "change_types": changes.change_types,
             "diff_stats": {
                 "similarity_ratio": diff_result["similarity_ratio"],
                 "added_lines": diff_result["added_lines"],
@@ -123,10 +362,11 @@ class DiffAgent:
                 "total_changes": diff_result["total_changes"]
             },
             "semantic_similarity": similarity,
-            "changed_sections_count": len(changed_sections),
+            "semantic_changes": semantic["semantic_changes"][:20],
+            "changed_sections_count": changes.changed_sections_count,
             "new_obligations_detected": len(new_obligations),
             "new_obligations": new_obligations,
-            "change_hash": change_hash,
+            "change_hash": changes.change_hash,
             "summary": summary,
             "hitl_required": hitl_required,
             "analyzed_at": datetime.utcnow().isoformat() + "Z"
@@ -148,9 +388,14 @@ class DiffAgent:
         """
         Analyze changes for a batch of snapshots.
         
+        With batch_workers > 1, sources are analyzed in a process pool
+        (see _analyze_parallel); results and aggregates are the same as
+        in serial mode.
+        
         Args:
             current_snapshots: List of current snapshots (from Agent 2)
-            previous_snapshots: List of previous snapshots (None for first run)
+            previous_snapshots: List of previous snapshots (None: use the
+                version history)
             
         Returns:
             Batch analysis result
@@ -165,23 +410,20 @@ class DiffAgent:
                 if source:
                     previous_by_source[source] = snap
         
-        results = []
-        
-        for current_snap in current_snapshots:
-            try:
-                source = current_snap.get("source")
-                previous_snap = previous_by_source.get(source)
-                
-                analysis = self.analyze_changes(current_snap, previous_snap)
-                results.append(analysis)
-                
-            except Exception as e:
-                print(f"[ERROR] Analysis failed for {current_snap.get('snapshot_id')}: {e}")
-                results.append({
-                    "snapshot_id": current_snap.get("snapshot_id"),
-                    "error": str(e),
-                    "hitl_required": True
-                })
+        if self.batch_workers > 1 and len(current_snapshots) > 1:
+            results = self._analyze_parallel(current_snapshots, previous_by_source)
+        else:
+            results = []
+            for current_snap in current_snapshots:
+                try:
+                    source = current_snap.get("source")
+                    previous_snap = previous_by_source.get(source)
+                    
+                    analysis = self.analyze_changes(current_snap, previous_snap)
+                    results.append(analysis)
+                    
+                except Exception as e:
+                    results.append(_error_result(current_snap, e))
         
         # Aggregate statistics
         total_changes = sum(1 for r in results if r.get("change_detected", False))
@@ -210,3 +452,269 @@ class DiffAgent:
         print(f"  HITL Required: {hitl_count}")
         
         return output
+    
+    def _analyze_parallel(self, current_snapshots: List[Dict], previous_by_source: Dict) -> List[Dict]:
+        """
+        Analyze a batch across a process pool.
+        
+        Snapshots are grouped by source; each group is analyzed in order in
+        one worker, so a source seen twice in a batch is compared with
+        itself exactly as in serial mode. The version history stays in this
+        process: previous versions are read before a group is submitted
+        and new versions are recorded, in input order, when it completes.
+        Workers do the text and structural comparison; the embeddings for
+        the semantic diff are computed here, so the model is loaded once
+        and the embedding cache is shared. Workers also compute MinHash
+        signatures; the duplicate index is queried and updated here, in
+        input order, once all groups are done.
+        
+        Large text fields are spooled to files and passed by path rather
+        than pickled, and at most 2 x batch_workers groups are in flight,
+        which bounds memory to those groups' texts.
+        """
+        import multiprocessing
+        from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+        
+        groups: Dict[Any, List[int]] = {}
+        for index, snapshot in enumerate(current_snapshots):
+            # Snapshots without a source id are never chained or recorded
+            key = self._source_id(snapshot) or (None, index)
+            groups.setdefault(key, []).append(index)
+        
+        results: List[Optional[Dict]] = [None] * len(current_snapshots)
+        duplicate_inputs: Dict[int, Tuple] = {}
+        pending = {}
+        
+        def finish(future) -> None:
+            indices, history_previous, paths = pending.pop(future)
+            for path in paths:
+                os.remove(path)
+            try:
+                outcome = future.result()
+            except Exception as e:
+                outcome = [(i, _error_result(current_snapshots[i], e), None, None, None) for i in indices]
+            self._apply_group(current_snapshots, previous_by_source, history_previous, outcome, results)
+            duplicate_inputs.update((i, inputs) for i, _, _, _, inputs in outcome if inputs is not None)
+        
+        with tempfile.TemporaryDirectory(prefix="seraphs-diff-") as spool_dir, ProcessPoolExecutor(
+            max_workers=self.batch_workers,
+            mp_context=multiprocessing.get_context(),
+            initializer=_init_batch_worker,
+            initargs=(self.sources_config_path, self.section_index, self.duplicate_index is not None),
+        ) as pool:
+            for key, indices in groups.items():
+                while len(pending) >= 2 * self.batch_workers:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        finish(future)
+                
+                paths: List[str] = []
+                history_previous = None
+                try:
+                    if isinstance(key, str) and any(
+                        previous_by_source.get(current_snapshots[i].get("source")) is None
+                        for i in indices
+                    ):
+                        history_previous = self.previous_version(key)
+                    entries = [
+                        (
+                            i,
+                            _spool(current_snapshots[i], spool_dir, paths),
+                            _spool(previous_by_source.get(current_snapshots[i].get("source")), spool_dir, paths),
+                        )
+                        for i in indices
+                    ]
+                    future = pool.submit(_analyze_source_group, entries, _spool(history_previous, spool_dir, paths))
+                except Exception as e:
+                    for path in paths:
+                        os.remove(path)
+                    for i in indices:
+                        results[i] = _error_result(current_snapshots[i], e)
+                    continue
+                pending[future] = (indices, history_previous, paths)
+            
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(future)
+        
+        for index in sorted(duplicate_inputs):
+            if "error" in results[index]:
+                continue
+            try:
+                self._flag_duplicates(current_snapshots[index], None, results[index], duplicate_inputs[index])
+            except Exception as e:
+                results[index] = _error_result(current_snapshots[index], e)
+        
+        return results
+    
+    def _apply_group(
+        self,
+        current_snapshots: List[Dict],
+        previous_by_source: Dict,
+        history_previous: Optional[Dict],
+        outcome: List[Tuple],
+        results: List[Optional[Dict]],
+    ) -> None:
+        """
+        Store a worker's results and record versions as analyze_changes
+        would; changed snapshots get their semantic diff here
+        """
+        chained = history_previous
+        for index, result, sections, previous_sections, _ in outcome:
+            snapshot = current_snapshots[index]
+            explicit = previous_by_source.get(snapshot.get("source"))
+            previous = explicit if explicit is not None else chained
+            if isinstance(result, _Changes):
+                try:
+                    result = self._classify(result, self._semantic_diff(snapshot, previous, result))
+                except Exception as e:
+                    result = _error_result(snapshot, e)
+            results[index] = result
+            if "error" in result:
+                continue
+            
+            # Section indexes built in the worker stay with the snapshots
+            if sections is not None:
+                snapshot["sections"] = sections
+            if previous is not None and previous_sections is not None:
+                previous.setdefault("sections", previous_sections)
+            
+            try:
+                if self._record_version(snapshot, previous):
+                    chained = snapshot
+            except Exception as e:
+                results[index] = _error_result(snapshot, e)
+
+
+def _error_result(snapshot: Dict, error: Exception) -> Dict:
+    """analyze_batch entry for a snapshot whose analysis failed"""
+    print(f"[ERROR] Analysis failed for {snapshot.get('snapshot_id')}: {error}")
+    return {
+        "snapshot_id": snapshot.get("snapshot_id"),
+        "error": str(error),
+        "hitl_required": True
+    }
+
+
+# =============================================================================
+# Process-pool batch mode
+# =============================================================================
+
+class _Changes(NamedTuple):
+    """DiffAgent._compare result for a changed snapshot (before the semantic diff)"""
+    snapshot_id: Any
+    diff_result: Dict
+    change_types: List[str]
+    changed_sections_count: int
+    new_obligations: List[str]
+    change_hash: str
+    previous_sections: List[Dict]
+    sections: List[Dict]
+
+
+class _Spooled(NamedTuple):
+    """A large snapshot field written to a file for a worker process"""
+    path: str
+
+
+# Fields passed to workers by file path once they reach _SPOOL_MIN_CHARS
+_SPOOL_FIELDS = ("text", "raw_html")
+_SPOOL_MIN_CHARS = 64 * 1024
+
+
+def _spool(snapshot: Optional[Dict], directory: str, paths: List[str]) -> Optional[Dict]:
+    """Copy of snapshot with large text fields replaced by _Spooled files"""
+    if snapshot is None:
+        return None
+    payload = dict(snapshot)
+    for field in _SPOOL_FIELDS:
+        value = payload.get(field)
+        if isinstance(value, str) and len(value) >= _SPOOL_MIN_CHARS:
+            fd, path = tempfile.mkstemp(dir=directory)
+            paths.append(path)
+            with os.fdopen(fd, 'w', encoding='utf-8', errors='surrogatepass', newline='') as f:
+                f.write(value)
+            payload[field] = _Spooled(path)
+    return payload
+
+
+def _unspool(payload: Optional[Dict]) -> Optional[Dict]:
+    """Inverse of _spool (in the worker)"""
+    if payload is None:
+        return None
+    snapshot = dict(payload)
+    for field in _SPOOL_FIELDS:
+        value = snapshot.get(field)
+        if isinstance(value, _Spooled):
+            with open(value.path, encoding='utf-8', errors='surrogatepass', newline='') as f:
+                snapshot[field] = f.read()
+    return snapshot
+
+
+_worker_agent: Optional[DiffAgent] = None
+
+
+def _init_batch_worker(sources_config_path: Optional[str], section_index: bool, detect_duplicates: bool) -> None:
+    """
+    Process-pool initializer: one DiffAgent per worker.
+    
+    Workers never embed (see _analyze_source_group), so no worker loads
+    the sentence-transformer model.
+    """
+    global _worker_agent
+    _worker_agent = DiffAgent(
+        section_index=section_index,
+        # Versions are recorded, sections embedded and duplicates looked
+        # up by the parent process
+        version_history=InMemoryVersionHistory(),
+        embedding_cache=EmbeddingCache(),
+        detect_duplicates=detect_duplicates,
+        duplicate_index=InMemoryLSHIndex() if detect_duplicates else None,
+        sources_config_path=sources_config_path,
+    )
+
+
+def _analyze_source_group(
+    entries: List[Tuple[int, Dict, Optional[Dict]]],
+    history_previous: Optional[Dict],
+) -> List[Tuple]:
+    """
+    Process-pool worker: analyze one source's snapshots in batch order.
+    
+    Each entry is (batch index, snapshot, explicit previous snapshot or
+    None). Without an explicit previous, a snapshot is compared with the
+    source's latest version: history_previous, or an earlier snapshot of
+    this group that analyze_changes would have recorded.
+    
+    Changed snapshots are returned as _Changes; the parent finishes them
+    with the semantic diff.
+    
+    Returns:
+        (batch index, result or _Changes, snapshot sections, previous
+        sections, duplicate check inputs or None) per entry
+    """
+    agent = _worker_agent
+    chained = _unspool(history_previous)
+    outcome = []
+    for index, payload, explicit in entries:
+        snapshot = _unspool(payload)
+        previous = _unspool(explicit) if explicit is not None else chained
+        try:
+            result = agent._compare(snapshot, previous)
+        except Exception as e:
+            outcome.append((index, _error_result(snapshot, e), None, None, None))
+            continue
+        outcome.append((
+            index,
+            result,
+            snapshot.get("sections"),
+            previous.get("sections") if previous is not None else None,
+            agent._duplicate_inputs(snapshot, previous) if (
+                agent.duplicate_index is not None
+                and (isinstance(result, _Changes) or agent._wants_duplicate_check(result))
+            ) else None,
+        ))
+        if DiffAgent._should_record(snapshot, previous):
+            chained = snapshot
+    return outcome
@@ -4,10 +4,11 @@ Tools for detecting and classifying changes in regulatory content.
 """
 
 import hashlib
-import difflib
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
+from utils.line_diff import LineDiff, diff_lines, diff_texts
+
 
 # =============================================================================
 # TOOL 1: section_chunk
@@ -45,6 +46,26 @@ def section_chunk(text: str, chunk_size: int = 500) -> List[str]:
     return chunks
 
 
+def section_index(text: str) -> List[Dict]:
+    """
+    Split text into stable sections (headings, numbered clauses,
+    paragraphs) and hash each one.
+    
+    Unlike section_chunk, cut points depend only on nearby text, so
+    unchanged sections hash the same across versions. Store the result
+    with the snapshot and pass it to compute_diff.
+    
+    Args:
+        text: Text to index
+        
+    Returns:
+        List of {"hash", "start", "end"} sections (see utils.section_index)
+    """
+    from utils.section_index import section_index as build_index
+    
+    return build_index(text)
+
+
 # =============================================================================
 # TOOL 2: structural_diff_html
 # =============================================================================
@@ -53,8 +74,9 @@ def structural_diff_html(old_html: str, new_html: str) -> Dict:
     """
     Compare HTML structure (tags, hierarchy).
     
-    For MVP: Simple line-based diff.
-    Production: Parse DOM trees and compare structure.
+    Builds a Merkle fingerprint of each document (see utils.dom_merkle) and
+    compares those. When the snapshots already carry fingerprints from
+    Agent 1, call structural_diff_merkle directly and skip the parsing.
     
     Args:
         old_html: Previous HTML
@@ -63,28 +85,45 @@ def structural_diff_html(old_html: str, new_html: str) -> Dict:
     Returns:
         Structural diff result
     """
-    from bs4 import BeautifulSoup
+    from utils.dom_merkle import fingerprint_html
     
-    print("[INFO] Computing structural diff...")
+    return structural_diff_merkle(fingerprint_html(old_html), fingerprint_html(new_html))
+
+
+def structural_diff_merkle(old_fingerprint: Dict, new_fingerprint: Dict, load=None) -> Dict:
+    """
+    Compare two DOM Merkle fingerprints.
+    
+    Equal root hashes settle it without loading anything. Otherwise only
+    subtrees whose hashes differ are visited, and tag changes are counted
+    over the added / removed / replaced subtrees, so the cost follows the
+    size of the change rather than of the document.
     
-    # Parse HTML
-    old_soup = BeautifulSoup(old_html, 'html.parser')
-    new_soup = BeautifulSoup(new_html, 'html.parser')
+    Args:
+        old_fingerprint: Fingerprint (or fingerprint_summary) of the previous snapshot
+        new_fingerprint: Fingerprint (or fingerprint_summary) of the current snapshot
+        load: Blob store get(), for summaries that reference the full tree
+        
+    Returns:
+        Structural diff result (net elements added / removed per tag plus
+        changed node paths)
+    """
+    from utils.dom_merkle import diff_fingerprints, element_count, resolve_fingerprint
     
-    # Count tags
-    old_tags = [tag.name for tag in old_soup.find_all()]
-    new_tags = [tag.name for tag in new_soup.find_all()]
+    print("[INFO] Computing structural diff...")
     
-    # Compare tag counts
-    from collections import Counter
-    old_counts = Counter(old_tags)
-    new_counts = Counter(new_tags)
+    old_count = element_count(old_fingerprint)
+    new_count = element_count(new_fingerprint)
+    if old_fingerprint['hash'] == new_fingerprint['hash']:
+        node_diff = {'changes': [], 'nodes_visited': 1, 'tag_delta': {}}
+    else:
+        node_diff = diff_fingerprints(
+            resolve_fingerprint(old_fingerprint, load),
+            resolve_fingerprint(new_fingerprint, load),
+        )
     
-    # Find differences
-    added_tags = {tag: count for tag, count in new_counts.items() 
-                  if count > old_counts.get(tag, 0)}
-    removed_tags = {tag: count for tag, count in old_counts.items() 
-                    if count > new_counts.get(tag, 0)}
+    added_tags = {tag: count for tag, count in node_diff['tag_delta'].items() if count > 0}
+    removed_tags = {tag: -count for tag, count in node_diff['tag_delta'].items() if count < 0}
     
     has_structural_change = bool(added_tags or removed_tags)
     
@@ -92,8 +131,10 @@ def structural_diff_html(old_html: str, new_html: str) -> Dict:
         "has_structural_change": has_structural_change,
         "added_tags": added_tags,
         "removed_tags": removed_tags,
-        "old_tag_count": len(old_tags),
-        "new_tag_count": len(new_tags)
+        "old_tag_count": old_count,
+        "new_tag_count": new_count,
+        "changed_nodes": node_diff['changes'],
+        "nodes_visited": node_diff['nodes_visited'],
     }
 
 
@@ -101,40 +142,59 @@ def structural_diff_html(old_html: str, new_html: str) -> Dict:
 # TOOL 3: text_diff
 # =============================================================================
 
-def text_diff(old_text: str, new_text: str) -> Dict:
+def compute_diff(old_text: str, new_text: str,
+                 old_sections: Optional[List[Dict]] = None,
+                 new_sections: Optional[List[Dict]] = None) -> LineDiff:
+    """
+    Diff two texts once for all analyses below.
+    
+    Lines are interned and compared with a patience / Myers diff (see
+    utils.line_diff), so long regulations diff in near-linear time. Long
+    lines are compared sentence by sentence.
+    
+    With section indexes for both texts (see section_index), sections
+    with identical hashes are skipped and only changed sections are diffed.
+    
+    Args:
+        old_text: Previous text
+        new_text: Current text
+        old_sections: section_index(old_text), optional
+        new_sections: section_index(new_text), optional
+        
+    Returns:
+        LineDiff (segments + opcodes), to pass as diff= to text_diff,
+        extract_changed_sections and detect_new_obligations
+    """
+    if old_sections is not None and new_sections is not None:
+        from utils.section_index import diff_sections
+        return diff_sections(old_text, new_text, old_sections, new_sections)
+    return diff_texts(old_text, new_text)
+
+
+def text_diff(old_text: str, new_text: str, diff: Optional[LineDiff] = None) -> Dict:
     """
     Compute line-by-line text diff.
     
     Args:
         old_text: Previous text
         new_text: Current text
+        diff: Precomputed compute_diff() result (computed if omitted)
         
     Returns:
         Diff result with added/removed lines
     """
-    old_lines = old_text.splitlines()
-    new_lines = new_text.splitlines()
+    if diff is None:
+        diff = compute_diff(old_text, new_text)
     
-    # Use difflib to get diff
-    diff = list(difflib.unified_diff(
-        old_lines,
-        new_lines,
-        lineterm='',
-        n=0  # No context lines
-    ))
-    
-    # Count changes
-    added_lines = [line for line in diff if line.startswith('+') and not line.startswith('+++')]
-    removed_lines = [line for line in diff if line.startswith('-') and not line.startswith('---')]
-    
-    # Calculate similarity ratio
-    similarity = difflib.SequenceMatcher(None, old_text, new_text).ratio()
+    added_lines = ['+' + line for line in diff.added()]
+    removed_lines = ['-' + line for line in diff.removed()]
     
     return {
-        "similarity_ratio": round(similarity, 3),
+        "similarity_ratio": round(diff.ratio(), 3),
         "added_lines": len(added_lines),
         "removed_lines": len(removed_lines),
         "total_changes": len(added_lines) + len(removed_lines),
+        "changed_hunks": diff.hunk_count,
         "sample_added": added_lines[:3] if added_lines else [],
         "sample_removed": removed_lines[:3] if removed_lines else []
     }
@@ -177,6 +237,156 @@ def semantic_similarity(text1: str, text2: str) -> float:
         return round(similarity, 3)
 
 
+def _jaccard(text1: str, text2: str) -> float:
+    words1 = set(text1.lower().split())
+    words2 = set(text2.lower().split())
+    if not words1 or not words2:
+        return 0.0
+    return len(words1 & words2) / len(words1 | words2)
+
+
+def _section_label(text: str, position: int) -> str:
+    """Clause number / heading a section starts with, else its position"""
+    import re
+    
+    match = re.match(
+        r'((?:CHAPTER|PART|SECTION|ANNEX|SCHEDULE|APPENDIX|ARTICLE|Chapter|Part|Section|'
+        r'Annex|Schedule|Appendix|Article)\s+[0-9IVXLC]+|\d{1,4}(?:\.\d{1,3})*[.)])',
+        text
+    )
+    return match.group(1) if match else f"section {position + 1}"
+
+
+def semantic_section_diff(
+    old_text: str,
+    new_text: str,
+    old_sections: Optional[List[Dict]] = None,
+    new_sections: Optional[List[Dict]] = None,
+    embedding_cache=None,
+    drift_threshold: float = 0.9,
+    max_candidates: int = 5,
+) -> Dict:
+    """
+    Semantic similarity at section granularity.
+    
+    Sections with identical hashes count as identical and are never
+    embedded. Changed sections are embedded (cached by section hash, so
+    the previous version's sections were normally embedded on the last
+    run) and each new section is scored against the closest old section
+    it replaced. Falls back to Jaccard per section without
+    sentence-transformers.
+    
+    Args:
+        old_text: Previous text
+        new_text: Current text
+        old_sections: section_index(old_text) (computed if omitted)
+        new_sections: section_index(new_text) (computed if omitted)
+        embedding_cache: Optional utils.embedding_cache.EmbeddingCache
+        drift_threshold: Sections scoring below this are reported
+        max_candidates: Old sections (around the same position) each new
+            section is compared with in a large replaced block
+    
+    Returns:
+        similarity (0.0-1.0, weighted by section length), semantic_changes
+        (section_id / similarity_score / semantic_drift, schemas.events
+        SemanticChange), sections_changed, embedded
+    """
+    if old_sections is None:
+        old_sections = section_index(old_text)
+    if new_sections is None:
+        new_sections = section_index(new_text)
+    
+    old_chunks = [old_text[s["start"]:s["end"]].strip() for s in old_sections]
+    new_chunks = [new_text[s["start"]:s["end"]].strip() for s in new_sections]
+    by_hash = diff_lines([s["hash"] for s in old_sections], [s["hash"] for s in new_sections])
+    
+    # (old index, new index) pairs to score, plus unmatched sections
+    pairs: List[Tuple[int, int]] = []
+    added: List[int] = []
+    removed: List[int] = []
+    for tag, i1, i2, j1, j2 in by_hash.opcodes:
+        if tag == 'insert':
+            added.extend(range(j1, j2))
+        elif tag == 'delete':
+            removed.extend(range(i1, i2))
+        elif tag == 'replace':
+            for j in range(j1, j2):
+                # Old sections near the same relative position in the block
+                center = i1 + (j - j1) * (i2 - i1) // (j2 - j1)
+                low = max(i1, center - max_candidates // 2)
+                high = min(i2, low + max_candidates)
+                pairs.extend((i, j) for i in range(low, high))
+    
+    embedded = 0
+    scores: Dict[Tuple[int, int], float] = {}
+    if pairs:
+        try:
+            from utils.semantic_similarity import TRANSFORMERS_AVAILABLE, get_similarity_engine
+        except ImportError:
+            TRANSFORMERS_AVAILABLE = False
+        engine = get_similarity_engine() if TRANSFORMERS_AVAILABLE else None
+        
+        if engine is not None and engine.model is not None:
+            chunks = {}
+            for i, j in pairs:
+                chunks[old_sections[i]["hash"]] = old_chunks[i]
+                chunks[new_sections[j]["hash"]] = new_chunks[j]
+            vectors = engine.embed_chunks(chunks, embedding_cache)
+            embedded = len(chunks)
+            for i, j in pairs:
+                cosine = float(vectors[old_sections[i]["hash"]] @ vectors[new_sections[j]["hash"]])
+                scores[(i, j)] = (cosine + 1) / 2
+        else:
+            for i, j in pairs:
+                scores[(i, j)] = _jaccard(old_chunks[i], new_chunks[j])
+    
+    # Best old match per new section; old sections nobody matched were removed
+    best: Dict[int, Tuple[float, int]] = {}
+    for (i, j), score in scores.items():
+        if j not in best or score > best[j][0]:
+            best[j] = (score, i)
+    matched_old = {i for _, i in best.values()}
+    removed.extend(i for i, _ in scores if i not in matched_old)
+    removed = sorted(set(removed))
+    
+    changes = []
+    for j, (score, _) in best.items():
+        if score < drift_threshold:
+            changes.append({
+                "section_id": _section_label(new_chunks[j], j),
+                "similarity_score": round(score, 3),
+                "semantic_drift": "changed",
+            })
+    for j in added:
+        changes.append({"section_id": _section_label(new_chunks[j], j),
+                        "similarity_score": 0.0, "semantic_drift": "added"})
+    for i in removed:
+        changes.append({"section_id": _section_label(old_chunks[i], i),
+                        "similarity_score": 0.0, "semantic_drift": "removed"})
+    changes.sort(key=lambda change: change["similarity_score"])
+    
+    # Length-weighted: unchanged sections 1.0, changed ones their score,
+    # added / removed ones 0
+    total = sum(len(chunk) for chunk in new_chunks) + sum(len(old_chunks[i]) for i in removed)
+    if not total:
+        similarity = 1.0
+    else:
+        unchanged = sum(
+            len(new_chunks[j])
+            for tag, _, _, j1, j2 in by_hash.opcodes if tag == 'equal'
+            for j in range(j1, j2)
+        )
+        changed = sum(len(new_chunks[j]) * score for j, (score, _) in best.items())
+        similarity = (unchanged + changed) / total
+    
+    return {
+        "similarity": round(similarity, 3),
+        "semantic_changes": changes,
+        "sections_changed": len(best) + len(added) + len(removed),
+        "embedded": embedded,
+    }
+
+
 # =============================================================================
 # TOOL 5: classify_change_severity
 # =============================================================================
@@ -214,7 +424,8 @@ def classify_change_severity(diff_result: Dict, similarity: float) -> str:
 # TOOL 6: extract_changed_sections
 # =============================================================================
 
-def extract_changed_sections(old_text: str, new_text: str, context_lines: int = 2) -> List[Dict]:
+def extract_changed_sections(old_text: str, new_text: str, context_lines: int = 2,
+                             diff: Optional[LineDiff] = None) -> List[Dict]:
     """
     Extract sections that changed with context.
     
@@ -222,32 +433,26 @@ def extract_changed_sections(old_text: str, new_text: str, context_lines: int =
         old_text: Previous text
         new_text: Current text
         context_lines: Lines of context around changes
+        diff: Precomputed compute_diff() result (computed if omitted)
         
     Returns:
-        List of changed sections
+        List of changed sections (one per hunk)
     """
-    old_lines = old_text.splitlines()
-    new_lines = new_text.splitlines()
-    
-    differ = difflib.Differ()
-    diff = list(differ.compare(old_lines, new_lines))
+    if diff is None:
+        diff = compute_diff(old_text, new_text)
     
-    # Find change locations
     changes = []
-    i = 0
-    while i < len(diff):
-        line = diff[i]
-        if line.startswith('+ ') or line.startswith('- '):
-            # Found a change
-            start = max(0, i - context_lines)
-            end = min(len(diff), i + context_lines + 1)
-            
-            change_context = diff[start:end]
-            changes.append({
-                "location": i,
-                "context": [l[2:] for l in change_context if not l.startswith('?')]
-            })
-        i += 1
+    for hunk in diff.hunks(context_lines):
+        context = []
+        for tag, i1, i2, j1, j2 in hunk:
+            if tag in ('equal', 'delete', 'replace'):
+                context.extend(diff.old[i1:i2])
+            if tag in ('insert', 'replace'):
+                context.extend(diff.new[j1:j2])
+        changes.append({
+            "location": hunk[0][3],  # first line of the hunk in the new text
+            "context": context
+        })
     
     print(f"[INFO] Found {len(changes)} changed sections")
     return changes[:10]  # Return top 10
@@ -257,29 +462,34 @@ def extract_changed_sections(old_text: str, new_text: str, context_lines: int =
 # TOOL 7: detect_new_obligations
 # =============================================================================
 
-def detect_new_obligations(old_text: str, new_text: str) -> List[str]:
+def detect_new_obligations(old_text: str, new_text: str,
+                           diff: Optional[LineDiff] = None) -> List[str]:
     """
     Detect new regulatory obligations in text.
     
-    Looks for keywords like "must", "shall", "required", etc.
+    Looks for keywords like "must", "shall", "required", etc. in added
+    lines; lines that were only moved are ignored.
     Production: Use LLM to extract obligations.
     
     Args:
         old_text: Previous text
         new_text: Current text
+        diff: Precomputed compute_diff() result (computed if omitted)
         
     Returns:
         List of potential new obligations
     """
+    if diff is None:
+        diff = compute_diff(old_text, new_text)
+    
     obligation_keywords = ['must', 'shall', 'required', 'mandatory', 'obligated']
     
-    old_lines = set(old_text.lower().splitlines())
-    new_lines = set(new_text.lower().splitlines())
+    removed = {line.lower() for line in diff.removed()}
     
     # Find new lines with obligation keywords
     new_obligations = []
-    for line in (new_lines - old_lines):
-        if any(keyword in line for keyword in obligation_keywords):
+    for line in dict.fromkeys(line.lower() for line in diff.added()):
+        if line not in removed and any(keyword in line for keyword in obligation_keywords):
             new_obligations.append(line.strip())
     
     print(f"[INFO] Detected {len(new_obligations)} potential new obligations")
@@ -371,6 +581,8 @@ def generate_change_summary(diff_result: Dict, severity: str, change_types: List
         summary_parts.append(f"{diff_result['added_lines']} lines added.")
     if diff_result["removed_lines"] > 0:
         summary_parts.append(f"{diff_result['removed_lines']} lines removed.")
+    if diff_result.get("changed_hunks"):
+        summary_parts.append(f"{diff_result['changed_hunks']} changed sections.")
     
     # Types
     type_str = ", ".join(change_types)
@@ -380,3 +592,133 @@ def generate_change_summary(diff_result: Dict, severity: str, change_types: List
     summary_parts.append(f"Similarity to previous version: {diff_result['similarity_ratio']*100:.1f}%.")
     
     return " ".join(summary_parts)
+
+
+# =============================================================================
+# TOOL 11: find_near_duplicates
+# =============================================================================
+
+# Sections shorter than this are headings / boilerplate that match everywhere
+MIN_DUPLICATE_WORDS = 20
+
+_minhasher = None
+
+
+def minhash_signature(text: str):
+    """
+    MinHash signature of a text (see utils.minhash).
+    
+    Returns:
+        uint32 numpy array, or None for text without words
+    """
+    global _minhasher
+    if _minhasher is None:
+        from utils.minhash import MinHasher
+        _minhasher = MinHasher()
+    return _minhasher.signature(text)
+
+
+def _other_source(meta: Dict, source: Optional[str]) -> bool:
+    """Whether an index entry came from another source (copies count as their origin)"""
+    return source not in (meta.get("source"), meta.get("origin_source"))
+
+
+def _copy_meta(meta: Dict, match_meta: Dict) -> Dict:
+    """Index meta for content that duplicates match_meta's content"""
+    return {**meta, "origin_source": match_meta.get("origin_source") or match_meta.get("source")}
+
+
+def find_near_duplicates(
+    index,
+    snapshot_id: str,
+    source: Optional[str],
+    text: str,
+    sections: List[Dict],
+    previous_sections: Optional[List[Dict]] = None,
+    document_signature=None,
+    threshold: float = 0.9,
+) -> Dict:
+    """
+    Find content of a snapshot that was already processed for another
+    source, then add the snapshot to the index.
+    
+    The whole document is compared with earlier snapshots, and each new
+    section (hash not in previous_sections) with earlier sections. Matches
+    from the same source are ignored: those are its own versions, which
+    the diff already handles. Copies are indexed with the source they
+    were copied from, so a source's next version is not reported as a
+    duplicate of someone else's copy of it.
+    
+    Args:
+        index: utils.minhash.LSHIndex
+        snapshot_id: Snapshot being analyzed
+        source: Its source id
+        text: Its text
+        sections: section_index(text)
+        previous_sections: Sections of the source's previous version
+        document_signature: minhash_signature(text), if already computed
+        threshold: Minimum estimated Jaccard similarity
+        
+    Returns:
+        near_duplicate_of ({snapshot_id, source, similarity} or None) and
+        duplicate_sections ([{section_id, duplicate_of, similarity}])
+    """
+    meta = {"snapshot_id": snapshot_id, "source": source}
+    
+    # Whole document
+    near_duplicate_of = None
+    if document_signature is None:
+        document_signature = minhash_signature(text)
+    if document_signature is not None:
+        for match in index.query(document_signature, threshold):
+            if _other_source(match["meta"], source):
+                near_duplicate_of = {**match["meta"], "similarity": round(match["similarity"], 3)}
+                break
+        index.add(
+            f"snapshot:{snapshot_id}",
+            document_signature,
+            _copy_meta(meta, near_duplicate_of) if near_duplicate_of else meta,
+        )
+    
+    # New sections: exact hash matches first, MinHash for the rest
+    previous_hashes = {s["hash"] for s in previous_sections or []}
+    new_sections = [
+        (position, s) for position, s in enumerate(sections)
+        if s["hash"] not in previous_hashes
+    ]
+    known = index.meta_many(f"section:{s['hash']}" for _, s in new_sections)
+    
+    duplicates = []
+    to_add = []
+    for position, section in new_sections:
+        chunk = text[section["start"]:section["end"]].strip()
+        if len(chunk.split()) < MIN_DUPLICATE_WORDS:
+            continue
+        item_id = f"section:{section['hash']}"
+        
+        match = None
+        if item_id in known:
+            if _other_source(known[item_id], source):
+                match = {"meta": known[item_id], "similarity": 1.0}
+        else:
+            signature = minhash_signature(chunk)
+            for candidate in index.query(signature, threshold):
+                if _other_source(candidate["meta"], source):
+                    match = candidate
+                    break
+            to_add.append((item_id, signature, _copy_meta(meta, match["meta"]) if match else meta))
+        
+        if match is not None:
+            duplicates.append({
+                "section_id": _section_label(chunk, position),
+                "duplicate_of": match["meta"],
+                "similarity": round(match["similarity"], 3),
+            })
+    
+    index.add_many(to_add)
+    
+    print(f"[INFO] Near-duplicates: document={near_duplicate_of is not None}, sections={len(duplicates)}")
+    return {
+        "near_duplicate_of": near_duplicate_of,
+        "duplicate_sections": duplicates,
+    }
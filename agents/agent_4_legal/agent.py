@@ -5,8 +5,10 @@ Main agent logic for extracting obligations from regulatory changes.
 
 import json
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
 from agents.agent_4_legal import tools
+from utils.config import load_agent_settings
+from utils.extraction_cache import ExtractionResultCache
 
 
 class LegalAgent:
@@ -16,7 +18,20 @@ class LegalAgent:
     Extracts legal obligations from regulatory changes using LLM.
     """
     
-    def __init__(self, internal_policies: List[str] = None):
+    def __init__(
+        self,
+        internal_policies: List[str] = None,
+        result_cache: Optional[ExtractionResultCache] = None,
+        sources_config_path: Optional[str] = None,
+    ):
+        """
+        Args:
+            internal_policies: Policy ids obligations are mapped to
+            result_cache: Earlier results by snapshot id, for near-duplicates
+                (default: kept at settings.extraction_cache_path)
+            sources_config_path: sources.yaml whose settings select the
+                result cache when it is not passed in (None: in memory)
+        """
         self.internal_policies = internal_policies or [
             "KYC-Policy-v2.1",
             "AML-Policy-v3.0",
@@ -25,6 +40,10 @@ class LegalAgent:
             "Conduct-Guidelines-v1.8"
         ]
         self.confidence_threshold = 0.7
+        # snapshot_id -> result, so near-duplicates can link to earlier extractions
+        self.result_cache = result_cache or ExtractionResultCache(
+            load_agent_settings(sources_config_path).get('extraction_cache_path')
+        )
         print("[INFO] Agent 4 initialized (Legal Intelligence LLM)")
         print(f"  Internal policies loaded: {len(self.internal_policies)}")
     
@@ -44,6 +63,11 @@ class LegalAgent:
         print(f"\n[INFO] Extracting obligations: {snapshot_id}")
         print(f"  Source: {source}")
         
+        # Near-duplicate of a snapshot already processed (Agent 3): link to it
+        duplicate_of = change_analysis.get("near_duplicate_of")
+        if duplicate_of and change_analysis.get("skip_llm_extraction", True):
+            return self._remember(self._link_to_duplicate(snapshot_id, source, duplicate_of))
+        
         # If no changes detected, skip
         if not change_analysis.get("change_detected", False):
             print("  Status: NO CHANGES - Skipping extraction")
@@ -169,8 +193,39 @@ class LegalAgent:
         print(f"  Avg Confidence: {avg_confidence:.2f}")
         print(f"  HITL Required: {hitl_required}")
         
+        return self._remember(result)
+    
+    def _remember(self, result: Dict) -> Dict:
+        """Keep a result for later near-duplicates of its snapshot"""
+        if result.get("snapshot_id") is not None:
+            self.result_cache.put(result)
         return result
     
+    def _link_to_duplicate(self, snapshot_id: str, source: str, duplicate_of: Dict) -> Dict:
+        """
+        Result for a snapshot that near-duplicates an earlier one.
+        
+        Reuses the earlier obligations when they were extracted by this
+        agent; the LLM is not called either way.
+        """
+        earlier = self.result_cache.get(duplicate_of.get("snapshot_id")) or {}
+        obligations = earlier.get("obligations_extracted", [])
+        
+        print(f"  Status: NEAR-DUPLICATE of {duplicate_of.get('snapshot_id')} "
+              f"({duplicate_of.get('source')}, similarity {duplicate_of.get('similarity')}) - Skipping extraction")
+        
+        return {
+            "snapshot_id": snapshot_id,
+            "source": source,
+            "linked_to": duplicate_of,
+            "obligations_extracted": obligations,
+            "obligations_count": len(obligations),
+            "llm_confidence": earlier.get("llm_confidence", 1.0),
+            "hitl_required": earlier.get("hitl_required", False),
+            "analysis_summary": f"Near-duplicate of {duplicate_of.get('snapshot_id')} - linked to earlier extraction",
+            "analyzed_at": datetime.utcnow().isoformat() + "Z"
+        }
+    
     def _should_escalate_to_hitl(self, obligations: List[Dict], avg_confidence: float) -> bool:
         """Determine if human review is needed"""
         
@@ -8,6 +8,8 @@ import json
 from datetime import datetime
 from typing import Dict, List, Optional
 from utils.cardano_anchor import CardanoAnchor
+from utils.merkle import MerkleAccumulator
+from utils.proof_codec import encode_proof
 
 
 class ZKCardanoAgent:
@@ -20,10 +22,17 @@ class ZKCardanoAgent:
     
     def __init__(self):
         self.cardano = CardanoAnchor()
+        # Obligations anchored so far; append_obligations extends it
+        self.obligation_log = MerkleAccumulator()
         print("[INFO] Agent 9 initialized (ZK + Cardano)")
         print(f"  Cardano: {self.cardano.network}")
         print(f"  Status: {'Enabled' if self.cardano.enabled else 'Simulated'}")
     
+    @staticmethod
+    def obligation_digest(obligation: Dict) -> bytes:
+        """SHA-256 of an obligation's canonical JSON"""
+        return hashlib.sha256(json.dumps(obligation, sort_keys=True).encode()).digest()
+    
     def generate_merkle_root(self, obligations: List[Dict]) -> str:
         """
         Generate Merkle root from obligations.
@@ -36,33 +45,42 @@ class ZKCardanoAgent:
         """
         print(f"[ZK] Generating Merkle root for {len(obligations)} obligations...")
         
-        # Hash each obligation
-        hashes = []
-        for obl in obligations:
-            data = json.dumps(obl, sort_keys=True)
-            hash_obj = hashlib.sha256(data.encode())
-            hashes.append(hash_obj.hexdigest())
-        
-        # Build Merkle tree (simplified)
-        while len(hashes) > 1:
-            new_hashes = []
-            for i in range(0, len(hashes), 2):
-                if i + 1 < len(hashes):
-                    combined = hashes[i] + hashes[i+1]
-                else:
-                    combined = hashes[i] + hashes[i]
-                
-                new_hash = hashlib.sha256(combined.encode()).hexdigest()
-                new_hashes.append(new_hash)
-            
-            hashes = new_hashes
-        
-        merkle_root = hashes[0] if hashes else hashlib.sha256(b"empty").hexdigest()
+        merkle_root = MerkleAccumulator(
+            self.obligation_digest(obl) for obl in obligations
+        ).root_hex()
         
         print(f"[ZK] Merkle root: {merkle_root[:32]}...")
         
         return merkle_root
     
+    def append_obligations(self, obligations: List[Dict]) -> Dict:
+        """
+        Add obligations to the running obligation log.
+        
+        Only the new obligations are hashed (O(log n) each), so appending
+        through the day never rehashes what is already anchored.
+        
+        Returns:
+            {'merkle_root', 'leaves', 'leaf_indexes'}
+        """
+        indexes = [self.obligation_log.append(self.obligation_digest(obl)) for obl in obligations]
+        merkle_root = self.obligation_log.root_hex()
+        
+        print(f"[ZK] Obligation log: {len(self.obligation_log)} leaves, root {merkle_root[:32]}...")
+        
+        return {
+            "merkle_root": merkle_root,
+            "leaves": len(self.obligation_log),
+            "leaf_indexes": indexes,
+        }
+    
+    def prove_obligation(self, leaf_index: int) -> Dict:
+        """Inclusion proof for an obligation in the log's current root"""
+        return {
+            "merkle_root": self.obligation_log.root_hex(),
+            **self.obligation_log.proof(leaf_index).to_dict(),
+        }
+    
     def anchor_to_blockchain(
         self,
         merkle_root: str,
@@ -170,6 +188,16 @@ class ZKCardanoAgent:
         print(f"  Blockchain: Cardano {self.cardano.network}")
         
         return report
+    
+    @staticmethod
+    def export_audit_report(report: Dict) -> bytes:
+        """
+        Serialize an audit report for storage / transfer.
+        
+        Canonical CBOR with raw digests (utils.proof_codec); decode_proof()
+        returns the report exactly.
+        """
+        return encode_proof(report)
 
 
 # Future: ZK Proof functions (for Midnight integration)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: single-parse HTML stage vs. the old three-parse pipeline.
+
+Builds a synthetic multi-MB regulator listing page (navigation, scripts,
+a large circulars table, footer) and times:
+
+  old: extract_metadata + capture_dom_tree + list_links (3x BeautifulSoup)
+       + normalize_text over the raw HTML
+  new: analyze_html (one lxml parse + compiled XPath)
+
+Usage:
+    python benchmarks/bench_html_parse.py [--rows 20000] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.agent_1_ingestion import tools
+
+
+def build_page(rows: int) -> str:
+    """Build a regulator-style listing page with `rows` circulars"""
+    nav = ''.join(f'<li><a href="/menu/{i}">Menu item {i}</a></li>' for i in range(200))
+    table_rows = ''.join(
+        f'<tr><td>{i:05d}</td>'
+        f'<td><a href="/Scripts/NotificationUser.aspx?Id={i}">'
+        f'Master Direction No. {i} - Know Your Customer (KYC) Direction, 2016 '
+        f'(Updated as on {1 + i % 28:02d}.11.2025)</a></td>'
+        f'<td>Department of Regulation</td><td>Nov {1 + i % 28}, 2025</td></tr>'
+        for i in range(rows)
+    )
+    return (
+        '<!DOCTYPE html><html><head><title>Notifications - Reserve Bank of India</title>'
+        '<meta name="author" content="Reserve Bank of India">'
+        '<meta name="keywords" content="RBI, notifications, circulars">'
+        '<script>var banner = "' + 'x' * 50000 + '";</script>'
+        '<style>.table td { padding: 2px; }</style></head>'
+        f'<body><nav><ul>{nav}</ul></nav>'
+        f'<table class="tablebg">{table_rows}</table>'
+        '<footer>Copyright Reserve Bank of India. All rights reserved.</footer>'
+        '</body></html>'
+    )
+
+
+def old_pipeline(html: str, url: str) -> None:
+    tools.extract_metadata(html, 'text/html')
+    tools.capture_dom_tree(html)
+    tools.list_links(html, url)
+    tools.normalize_text(html)
+
+
+def new_pipeline(html: bytes, url: str) -> None:
+    tools.analyze_html(html, url)
+
+
+def best_of(fn, repeat: int, *args) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    url = "https://www.rbi.org.in/Scripts/NotificationUser.aspx"
+    html = build_page(args.rows)
+    html_bytes = html.encode('utf-8')
+
+    print(f"Page size: {len(html_bytes) / 1e6:.1f} MB ({args.rows} rows)")
+
+    old = best_of(old_pipeline, args.repeat, html, url)
+    new = best_of(new_pipeline, args.repeat, html_bytes, url)
+
+    print(f"  3x BeautifulSoup + normalize_text: {old:8.3f} s")
+    print(f"  analyze_html (single lxml parse):  {new:8.3f} s")
+    print(f"  Speedup: {old / new:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark: proof bundle size and speed, JSON text vs. compact CBOR.
+
+Builds a verify_batch-style proof bundle (per-snapshot TLS proof,
+certificate, consensus hashes, Merkle leaf index and inclusion proof)
+and compares:
+
+  json (indent=2, sort_keys)  - how reports are written today
+  json (compact, sort_keys)   - what store_proof_ipfs hashed before
+  cbor (utils.proof_codec)    - raw digests, stringrefs, canonical
+
+Usage:
+    python benchmarks/bench_proof_encoding.py [--snapshots 500] [--repeat 5]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.merkle import MerkleAccumulator
+from utils.proof_codec import decode_proof, encode_proof
+
+
+def digest(*parts) -> str:
+    return hashlib.sha256(':'.join(map(str, parts)).encode()).hexdigest()
+
+
+def build_bundle(snapshots: int) -> dict:
+    """A proof bundle for `snapshots` verified snapshots"""
+    hashes = [digest('snapshot', i) for i in range(snapshots)]
+    log = MerkleAccumulator(hashes)
+    root = log.root_hex()
+
+    verifications = []
+    for i, content_hash in enumerate(hashes):
+        cert = digest('cert', i % 5)
+        verifications.append({
+            "snapshot_id": f"snap-rbi-{i:05d}",
+            "verified": True,
+            "confidence_score": 1.0,
+            "tls_proof": {
+                "verified": True,
+                "method": "ingestion_tls_evidence",
+                "url": f"https://www.rbi.org.in/Scripts/NotificationUser.aspx?Id={i}",
+                "protocol": "TLSv1.3",
+                "cipher": "TLS_AES_256_GCM_SHA384",
+                "server_cert_fingerprint": cert,
+                "witness": digest(cert, content_hash),
+            },
+            "certificate": {
+                "valid": True,
+                "issuer": "commonName=Example CA",
+                "chain": [cert, digest('ca', 0)],
+            },
+            "consensus": {
+                "consensus_score": 1.0,
+                "hashes": [content_hash] * 3,
+                "majority_hash": content_hash,
+            },
+            "witness": digest('witness', i),
+            "hitl_required": False,
+            "merkle_leaf_index": i,
+            "merkle_proof": log.proof(i).to_dict(),
+            "verified_at": "2026-10-16T09:00:00Z",
+        })
+
+    return {
+        "verifications": verifications,
+        "merkle_tree": {"merkle_root": root, "leaves": snapshots},
+        "verified_at": "2026-10-16T09:00:00Z",
+    }
+
+
+def best_of(fn, repeat: int, *args) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--snapshots', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    bundle = build_bundle(args.snapshots)
+
+    codecs = {
+        "json indent=2": (
+            lambda b: json.dumps(b, indent=2, sort_keys=True).encode(),
+            lambda d: json.loads(d),
+        ),
+        "json compact": (
+            lambda b: json.dumps(b, sort_keys=True, separators=(',', ':')).encode(),
+            lambda d: json.loads(d),
+        ),
+        "cbor (proof_codec)": (encode_proof, decode_proof),
+    }
+
+    print(f"Proof bundle: {args.snapshots} verifications")
+    baseline = None
+    for name, (encode, decode) in codecs.items():
+        data = encode(bundle)
+        assert decode(data) == bundle, f"{name} does not round-trip"
+        baseline = baseline or len(data)
+        enc = best_of(encode, args.repeat, bundle)
+        dec = best_of(decode, args.repeat, data)
+        print(
+            f"  {name:20s} {len(data) / 1024:9.1f} KiB  ({baseline / len(data):4.1f}x smaller)"
+            f"  encode {enc * 1000:7.1f} ms  decode {dec * 1000:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark: text_diff engine, difflib vs. utils.line_diff.
+
+Builds regulation-style documents from 10 KB to 10 MB (numbered clauses,
+repeated boilerplate, blank lines), amends a handful of clauses, inserts
+and deletes a few, and times:
+
+  old: difflib.unified_diff over lines + SequenceMatcher(None, old, new).ratio()
+       on the full text (what text_diff did before)
+  new: utils.line_diff.diff_texts (interned lines, patience + capped Myers)
+
+The old engine is skipped above --old-max bytes (default 1 MB); it takes
+minutes there.
+
+Usage:
+    python benchmarks/bench_text_diff.py [--sizes 10e3,100e3,1e6,10e6] [--old-max 1e6]
+"""
+
+import argparse
+import difflib
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.line_diff import diff_texts
+
+
+def build_document(size: int, seed: int = 7) -> str:
+    """A master-direction style document of roughly `size` bytes"""
+    rng = random.Random(seed)
+    words = ("bank customer shall must account verification record period "
+             "regulated entity due diligence beneficial owner risk report").split()
+    lines = []
+    total = 0
+    clause = 0
+    while total < size:
+        clause += 1
+        if clause % 25 == 1:
+            lines.append(f"CHAPTER {clause // 25 + 1}")
+            lines.append("")
+        text = ' '.join(rng.choice(words) for _ in range(rng.randint(8, 30)))
+        lines.append(f"{clause}. {text.capitalize()}.")
+        if clause % 10 == 0:
+            lines.append("Provided that the above shall not apply to small accounts.")
+        lines.append("")
+        total += len(lines[-2]) + 2
+    return '\n'.join(lines)
+
+
+def amend(text: str, edits: int = 10, seed: int = 11) -> str:
+    """Change, insert and delete a few clauses"""
+    rng = random.Random(seed)
+    lines = text.split('\n')
+    for _ in range(edits):
+        i = rng.randrange(len(lines))
+        action = rng.random()
+        if action < 0.5:
+            lines[i] = lines[i] + " (amended)"
+        elif action < 0.8:
+            lines.insert(i, "New clause: regulated entities must report within 7 days.")
+        else:
+            del lines[i]
+    return '\n'.join(lines)
+
+
+def old_engine(old: str, new: str) -> None:
+    list(difflib.unified_diff(old.splitlines(), new.splitlines(), lineterm='', n=0))
+    difflib.SequenceMatcher(None, old, new).ratio()
+
+
+def new_engine(old: str, new: str) -> None:
+    diff = diff_texts(old, new)
+    diff.ratio()
+
+
+def timed(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', default='10e3,100e3,1e6,10e6')
+    parser.add_argument('--old-max', type=float, default=1e6)
+    args = parser.parse_args()
+
+    print(f"{'size':>10}  {'difflib':>10}  {'line_diff':>10}  speedup")
+    for size in (int(float(s)) for s in args.sizes.split(',')):
+        old = build_document(size)
+        new = amend(old)
+
+        new_time = timed(new_engine, old, new)
+        if size <= args.old_max:
+            old_time = timed(old_engine, old, new)
+            print(f"{len(old) / 1e3:8.0f}KB  {old_time:9.3f}s  {new_time:9.3f}s  {old_time / new_time:6.1f}x")
+        else:
+            print(f"{len(old) / 1e3:8.0f}KB  {'skipped':>10}  {new_time:9.3f}s")
+
+
+if __name__ == "__main__":
+    main()
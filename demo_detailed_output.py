@@ -24,13 +24,17 @@ print("\nPurpose: Fetch regulatory data from sources")
 print("Input: Source URLs")
 
 from agents.agent_1_ingestion.agent import IngestionAgent
+from schemas.events import EventEnvelope
 agent1 = IngestionAgent()
 
 source = {"name": "Reserve Bank of India", "url": "https://www.rbi.org.in", "type": "html"}
 print(f"\nFetching: {source['name']}")
 
 try:
-    snapshot = agent1.fetch_source(source)
+    result = agent1.fetch_source(source)
+    if not isinstance(result, EventEnvelope):
+        raise RuntimeError(f"no snapshot published ({result.value})")
+    snapshot = result.payload
     print(f"\n✓ Fetch successful!")
     print(f"\nOutput (Agent 1):")
     print(json.dumps({
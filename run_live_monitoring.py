@@ -30,6 +30,7 @@ try:
         # Agent 1: Fetch data
         print("▶ Agent 1: Fetching regulatory sources...")
         from agents.agent_1_ingestion.agent import IngestionAgent
+        from schemas.events import EventEnvelope
         agent1 = IngestionAgent()
         
         # Fetch from a few sources
@@ -42,8 +43,12 @@ try:
         for source in sources_to_fetch:
             try:
                 result = agent1.fetch_source(source)
-                snapshots.append(result)
-                print(f"  ✓ Fetched: {source['name']} ({len(result.get('content', {}).get('extracted_text_preview', ''))} chars)")
+                if not isinstance(result, EventEnvelope):
+                    print(f"  - {source['name']}: {result.value}")
+                    continue
+                snapshot = result.payload
+                snapshots.append(snapshot)
+                print(f"  ✓ Fetched: {source['name']} ({len(snapshot.get('content', {}).get('extracted_text', ''))} chars)")
             except Exception as e:
                 print(f"  ✗ Error fetching {source['name']}: {e}")
         
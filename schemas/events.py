@@ -63,11 +63,28 @@ class HashData(BaseModel):
     """Cryptographic hashes"""
     sha256: str
     md5: Optional[str] = None
+    region_sha256: Optional[str] = None  # listing region only (HTML sources)
 
 class StorageInfo(BaseModel):
     """Storage locations"""
-    ipfs_cid: str
+    ipfs_cid: str  # chunk manifest CID when chunked
     ipfs_gateway_url: HttpUrl
+    chunked: bool = False
+    chunk_hashes: List[str] = Field(default_factory=list)  # in document order
+
+class TLSEvidence(BaseModel):
+    """TLS session observed while fetching (see utils.http_client.tls_evidence)"""
+    host: str
+    protocol: Optional[str] = None
+    cipher: Optional[str] = None
+    peer_cert_sha256: str
+    cert_chain_sha256: List[str] = Field(default_factory=list)  # leaf first
+    subject: str = ""
+    issuer: str = ""
+    not_after: Optional[str] = None
+    subject_alt_names: List[str] = Field(default_factory=list)
+    verified: bool  # chain validated against the trust store during the fetch
+    captured_at: str
 
 class VersionInfo(BaseModel):
     """Version tracking"""
@@ -85,6 +102,7 @@ class IngestionSnapshotPayload(BaseModel):
     storage: StorageInfo
     metadata: Dict[str, Any] = Field(default_factory=dict)
     version_info: VersionInfo
+    tls_evidence: Optional[TLSEvidence] = None  # None for plain HTTP / RSS
 
 
 # =============================================================================
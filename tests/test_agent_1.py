@@ -4,8 +4,27 @@ Unit tests for Agent 1 (Discovery & Ingestion) tools.
 Tests all 15 tools with various scenarios including success and failure cases.
 """
 
+import asyncio
+import hashlib
+import json
+import sqlite3
+import time
+
+import httpx
+import PyPDF2
 import pytest
-from agents.agent_1_ingestion import tools
+import requests
+from agents.agent_1_ingestion import parsers, tools
+from agents.agent_1_ingestion.agent import FetchStatus
+from schemas.events import EventEnvelope, EventType
+from utils.blob_store import LocalBlobStore
+from utils import http_client
+from utils.chunk_store import GEAR, ChunkStore, chunk_boundaries
+from utils.config import HTTPConfig
+from utils.dom_merkle import build_fingerprint, decode_fingerprint, diff_fingerprints
+from utils.event_bus import EventBus
+from utils.page_text_cache import PageTextCache
+from utils.version_state import InMemoryVersionStateStore, SQLiteVersionStateStore, VersionState
 
 
 class TestFetchTools:
@@ -129,16 +148,404 @@ class TestHTMLParsing:
         
         assert tree is not None
         assert tree['tag'] == 'html'
+    
+    def test_analyze_html_matches_separate_tools(self):
+        """Test single-parse analysis agrees with the per-tool parsers"""
+        html = """
+        <html>
+            <head>
+                <title>RBI Circular</title>
+                <meta name="author" content="Reserve Bank of India">
+                <script>var banner = "rotating";</script>
+            </head>
+            <body>
+                <h1>Master Direction</h1>
+                <p>Banks <b>must</b> comply.</p>
+                <a href="/relative">Link 1</a>
+            </body>
+        </html>
+        """
+        
+        result = tools.analyze_html(html, "https://base.com")
+        
+        assert result['metadata'] == tools.extract_metadata(html, "text/html")
+        assert result['dom_tree'] == tools.capture_dom_tree(html)
+        assert result['links'] == tools.list_links(html, "https://base.com")
+        assert result['text'] == "Master Direction Banks must comply. Link 1"
+
+
+class TestSourceParsers:
+    """Test source-specific listing extraction"""
+    
+    PAGE = """
+    <html><body>
+        <nav><a href="/home">Home</a><a href="/about">About</a></nav>
+        <div class="banner">Visitors today: {visitors}</div>
+        <table class="tablebg">
+            <tr><td><a href="/Notification.aspx?Id=12">KYC Master Direction amended</a></td><td>Nov 28, 2025</td></tr>
+            <tr><td><a href="/Notification.aspx?Id=11">Priority Sector Lending</a></td><td>Nov 27, 2025</td></tr>
+        </table>
+        <footer>Last updated {visitors}</footer>
+    </body></html>
+    """
+    
+    def _parse(self, parser_name, html):
+        return parsers.get_parser(parser_name).parse(
+            tools.parse_html(html), "https://www.rbi.org.in/Scripts/NotificationUser.aspx"
+        )
+    
+    def test_rbi_listing_items(self):
+        """Test the RBI parser returns one structured item per circular"""
+        region = self._parse('rbi_notifications', self.PAGE.format(visitors=1))
+        
+        assert region.matched is True
+        assert region.items[0] == {
+            'title': "KYC Master Direction amended",
+            'link': "https://www.rbi.org.in/Notification.aspx?Id=12",
+            'date': "Nov 28, 2025",
+        }
+        assert len(region.items) == 2
+        assert "Visitors" not in region.text
+    
+    def test_region_hash_ignores_page_chrome(self):
+        """Test banner / footer changes do not change the region hash"""
+        first = self._parse('rbi_notifications', self.PAGE.format(visitors=1))
+        second = self._parse('rbi_notifications', self.PAGE.format(visitors=2))
+        
+        assert first.sha256 == second.sha256
+    
+    def test_unknown_parser_falls_back_to_generic(self):
+        """Test unknown parser names use generic_html, which skips nav/footer"""
+        region = self._parse('no_such_parser', self.PAGE.format(visitors=1))
+        
+        assert region.parser == 'generic_html'
+        assert [item['title'] for item in region.items] == [
+            "KYC Master Direction amended", "Priority Sector Lending",
+        ]
+
+
+class TestDomMerkle:
+    """Test hierarchical DOM fingerprints"""
+    
+    @staticmethod
+    def page(rows, banner="Welcome"):
+        body = ''.join(f"<tr><td>Circular {r}</td></tr>" for r in rows)
+        return (
+            f"<html><body><div class='banner'>{banner}</div>"
+            f"<table>{body}</table><script>var t = {len(rows)};</script></body></html>"
+        )
+    
+    def test_identical_documents_share_root_hash(self):
+        """Test equal content gives equal hashes and scripts are ignored"""
+        first = build_fingerprint(tools.parse_html(self.page(range(5))))
+        second = build_fingerprint(tools.parse_html(self.page(range(5)).replace("var t = 5", "var t = 6")))
+        
+        assert first['hash'] == second['hash']
+    
+    def test_inserted_row_is_localized(self):
+        """Test an inserted row is one 'added' node and unchanged subtrees are skipped"""
+        old = build_fingerprint(tools.parse_html(self.page(range(200))))
+        new = build_fingerprint(tools.parse_html(self.page([-1] + list(range(200)))))
+        
+        result = diff_fingerprints(old, new)
+        
+        assert result['changes'] == [{'op': 'added', 'path': '/html/body[0]/table[1]/tr[0]', 'tag': 'tr'}]
+        assert result['nodes_visited'] < 10
+        assert result['tag_delta'] == {'tr': 1, 'td': 1}
+    
+    def test_text_change_is_modified(self):
+        """Test changed text inside an element is reported on that element"""
+        old = build_fingerprint(tools.parse_html(self.page(range(3))))
+        new = build_fingerprint(tools.parse_html(self.page(range(3), banner="Holiday notice")))
+        
+        result = diff_fingerprints(old, new)
+        
+        assert result['changes'] == [{'op': 'modified', 'path': '/html/body[0]/div[0]', 'tag': 'div'}]
+
+
+class TestClaimCheck:
+    """Test large snapshot payloads are moved off the event bus"""
+    
+    class FakeRedis:
+        def __init__(self):
+            self.messages = []
+        
+        def xadd(self, stream, fields):
+            self.messages.append(fields)
+            return f"{len(self.messages)}-0"
+        
+        def xack(self, *args):
+            pass
+    
+    def _bus(self, tmp_path, threshold=1024):
+        bus = EventBus(blob_store=LocalBlobStore(str(tmp_path / "blobs")), claim_check_threshold=threshold)
+        bus.redis_client = self.FakeRedis()
+        return bus
+    
+    @staticmethod
+    def _event(text):
+        return EventEnvelope(
+            event_id="evt-1",
+            event_type=EventType.INGESTION_SNAPSHOT,
+            payload={'snapshot_id': "snap-rbi-1", 'content': {'extracted_text': text}},
+            source_agent="agent-1-ingestion",
+            trace_id="trace-1",
+        )
+    
+    def test_large_payload_is_claim_checked(self, tmp_path):
+        """Test the stream message carries a reference, not the payload"""
+        bus = self._bus(tmp_path)
+        bus.publish(self._event("KYC " * 10000))
+        
+        message = json.loads(bus.redis_client.messages[0]['data'])
+        claim = message['metadata']['claim_check']
+        
+        assert len(bus.redis_client.messages[0]['data']) < 1024
+        assert message['payload'] == {'snapshot_id': "snap-rbi-1"}
+        assert claim['store'] == 'local' and claim['size'] > 40000
+    
+    def test_consumer_resolves_payload(self, tmp_path):
+        """Test subscribers get the full payload back, fetched once"""
+        bus = self._bus(tmp_path)
+        bus.publish(self._event("KYC " * 10000))
+        received = []
+        
+        for _ in range(2):
+            bus._process_message("1-0", bus.redis_client.messages[0], "g", None, received.append)
+        
+        assert received[0].payload['content']['extracted_text'] == "KYC " * 10000
+        assert 'claim_check' not in received[0].metadata
+        assert len(bus._claim_cache) == 1
+    
+    def test_small_payload_stays_inline(self, tmp_path):
+        """Test payloads under the threshold are published unchanged"""
+        bus = self._bus(tmp_path)
+        bus.publish(self._event("short"))
+        
+        message = json.loads(bus.redis_client.messages[0]['data'])
+        
+        assert message['payload']['content']['extracted_text'] == "short"
+        assert 'claim_check' not in message['metadata']
+
+
+def make_pdf(page_texts, form_text=None):
+    """
+    Build a minimal text PDF with one line of Helvetica per page.
+    
+    With form_text, every page also draws a shared Form XObject holding
+    that line.
+    """
+    n = len(page_texts)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        ("<< /Type /Pages /Kids [%s] /Count %d >>" % (
+            " ".join(f"{4 + 2 * i} 0 R" for i in range(n)), n)).encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    form_ref = f"{4 + 2 * n} 0 R"
+    for i, text in enumerate(page_texts):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+        xobjects = ""
+        if form_text is not None:
+            stream += b" /X1 Do"
+            xobjects = f" /XObject << /X1 {form_ref} >>"
+        objects.append((
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >>{xobjects} >> /Contents {5 + 2 * i} 0 R >>"
+        ).encode())
+        objects.append(
+            b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+        )
+    if form_text is not None:
+        stream = f"BT /F1 12 Tf 72 600 Td ({form_text}) Tj ET".encode()
+        objects.append(
+            b"<< /Type /XObject /Subtype /Form /BBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Length %d >>\nstream\n" % len(stream)
+            + stream + b"\nendstream"
+        )
+    
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for num, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % num + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, xref)
+    return bytes(out)
 
 
 class TestPDFProcessing:
     """Test PDF processing tools"""
     
-    def test_extract_text_pdf_placeholder(self):
-        """Test PDF text extraction (requires actual PDF for full test)"""
-        # This is a minimal test - full testing requires sample PDF
-        # In production, create fixture PDFs for testing
-        pass
+    PAGES = [f"Clause {i} banks shall comply" for i in range(20)]
+    
+    def test_extract_text_pdf(self):
+        """Test serial extraction joins pages in order"""
+        text = tools.extract_text_pdf(make_pdf(self.PAGES[:3]))
+        
+        assert text.split("\n\n") == self.PAGES[:3]
+    
+    def test_extract_text_pdf_parallel_matches_serial(self):
+        """Test process-pool extraction returns the same joined text"""
+        pdf = make_pdf(self.PAGES)
+        
+        serial = tools.extract_text_pdf(pdf)
+        parallel = tools.extract_text_pdf(pdf, workers=2, min_pages_for_pool=1)
+        
+        assert parallel == serial
+    
+    def test_page_cache_bounded_on_disk(self, tmp_path):
+        """Test the SQLite table drops least recently used rows past max_rows"""
+        path = str(tmp_path / "pages.db")
+        cache = PageTextCache(path, max_entries=1, max_rows=10)
+        cache.put_many({"page-0": "kept"})
+        for i in range(1, 20):
+            cache.put_many({f"page-{i}": f"text {i}"})
+            cache.get_many(["page-0"])  # read from disk: refreshes last_used
+        
+        reloaded = PageTextCache(path, max_entries=100, max_rows=10)
+        rows = reloaded._count()
+        found = reloaded.get_many([f"page-{i}" for i in range(20)])
+        
+        assert rows <= 10
+        assert found["page-0"] == "kept"
+        assert "page-1" not in found and "page-19" in found
+    
+    def test_page_cache_upgrades_old_table(self, tmp_path):
+        """Test a cache file written before eviction existed still opens"""
+        path = str(tmp_path / "pages.db")
+        db = sqlite3.connect(path)
+        db.execute("CREATE TABLE page_text (page_hash TEXT PRIMARY KEY, text TEXT NOT NULL)")
+        db.execute("INSERT INTO page_text VALUES ('old', 'text')")
+        db.commit()
+        db.close()
+        
+        cache = PageTextCache(path, max_rows=10)
+        cache.put_many({"new": "text"})
+        
+        assert PageTextCache(path).get_many(["old", "new"]) == {"old": "text", "new": "text"}
+    
+    def test_page_cache_sees_amended_form_xobject(self, tmp_path):
+        """Test a change inside a Form XObject is not served from the cache"""
+        cache = PageTextCache(str(tmp_path / "pages.db"))
+        original = tools.extract_text_pdf(make_pdf(self.PAGES[:2], form_text="Effective 1 April"), page_cache=cache)
+        
+        amended = tools.extract_text_pdf(make_pdf(self.PAGES[:2], form_text="Effective 1 July"), page_cache=cache)
+        
+        assert "Effective 1 April" in original
+        assert amended == tools.extract_text_pdf(make_pdf(self.PAGES[:2], form_text="Effective 1 July"))
+        assert "Effective 1 July" in amended
+    
+    def test_page_cache_reextracts_only_amended_pages(self, tmp_path, monkeypatch):
+        """Test a re-issued PDF only re-extracts pages whose content changed"""
+        cache = PageTextCache(str(tmp_path / "pages.db"))
+        tools.extract_text_pdf(make_pdf(self.PAGES), page_cache=cache)
+        
+        amended = list(self.PAGES)
+        amended[7] = "Clause 7 banks shall comply within 30 days"
+        
+        calls = []
+        original = PyPDF2.PageObject.extract_text
+        def counting_extract(page, *args, **kwargs):
+            calls.append(page)
+            return original(page, *args, **kwargs)
+        monkeypatch.setattr(PyPDF2.PageObject, "extract_text", counting_extract)
+        
+        reloaded = PageTextCache(str(tmp_path / "pages.db"))
+        text = tools.extract_text_pdf(make_pdf(amended), page_cache=reloaded)
+        
+        assert len(calls) == 1
+        assert text.split("\n\n") == amended
+
+
+class TestStreamingPDFDownload:
+    """Test streamed PDF downloads into spooled temp files"""
+    
+    PAGES = [f"Annual report page {i}" for i in range(12)]
+    
+    def _download(self, body, **kwargs):
+        def handler(request):
+            return httpx.Response(200, content=body)
+        
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                return await tools.async_download_pdf(
+                    "https://rbi.org.in/report.pdf", client=client, **kwargs
+                )
+        return asyncio.run(run())
+    
+    def test_hash_and_size_computed_while_streaming(self):
+        """Test incremental hash matches hashing the whole body"""
+        pdf = make_pdf(self.PAGES)
+        
+        with self._download(pdf) as download:
+            assert download.sha256 == tools.compute_sha256(pdf)
+            assert download.size == len(pdf)
+            assert download.in_memory
+    
+    def test_spooled_to_disk_is_read_via_mmap(self):
+        """Test large bodies roll to disk and are extracted in place"""
+        pdf = make_pdf(self.PAGES)
+        
+        with self._download(pdf, spool_bytes=256) as download:
+            assert not download.in_memory
+            assert bytes(download.buffer()) == pdf
+            
+            serial = tools.extract_text_pdf(download)
+            parallel = tools.extract_text_pdf(download, workers=2, min_pages_for_pool=1)
+        
+        assert serial == parallel == tools.extract_text_pdf(pdf)
+    
+    def test_size_limit(self):
+        """Test downloads over max_bytes are aborted"""
+        with pytest.raises(ValueError):
+            self._download(make_pdf(self.PAGES), max_bytes=100)
+    
+    def test_rejects_non_pdf(self):
+        """Test non-PDF bodies are rejected on the first chunk"""
+        with pytest.raises(ValueError):
+            self._download(b"<html>error page</html>")
+    
+    def _download_chunks(self, chunks, **kwargs):
+        async def body():
+            for chunk in chunks:
+                yield chunk
+        
+        def handler(request):
+            return httpx.Response(200, content=body())
+        
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                return await tools.async_download_pdf(
+                    "https://rbi.org.in/report.pdf", client=client, **kwargs
+                )
+        return asyncio.run(run())
+    
+    def test_signature_split_across_chunks(self):
+        """Test a %PDF header arriving over several short chunks is accepted"""
+        pdf = make_pdf(self.PAGES)
+        
+        with self._download_chunks([pdf[:1], pdf[1:3], pdf[3:]]) as download:
+            assert bytes(download.buffer()) == pdf
+        with pytest.raises(ValueError):
+            self._download_chunks([b"%P", b"K\x03\x04"])
+        with pytest.raises(ValueError):
+            self._download_chunks([b"%P"])
+    
+    def test_rolls_over_when_spool_limit_crossed(self):
+        """Test the body moves to disk on the chunk that crosses spool_bytes"""
+        pdf = make_pdf(self.PAGES)
+        download = tools.PDFDownload("https://rbi.org.in/report.pdf", spool_bytes=len(pdf) - 1)
+        
+        with download:
+            download.write(pdf[:-1])
+            assert download.in_memory
+            download.write(pdf[-1:])
+            assert not download.in_memory
+            assert bytes(download.buffer()) == pdf
 
 
 class TestRSSParsing:
@@ -151,6 +558,600 @@ class TestRSSParsing:
         pass
 
 
+class TestAsyncFetchTools:
+    """Test async fetch variants against a mocked transport"""
+    
+    @staticmethod
+    def _client(handler):
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    
+    def test_async_fetch_html(self):
+        """Test async HTML fetch returns a FetchResult"""
+        def handler(request):
+            return httpx.Response(
+                200,
+                content=b"<html><title>RBI</title></html>",
+                headers={'Content-Type': 'text/html; charset=utf-8'},
+            )
+        
+        async def run():
+            async with self._client(handler) as client:
+                return await tools.async_fetch_html("https://rbi.org.in/x", client=client)
+        
+        result = asyncio.run(run())
+        
+        assert result.status_code == 200
+        assert result.content.startswith(b"<html>")
+        assert result.encoding == 'utf-8'
+    
+    def test_async_fetch_pdf_rejects_non_pdf(self):
+        """Test async PDF fetch validates the PDF signature"""
+        def handler(request):
+            return httpx.Response(200, content=b"<html>not a pdf</html>")
+        
+        async def run():
+            async with self._client(handler) as client:
+                return await tools.async_fetch_pdf("https://rbi.org.in/a.pdf", client=client)
+        
+        with pytest.raises(ValueError):
+            asyncio.run(run())
+    
+    def test_async_fetch_pdf_returns_bytes(self):
+        """Test async PDF fetch streams through the download path"""
+        pdf = make_pdf(["Circular"])
+        
+        async def run():
+            async with self._client(lambda request: httpx.Response(200, content=pdf)) as client:
+                return await tools.async_fetch_pdf("https://rbi.org.in/a.pdf", client=client)
+        
+        assert asyncio.run(run()) == pdf
+    
+    def test_async_fetch_rss(self):
+        """Test async RSS fetch parses downloaded feed bytes"""
+        feed = b"""<?xml version="1.0"?>
+        <rss version="2.0"><channel><title>SEBI</title>
+            <item><title>Circular 1</title><link>https://sebi.gov.in/1</link></item>
+            <item><title>Circular 2</title><link>https://sebi.gov.in/2</link></item>
+        </channel></rss>"""
+        
+        def handler(request):
+            return httpx.Response(200, content=feed)
+        
+        async def run():
+            async with self._client(handler) as client:
+                return await tools.async_fetch_rss("https://sebi.gov.in/rss", client=client)
+        
+        result = asyncio.run(run())
+        
+        assert [item['title'] for item in result.items] == ["Circular 1", "Circular 2"]
+        assert [item['guid'] for item in result.items] == ["https://sebi.gov.in/1", "https://sebi.gov.in/2"]
+    
+    def test_async_fetch_runs_concurrently(self):
+        """Test gathered async fetches overlap instead of running serially"""
+        async def handler(request):
+            await asyncio.sleep(0.2)
+            return httpx.Response(200, json={'ok': True})
+        
+        async def run():
+            async with self._client(handler) as client:
+                loop = asyncio.get_running_loop()
+                start = loop.time()
+                results = await asyncio.gather(*(
+                    tools.async_fetch_api(f"https://api.example.com/{i}", client=client)
+                    for i in range(5)
+                ))
+                return results, loop.time() - start
+        
+        results, elapsed = asyncio.run(run())
+        
+        assert all(r == {'ok': True} for r in results)
+        assert elapsed < 0.6
+
+
+class TestConditionalFetch:
+    """Test ETag / Last-Modified conditional GETs"""
+    
+    ETAG = '"circulars-v1"'
+    
+    def _handler(self, seen_headers):
+        def handler(request):
+            seen_headers.append(dict(request.headers))
+            if request.headers.get('If-None-Match') == self.ETAG:
+                return httpx.Response(304)
+            return httpx.Response(
+                200,
+                content=b"<html>circulars</html>",
+                headers={'ETag': self.ETAG, 'Last-Modified': 'Mon, 01 Dec 2025 00:00:00 GMT'},
+            )
+        return handler
+    
+    def _fetch(self, handler, validators):
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                return await tools.async_fetch_html(
+                    "https://rbi.org.in/list", client=client, validators=validators
+                )
+        return asyncio.run(run())
+    
+    def test_not_modified_with_validators(self):
+        """Test second poll sends validators and short-circuits on 304"""
+        seen = []
+        handler = self._handler(seen)
+        
+        first = self._fetch(handler, None)
+        assert first.not_modified is False
+        assert 'if-none-match' not in seen[0]
+        
+        second = self._fetch(handler, tools.response_validators(first.headers))
+        assert second.not_modified is True
+        assert second.content == b''
+        assert seen[1]['if-none-match'] == self.ETAG
+        assert 'if-modified-since' in seen[1]
+    
+    def test_conditional_headers(self):
+        """Test validators map to If-None-Match / If-Modified-Since"""
+        assert tools.conditional_headers(None) == {}
+        assert tools.conditional_headers({'etag': '"abc"'}) == {'If-None-Match': '"abc"'}
+
+
+class TestVersionState:
+    """Test persistent per-source version state"""
+    
+    def test_sqlite_store_persists(self, tmp_path):
+        """Test state survives reopening the store"""
+        path = str(tmp_path / "state.db")
+        SQLiteVersionStateStore(path).put(
+            VersionState(source_id="rbi", last_hash="abc", etag='"v1"')
+        )
+        
+        state = SQLiteVersionStateStore(path).get("rbi")
+        
+        assert state.last_hash == "abc"
+        assert state.validators() == {'etag': '"v1"'}
+        assert SQLiteVersionStateStore(path).get("sebi") is None
+    
+    class FakeIPFS:
+        def add(self, content):
+            return "QmTest"
+        
+        def get_gateway_url(self, cid):
+            return f"https://ipfs.io/ipfs/{cid}"
+    
+    class FakeBus:
+        def __init__(self):
+            self.events = []
+        
+        def publish(self, event):
+            self.events.append(event)
+    
+    def _agent(self, tmp_path, store):
+        from agents.agent_1_ingestion.agent import IngestionAgent
+        
+        config_path = tmp_path / "sources.yaml"
+        config_path.write_text("sources: []\nsettings: {}\n")
+        return IngestionAgent(
+            self.FakeBus(), self.FakeIPFS(), str(config_path),
+            state_store=store, blob_store=LocalBlobStore(str(tmp_path / "blobs")),
+        )
+    
+    def test_restart_does_not_republish_as_new(self, tmp_path, monkeypatch):
+        """Test an unchanged source is not a new version after a restart"""
+        store = SQLiteVersionStateStore(str(tmp_path / "state.db"))
+        seen_validators = []
+        
+        def fake_fetch_html(url, validators=None):
+            seen_validators.append(validators)
+            return tools.FetchResult(
+                url=url, status_code=200, content=b"<html><p>KYC</p></html>",
+                headers={'ETag': '"v1"'}, content_type='text/html',
+                encoding='utf-8', fetch_time=0.0,
+            )
+        
+        monkeypatch.setattr(tools, "fetch_html", fake_fetch_html)
+        source = {'id': 'rbi', 'name': 'RBI', 'url': 'https://rbi.org.in/list', 'type': 'html'}
+        
+        first_event = self._agent(tmp_path, store).fetch_source(source)
+        second_event = self._agent(tmp_path, store).fetch_source(source)
+        
+        assert first_event.payload['version_info']['is_new_version'] is True
+        assert second_event.payload['version_info']['is_new_version'] is False
+        assert second_event.payload['version_info']['previous_hash'] == (
+            first_event.payload['hashes']['sha256']
+        )
+        assert seen_validators == [{}, {'etag': '"v1"'}]
+    
+    def test_chrome_change_keeps_hash_bases_apart(self, tmp_path, monkeypatch):
+        """Test a nav-only change is no new version and previous_hash is the page hash"""
+        pages = iter([
+            b"<html><nav>Home</nav><main><a href='/c1'>Circular 1</a></main></html>",
+            b"<html><nav>Home | Careers</nav><main><a href='/c1'>Circular 1</a></main></html>",
+        ])
+        monkeypatch.setattr(tools, "fetch_html", lambda url, validators=None: tools.FetchResult(
+            url=url, status_code=200, content=next(pages), headers={},
+            content_type='text/html', encoding='utf-8', fetch_time=0.0,
+        ))
+        agent = self._agent(tmp_path, InMemoryVersionStateStore())
+        source = {'id': 'rbi', 'name': 'RBI', 'url': 'https://rbi.org.in/list', 'type': 'html'}
+        
+        first = agent.fetch_source(source).payload
+        second = agent.fetch_source(source).payload
+        
+        assert second['version_info']['is_new_version'] is False
+        assert second['version_info']['previous_hash'] == first['hashes']['sha256']
+        assert second['hashes']['sha256'] != first['hashes']['sha256']
+        assert second['hashes']['region_sha256'] == first['hashes']['region_sha256']
+        assert agent._version_state('rbi').region_hash == second['hashes']['region_sha256']
+    
+    def _sweep_sources(self, agent):
+        agent.sources = [
+            {'id': name, 'name': name, 'url': f"https://{name}.gov.in/list", 'type': 'html'}
+            for name in ('fresh', 'same', 'broken')
+        ]
+    
+    @staticmethod
+    def _sweep_result(url):
+        if 'broken' in url:
+            raise httpx.ConnectError("refused")
+        return tools.FetchResult(
+            url=url, status_code=304 if 'same' in url else 200,
+            content=b"" if 'same' in url else b"<html><main>KYC</main></html>",
+            headers={}, content_type='text/html', encoding='utf-8', fetch_time=0.0,
+            not_modified='same' in url,
+        )
+    
+    def test_not_modified_counted_apart_from_failures(self, tmp_path, monkeypatch):
+        """Test a 304 is reported as unchanged, not as a failed fetch"""
+        monkeypatch.setattr(
+            tools, "fetch_html", lambda url, validators=None: self._sweep_result(url)
+        )
+        agent = self._agent(tmp_path, InMemoryVersionStateStore())
+        self._sweep_sources(agent)
+        
+        assert agent.fetch_source(agent.sources[1]) is FetchStatus.UNCHANGED
+        assert agent.fetch_all_sources() == {'published': 1, 'unchanged': 1, 'failed': 1}
+    
+    def test_async_not_modified_counted_apart_from_failures(self, tmp_path, monkeypatch):
+        """Test the concurrent sweep tallies 304s separately too"""
+        async def fake_async_fetch_html(url, timeout=None, client=None, validators=None):
+            return self._sweep_result(url)
+        
+        monkeypatch.setattr(tools, "async_fetch_html", fake_async_fetch_html)
+        agent = self._agent(tmp_path, InMemoryVersionStateStore())
+        self._sweep_sources(agent)
+        
+        counts = asyncio.run(agent.fetch_all_sources_async())
+        
+        assert counts == {'published': 1, 'unchanged': 1, 'failed': 1}
+    
+    def test_busy_host_does_not_hold_global_slots(self, tmp_path, monkeypatch):
+        """Test a task waiting on its host takes no global slot, and processing holds none"""
+        finished = {}
+        
+        async def slow_fetch(url, timeout=None, client=None, validators=None):
+            await asyncio.sleep(0.2)
+            return self._sweep_result(url)
+        
+        def slow_process(source, prefetched=None):
+            time.sleep(0.2)
+            finished[source['id']] = time.monotonic()
+            return FetchStatus.UNCHANGED
+        
+        monkeypatch.setattr(tools, "async_fetch_html", slow_fetch)
+        agent = self._agent(tmp_path, InMemoryVersionStateStore())
+        monkeypatch.setattr(agent, "fetch_source", slow_process)
+        agent.settings.update(max_concurrent_fetches=2, max_concurrent_per_host=1)
+        agent.sources = [
+            {'id': source_id, 'name': source_id, 'url': url, 'type': 'html'}
+            for source_id, url in [
+                ('a1', "https://fresh.gov.in/1"), ('a2', "https://fresh.gov.in/2"),
+                ('b1', "https://other.gov.in/1"), ('c1', "https://third.gov.in/1"),
+            ]
+        ]
+        
+        start = time.monotonic()
+        asyncio.run(agent.fetch_all_sources_async())
+        
+        # b1 downloads alongside a1 instead of queueing behind a2 (or
+        # behind a1's processing)
+        assert finished['b1'] - start < 0.55
+    
+    def test_dom_fingerprint_stored_out_of_band(self, tmp_path, monkeypatch):
+        """Test the event carries the fingerprint's root hash, not the tree"""
+        html = TestDomMerkle.page(range(2000)).encode()
+        monkeypatch.setattr(tools, "fetch_html", lambda url, validators=None: tools.FetchResult(
+            url=url, status_code=200, content=html, headers={}, content_type='text/html',
+            encoding='utf-8', fetch_time=0.0,
+        ))
+        agent = self._agent(tmp_path, InMemoryVersionStateStore())
+        event = agent.fetch_source({'id': 'rbi', 'name': 'RBI', 'url': 'https://rbi.org.in/list', 'type': 'html'})
+        
+        summary = event.payload['metadata']['dom_merkle']
+        tree = build_fingerprint(tools.parse_html(html))
+        assert 'children' not in summary
+        assert summary['hash'] == tree['hash']
+        assert summary['elements'] == tree['elements']
+        assert decode_fingerprint(agent.blob_store.get(summary['ref'])) == tree
+        assert len(json.dumps(summary)) < 200
+    
+    def test_rss_publishes_only_new_and_updated_items(self, tmp_path):
+        """Test each poll publishes just the feed items that changed"""
+        agent = self._agent(tmp_path, InMemoryVersionStateStore())
+        source = {'id': 'sebi-rss', 'name': 'SEBI', 'url': 'https://sebi.gov.in/rss', 'type': 'rss'}
+        
+        def item(n, summary="Original"):
+            return {
+                'guid': f"https://sebi.gov.in/{n}", 'link': f"https://sebi.gov.in/{n}",
+                'title': f"Circular {n}", 'published': '', 'updated': '', 'summary': summary,
+            }
+        
+        def poll(items):
+            agent.event_bus.events.clear()
+            feed = tools.FeedResult(url=source['url'], items=items, headers={'ETag': '"f1"'})
+            agent.fetch_source(source, feed)
+            return [
+                (e.payload['metadata']['guid'], e.payload['metadata']['item_status'])
+                for e in agent.event_bus.events
+            ]
+        
+        assert poll([item(1), item(2)]) == [
+            ("https://sebi.gov.in/1", 'new'), ("https://sebi.gov.in/2", 'new'),
+        ]
+        assert poll([item(3), item(1), item(2, "Amended")]) == [
+            ("https://sebi.gov.in/3", 'new'), ("https://sebi.gov.in/2", 'updated'),
+        ]
+        assert poll([item(3), item(1), item(2, "Amended")]) == []
+        assert agent._validators('sebi-rss') == {'etag': '"f1"'}
+    
+    def test_rss_failure_midway_keeps_published_items(self, tmp_path, monkeypatch):
+        """Test items published before a failure are not re-published next poll"""
+        agent = self._agent(tmp_path, InMemoryVersionStateStore())
+        source = {'id': 'sebi-rss', 'name': 'SEBI', 'url': 'https://sebi.gov.in/rss', 'type': 'rss'}
+        items = [
+            {'guid': f"https://sebi.gov.in/{n}", 'link': f"https://sebi.gov.in/{n}",
+             'title': f"Circular {n}", 'published': '', 'updated': '', 'summary': ''}
+            for n in range(1, 4)
+        ]
+        feed = tools.FeedResult(url=source['url'], items=items, headers={'ETag': '"f1"'})
+        publish = agent.event_bus.publish
+        
+        def failing_publish(event):
+            if event.payload['metadata']['guid'].endswith('/2'):
+                raise ConnectionError("bus down")
+            publish(event)
+        
+        monkeypatch.setattr(agent.event_bus, "publish", failing_publish)
+        assert agent.fetch_source(source, feed) is FetchStatus.FAILED
+        monkeypatch.setattr(agent.event_bus, "publish", publish)
+        agent.event_bus.events.clear()
+        agent.fetch_source(source, feed)
+        
+        assert [e.payload['metadata']['guid'] for e in agent.event_bus.events] == [
+            "https://sebi.gov.in/2", "https://sebi.gov.in/3",
+        ]
+        assert agent._validators('sebi-rss') == {'etag': '"f1"'}
+
+
+class TestChunkStore:
+    """Test content-defined chunk deduplication"""
+    
+    class FakeIPFS:
+        def __init__(self):
+            self.blobs = {}
+        
+        def add(self, content):
+            cid = f"Qm{hashlib.sha256(content).hexdigest()[:16]}"
+            self.blobs[cid] = content
+            return cid
+        
+        def get(self, cid):
+            return self.blobs[cid]
+    
+    @staticmethod
+    def make_document(paragraphs=400):
+        return '\n'.join(
+            f"Paragraph {i}: regulated entities shall verify customer identity "
+            f"under clause {i * 7 % 113} before account opening."
+            for i in range(paragraphs)
+        ).encode()
+    
+    def test_boundaries_cover_content(self):
+        """Test chunks tile the input and respect size limits"""
+        data = self.make_document()
+        cuts = chunk_boundaries(data, min_size=512, avg_size=2048, max_size=8192)
+        sizes = [end - start for start, end in zip([0] + cuts, cuts)]
+        
+        assert cuts[-1] == len(data)
+        assert all(size <= 8192 for size in sizes)
+        assert all(size >= 512 for size in sizes[:-1])
+    
+    def test_boundaries_match_rolling_hash(self):
+        """Test the vectorized search cuts where the byte-at-a-time gear hash does"""
+        def reference(data, min_size, avg_size, max_size):
+            bits = avg_size.bit_length() - 1
+            strict = ((1 << (bits + 2)) - 1) << (64 - bits - 2)
+            loose = ((1 << (bits - 2)) - 1) << (64 - bits + 2)
+            cuts, start = [], 0
+            while start < len(data):
+                end = min(start + max_size, len(data))
+                cut, h = end, 0
+                for i in range(start + min_size, end):
+                    h = ((h << 1) + GEAR[data[i]]) & ((1 << 64) - 1)
+                    if not h & (strict if i < start + avg_size else loose):
+                        cut = i + 1
+                        break
+                cuts.append(cut)
+                start = cut
+            return cuts
+        
+        data = self.make_document() + bytes(range(256)) * 200
+        for sizes in [(512, 2048, 8192), (16, 64, 256)]:
+            assert chunk_boundaries(data, *sizes) == reference(data, *sizes)
+    
+    def test_unchanged_snapshot_is_not_rechunked(self, monkeypatch):
+        """Test a repeat of a stored snapshot reuses its manifest"""
+        store = ChunkStore(self.FakeIPFS(), min_chunked_size=0)
+        data = self.make_document()
+        first = store.store(data)
+        monkeypatch.setattr(
+            "utils.chunk_store.chunk_boundaries",
+            lambda *args: pytest.fail("unchanged snapshot was re-chunked"),
+        )
+        
+        second = store.store(data)
+        
+        assert second.chunks == first.chunks
+        assert second.new_chunks == 0
+    
+    def test_small_snapshot_is_one_chunk(self):
+        """Test bodies under the size gate skip chunking"""
+        manifest = ChunkStore(self.FakeIPFS()).store(self.make_document(50))
+        
+        assert len(manifest.chunks) == 1
+    
+    def test_edit_uploads_only_changed_chunks(self, tmp_path):
+        """Test a one-paragraph edit re-uploads a small fraction of the document"""
+        ipfs = self.FakeIPFS()
+        store = ChunkStore(ipfs, str(tmp_path / "chunks.db"), 512, 2048, 8192, min_chunked_size=0)
+        original = self.make_document()
+        edited = original.replace(b"Paragraph 200:", b"Paragraph 200 (amended 2025):")
+        
+        first = store.store(original)
+        second = store.store(edited)
+        
+        assert first.new_chunks == len(first.chunks)
+        assert 0 < second.new_chunks <= 2
+        assert second.new_bytes < len(edited) // 10
+        assert store.load(second) == edited
+    
+    def test_index_survives_restart(self, tmp_path):
+        """Test the known-chunk index is persisted"""
+        ipfs = self.FakeIPFS()
+        path = str(tmp_path / "chunks.db")
+        data = self.make_document()
+        ChunkStore(ipfs, path).store(data)
+        
+        manifest = ChunkStore(ipfs, path).store(data)
+        
+        assert manifest.new_chunks == 0
+
+
+class TestSharedHTTPClient:
+    """Test the shared pooled HTTP client policy"""
+    
+    @pytest.fixture(autouse=True)
+    def policy(self):
+        http_client.configure_http(HTTPConfig(timeout=7.0, max_retries=2, user_agent="Test-Bot/1.0"))
+        yield
+        http_client.configure_http(HTTPConfig())
+    
+    def test_session_is_shared_and_pooled(self):
+        """Test every caller gets the same session with retrying adapters"""
+        session = http_client.get_session()
+        
+        assert http_client.get_session() is session
+        adapter = session.get_adapter("https://www.rbi.org.in/")
+        assert adapter.max_retries.total == 2
+        assert 429 in adapter.max_retries.status_forcelist
+        assert session.headers['User-Agent'] == "Test-Bot/1.0"
+    
+    def test_session_applies_default_timeout(self, monkeypatch):
+        """Test the policy timeout is used unless the caller passes one"""
+        seen = []
+        monkeypatch.setattr(
+            requests.Session, "request",
+            lambda self, method, url, **kwargs: seen.append(kwargs['timeout']),
+        )
+        session = http_client.get_session()
+        
+        session.get("https://www.rbi.org.in/")
+        session.get("https://www.rbi.org.in/", timeout=3)
+        
+        assert seen == [7.0, 3]
+    
+    def test_configure_rebuilds_session(self):
+        """Test a new policy replaces the shared session"""
+        before = http_client.get_session()
+        http_client.configure_http(HTTPConfig(max_retries=5))
+        
+        assert http_client.get_session() is not before
+    
+    def test_async_client_sends_user_agent(self):
+        """Test async clients carry the shared User-Agent and timeout"""
+        seen = []
+        
+        def handler(request):
+            seen.append(request.headers['User-Agent'])
+            return httpx.Response(200, content=b"<html></html>")
+        
+        async def run():
+            transport = httpx.MockTransport(handler)
+            async with http_client.create_async_client(transport=transport) as client:
+                assert client.timeout.read == 7.0
+                return await tools.async_fetch_html("https://rbi.org.in/x", client=client)
+        
+        asyncio.run(run())
+        
+        assert seen == ["Test-Bot/1.0"]
+
+
+class TestTLSEvidence:
+    """Test TLS evidence capture during fetches"""
+    
+    class FakeSSL:
+        def getpeercert(self, binary_form=False):
+            if binary_form:
+                return b"leaf-der"
+            return {
+                'subject': ((('commonName', 'www.rbi.org.in'),),),
+                'issuer': ((('commonName', 'Example CA'),),),
+                'notAfter': 'Jan  1 00:00:00 2030 GMT',
+                'subjectAltName': (('DNS', 'www.rbi.org.in'),),
+            }
+        
+        def cipher(self):
+            return ('TLS_AES_256_GCM_SHA384', 'TLSv1.3', 256)
+        
+        def version(self):
+            return 'TLSv1.3'
+    
+    class FakeStream:
+        def __init__(self, ssl_obj):
+            self.ssl_obj = ssl_obj
+        
+        def get_extra_info(self, name):
+            return self.ssl_obj if name == 'ssl_object' else None
+    
+    def respond(self, url, ssl_obj):
+        def handler(request):
+            return httpx.Response(
+                200,
+                content=b"<html></html>",
+                extensions={'network_stream': self.FakeStream(ssl_obj)},
+            )
+        
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                return await tools.async_fetch_html(url, client=client)
+        
+        return asyncio.run(run())
+    
+    def test_fetch_records_tls_session(self):
+        """Test the certificate, cipher and protocol are captured with the content"""
+        result = self.respond("https://www.rbi.org.in/x", self.FakeSSL())
+        evidence = result.tls_evidence
+        
+        assert evidence['host'] == 'www.rbi.org.in'
+        assert evidence['protocol'] == 'TLSv1.3'
+        assert evidence['cipher'] == 'TLS_AES_256_GCM_SHA384'
+        assert evidence['peer_cert_sha256'] == hashlib.sha256(b"leaf-der").hexdigest()
+        assert evidence['subject_alt_names'] == ['www.rbi.org.in']
+        assert evidence['verified'] is True
+    
+    def test_plain_http_has_no_evidence(self):
+        """Test http:// fetches carry no TLS evidence"""
+        assert self.respond("http://www.rbi.org.in/x", self.FakeSSL()).tls_evidence is None
+
+
 # =============================================================================
 # Integration Tests (require running infrastructure)
 # =============================================================================
@@ -0,0 +1,592 @@
+"""
+Unit tests for Agent 3 (Diff & Change Classifier) tools.
+"""
+
+import random
+import time
+
+import pytest
+from agents.agent_3_diff import tools
+from agents.agent_3_diff.agent import DiffAgent
+from utils import semantic_similarity
+from utils.blob_store import LocalBlobStore
+from utils.dom_merkle import encode_fingerprint, fingerprint_html, fingerprint_summary
+from utils.embedding_cache import EmbeddingCache
+from utils.line_diff import diff_lines, diff_texts, split_segments
+from utils.minhash import InMemoryLSHIndex, MinHasher, SQLiteLSHIndex, jaccard_estimate
+from utils.section_index import diff_sections, section_index, split_sections
+from utils.version_history import (
+    DELTA, KEYFRAME, InMemoryVersionHistory, SQLiteVersionHistory, apply_delta, make_delta,
+)
+
+
+def regulation(clauses=300, amended=None):
+    """Single-line text like normalize_text output, optionally amending one clause"""
+    parts = []
+    for i in range(1, clauses + 1):
+        if i % 50 == 1:
+            parts.append(f"CHAPTER {i // 50 + 1}")
+        body = f"The regulated entity shall maintain record type {i} for five years"
+        if i == amended:
+            body += " and report it to the Reserve Bank within 7 days"
+        parts.append(f"{i}. {body}.")
+    return " ".join(parts)
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    """sources.yaml keeping Agent 3's stores in memory"""
+    path = tmp_path / "sources.yaml"
+    path.write_text("sources: []\nsettings:\n  version_history_backend: memory\n  lsh_index_backend: memory\n")
+    return str(path)
+
+
+def apply_opcodes(diff):
+    """Rebuild the new side from old + opcodes"""
+    out = []
+    for tag, i1, i2, j1, j2 in diff.opcodes:
+        out.extend(diff.old[i1:i2] if tag == 'equal' else diff.new[j1:j2])
+    return out
+
+
+class TestLineDiff:
+    """Test the line-hash diff engine"""
+
+    def test_opcodes_rebuild_new(self):
+        old = ["a", "", "b", "", "c", "", "d"]
+        new = ["a", "", "B", "", "c", "", "", "d", "e"]
+
+        diff = diff_lines(old, new)
+
+        assert apply_opcodes(diff) == new
+        assert list(diff.removed()) == ["b"]
+        assert list(diff.added()) == ["B", "", "e"]
+
+    def test_identical_and_empty(self):
+        assert diff_lines(["x", "y"], ["x", "y"]).ratio() == 1.0
+        assert diff_lines([], []).ratio() == 1.0
+        assert diff_lines(["x"], []).removed_count == 1
+
+    def test_long_line_split_into_sentences(self):
+        sentence = "The regulated entity shall keep records for five years. "
+        old = sentence * 10 + "Reports are due quarterly."
+        new = sentence * 10 + "Reports are due monthly."
+
+        assert len(split_segments(old)) == 11
+        diff = diff_texts(old, new)
+        assert list(diff.removed()) == ["Reports are due quarterly."]
+        assert list(diff.added()) == ["Reports are due monthly."]
+        assert diff.ratio() > 0.9
+
+    def test_large_document_is_fast(self):
+        old = "\n".join(f"{i}. Clause text number {i}.\n" for i in range(100_000))
+        new = old.replace("\n5000. Clause", "\n5000. Amended clause")
+
+        start = time.perf_counter()
+        diff = diff_texts(old, new)
+        assert time.perf_counter() - start < 5
+        assert (diff.added_count, diff.removed_count) == (1, 1)
+
+
+    def test_hunks_group_nearby_changes(self):
+        old = [str(i) for i in range(20)]
+        new = list(old)
+        new[3], new[5], new[15] = "x", "y", "z"
+
+        hunks = diff_lines(old, new).hunks(context=1)
+
+        assert len(hunks) == 2
+        assert hunks[0][0] == ('equal', 2, 3, 2, 3)
+        assert hunks[1][-1] == ('equal', 16, 17, 16, 17)
+        assert diff_lines(old, old).hunks() == []
+
+
+class TestSectionIndex:
+    """Test section hashing and section-pruned diffs"""
+
+    def test_sections_cover_text(self):
+        text = regulation()
+        spans = split_sections(text)
+
+        assert spans[0][0] == 0 and spans[-1][1] == len(text)
+        assert all(a[1] == b[0] for a, b in zip(spans, spans[1:]))
+        # Each clause is a section; chapter headings join their first clause
+        assert len(spans) == 300
+        assert text[spans[50][0]:spans[50][1]].startswith("CHAPTER 2 51. ")
+
+    def test_amendment_changes_one_section(self):
+        old, new = regulation(), regulation(amended=120)
+        old_hashes = [s["hash"] for s in section_index(old)]
+        new_hashes = [s["hash"] for s in section_index(new)]
+
+        assert sum(a != b for a, b in zip(old_hashes, new_hashes)) == 1
+
+    def test_long_paragraph_cut_is_stable(self):
+        sentences = [f"Sentence {i} about know your customer norms applies." for i in range(400)]
+        text = " ".join(sentences)
+        edited = "Preamble added. " + text
+
+        old = {s["hash"] for s in section_index(text)}
+        new = {s["hash"] for s in section_index(edited)}
+
+        assert len(old) > 5
+        assert len(old - new) == 1
+
+    def test_only_changed_sections_are_diffed(self):
+        old, new = regulation(), regulation(amended=120)
+
+        diff = diff_sections(old, new)
+
+        assert apply_opcodes(diff) == diff.new
+        assert list(diff.removed()) == ["120. The regulated entity shall maintain record type 120 for five years."]
+        assert diff.added_count == 1
+        # Unchanged sections are single segments, never split or compared
+        assert len(diff.old) == 300
+        assert abs(diff.ratio() - diff_texts(old, new).ratio()) < 0.01
+
+
+class TestVersionHistory:
+    """Test the delta-compressed version store"""
+
+    def versions(self, count=40):
+        rng = random.Random(3)
+        text = regulation(clauses=200)
+        texts = [text]
+        for _ in range(count - 1):
+            clause = rng.randint(1, 200)
+            text = text.replace(f" {clause}. The", f" {clause}. Amended: the", 1)
+            texts.append(text)
+        return texts
+
+    def test_delta_round_trip(self):
+        old = "Line one.\nLine two. Sentence three!\n\nTail"
+        new = "Line one.\nLine 2. Sentence three!\nNew line\n\nTail"
+        assert apply_delta(new, make_delta(new, old)) == old
+        assert apply_delta("", make_delta("", new)) == new
+
+    @pytest.mark.parametrize("backend", ["memory", "sqlite"])
+    def test_every_version_rebuilds(self, backend, tmp_path):
+        if backend == "memory":
+            history = InMemoryVersionHistory(keyframe_interval=8)
+        else:
+            history = SQLiteVersionHistory(str(tmp_path / "history.db"), keyframe_interval=8)
+        texts = self.versions()
+
+        for i, text in enumerate(texts):
+            assert history.append("rbi", text, {"snapshot_id": f"s{i}"}) == i
+
+        assert history.latest("rbi").text == texts[-1]
+        for i, text in enumerate(texts):
+            stored = history.get("rbi", i)
+            assert stored.text == text
+            assert stored.meta == {"snapshot_id": f"s{i}"}
+        assert history.get("rbi", len(texts)) is None
+        assert history.latest("sebi") is None
+
+    def test_keyframes_bound_rebuild_and_deltas_stay_small(self):
+        history = InMemoryVersionHistory(keyframe_interval=8)
+        texts = self.versions()
+        for text in texts:
+            history.append("rbi", text)
+
+        kinds = {version: kind for (_, version), (kind, _, _) in history._rows.items()}
+        assert [v for v, kind in sorted(kinds.items()) if kind == KEYFRAME] == [0, 8, 16, 24, 32]
+        assert all(kinds[v] == DELTA for v in range(1, 8))
+
+        delta_sizes = [len(payload) for kind, payload, _ in history._rows.values() if kind == DELTA]
+        assert max(delta_sizes) < len(texts[0]) / 20
+
+    def test_sqlite_history_persists(self, tmp_path):
+        path = str(tmp_path / "history.db")
+        SQLiteVersionHistory(path).append("rbi", "v0")
+        SQLiteVersionHistory(path).append("rbi", "v1")
+
+        history = SQLiteVersionHistory(path)
+        assert history.version_count("rbi") == 2
+        assert history.get("rbi", 0).text == "v0"
+
+
+class FakeModel:
+    """Bag-of-words stand-in for a SentenceTransformer"""
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, convert_to_numpy=True):
+        import numpy as np
+
+        self.encoded.extend(texts)
+        vectors = np.zeros((len(texts), 64))
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[row, sum(map(ord, word)) % 64] += 1
+        return vectors
+
+
+@pytest.fixture
+def model(monkeypatch):
+    """FakeModel as the similarity engine's sentence transformer"""
+    engine = semantic_similarity.SemanticSimilarityEngine()
+    engine.model = FakeModel()
+    monkeypatch.setattr(semantic_similarity, "TRANSFORMERS_AVAILABLE", True)
+    monkeypatch.setattr(semantic_similarity, "_engine", engine)
+    return engine.model
+
+
+class TestSemanticSectionDiff:
+    """Test chunk-level semantic change detection"""
+
+    def test_jaccard_fallback_reports_changed_sections(self, monkeypatch):
+        monkeypatch.setattr(semantic_similarity, "TRANSFORMERS_AVAILABLE", False)
+        old = regulation()
+        new = regulation(amended=120) + " 301. Entities must file a new annual return."
+
+        result = tools.semantic_section_diff(old, new)
+
+        assert result["sections_changed"] == 2
+        assert result["embedded"] == 0
+        drift = {change["section_id"]: change["semantic_drift"] for change in result["semantic_changes"]}
+        assert drift == {"120.": "changed", "301.": "added"}
+        assert 0.95 < result["similarity"] < 1
+
+    def test_only_changed_sections_embedded_and_cached(self, model):
+        cache = EmbeddingCache()
+        old, new = regulation(), regulation(amended=120)
+
+        first = tools.semantic_section_diff(old, new, embedding_cache=cache)
+        assert len(model.encoded) == 2
+        assert first["embedded"] == 2
+        assert 0.99 < first["similarity"] < 1
+
+        # Next version: the previous version's section comes from the cache
+        newer = regulation(amended=120).replace("record type 120", "record type 120A")
+        tools.semantic_section_diff(new, newer, embedding_cache=cache)
+        assert len(model.encoded) == 3
+
+    def test_long_sections_not_truncated(self, model):
+        sentence = "The regulated entity shall verify the customer identity documents. "
+        vectors = semantic_similarity.get_similarity_engine().embed_chunks({"h": sentence * 60})
+
+        assert len(model.encoded) == 5
+        assert all(len(window) <= semantic_similarity.CHUNK_WINDOW_CHARS for window in model.encoded)
+        assert abs(float(vectors["h"] @ vectors["h"]) - 1) < 1e-5
+
+    def test_embedding_cache_persists(self, tmp_path):
+        path = str(tmp_path / "embeddings.db")
+        EmbeddingCache(path).put_many({"m:a": b"1234"})
+
+        assert EmbeddingCache(path).get_many(["m:a", "m:b"]) == {"m:a": b"1234"}
+
+    def test_embedding_cache_path_from_settings(self, tmp_path):
+        config_path = tmp_path / "sources.yaml"
+        config_path.write_text("sources: []\nsettings:\n  version_history_backend: memory\n"
+                               "  lsh_index_backend: memory\n"
+                               f"  embedding_cache_path: {tmp_path / 'embeddings.db'}\n")
+        DiffAgent(sources_config_path=str(config_path)).embedding_cache.put_many({"m:a": b"1234"})
+        assert EmbeddingCache(str(tmp_path / "embeddings.db")).get_many(["m:a"]) == {"m:a": b"1234"}
+
+
+class TestNearDuplicates:
+    """Test MinHash / LSH near-duplicate detection"""
+
+    @staticmethod
+    def circular(topic, edits=0):
+        words = [f"{topic}{i % 37}" for i in range(400)]
+        for i in range(edits):
+            words[i * 40] = "amended"
+        return " ".join(words)
+
+    def test_estimate_close_to_jaccard(self):
+        hasher = MinHasher()
+        a, b = self.circular("kyc"), self.circular("kyc", edits=4)
+        sa, sb = set(hasher.shingles(a)), set(hasher.shingles(b))
+        true = len(sa & sb) / len(sa | sb)
+        assert abs(jaccard_estimate(hasher.signature(a), hasher.signature(b)) - true) < 0.1
+        assert hasher.signature("") is None
+
+    @pytest.mark.parametrize("backend", ["memory", "sqlite"])
+    def test_query_finds_similar_only(self, backend, tmp_path):
+        index = InMemoryLSHIndex() if backend == "memory" else SQLiteLSHIndex(str(tmp_path / "lsh.db"))
+        hasher = MinHasher()
+        index.add_many([(f"doc:{t}", hasher.signature(self.circular(t)), {"topic": t})
+                        for t in ("kyc", "aml", "fraud", "capital")])
+
+        matches = index.query(hasher.signature(self.circular("aml", edits=1)), threshold=0.8)
+        assert [m["item_id"] for m in matches] == ["doc:aml"]
+        assert matches[0]["meta"] == {"topic": "aml"}
+        assert index.query(hasher.signature(self.circular("liquidity")), threshold=0.5) == []
+
+    def test_sqlite_index_persists(self, tmp_path):
+        path = str(tmp_path / "lsh.db")
+        signature = MinHasher().signature(self.circular("kyc"))
+        SQLiteLSHIndex(path).add("doc:kyc", signature, {"source": "rbi"})
+        reopened = SQLiteLSHIndex(path)
+        assert "doc:kyc" in reopened
+        assert reopened.query(signature)[0]["meta"] == {"source": "rbi"}
+
+    def test_republished_circular_flagged_across_sources(self, config_path):
+        agent = DiffAgent(sources_config_path=config_path)
+        text = regulation(clauses=60)
+        original = agent.analyze_changes({"snapshot_id": "rbi-1", "source": "rbi", "sha256": "a", "text": text})
+        assert original["near_duplicate_of"] is None
+
+        # Same circular on the press-release page, with a different header
+        press = agent.analyze_changes({"snapshot_id": "press-1", "source": "rbi_press", "sha256": "b",
+                                       "text": "Press Release 2026-10. " + text})
+        assert press["near_duplicate_of"]["snapshot_id"] == "rbi-1"
+        assert press["skip_llm_extraction"]
+
+        # A new version of the same source is a change, not a duplicate
+        update = agent.analyze_changes({"snapshot_id": "rbi-2", "source": "rbi", "sha256": "c",
+                                        "text": regulation(clauses=60, amended=5)})
+        assert update["change_detected"]
+        assert update["near_duplicate_of"] is None
+        assert not update["skip_llm_extraction"]
+
+    def test_index_from_settings_survives_restart(self, tmp_path):
+        config_path = tmp_path / "sources.yaml"
+        config_path.write_text("sources: []\nsettings:\n  version_history_backend: memory\n"
+                               f"  lsh_index_path: {tmp_path / 'lsh.db'}\n")
+        text = regulation(clauses=60)
+        DiffAgent(sources_config_path=str(config_path)).analyze_changes(
+            {"snapshot_id": "rbi-1", "source": "rbi", "sha256": "a", "text": text})
+
+        restarted = DiffAgent(sources_config_path=str(config_path))
+        assert isinstance(restarted.duplicate_index, SQLiteLSHIndex)
+        press = restarted.analyze_changes({"snapshot_id": "press-1", "source": "rbi_press", "sha256": "b",
+                                           "text": "Press Release 2026-10. " + text})
+        assert press["near_duplicate_of"]["snapshot_id"] == "rbi-1"
+
+    def test_duplicate_sections_linked(self, config_path):
+        agent = DiffAgent(section_index=True, sources_config_path=config_path)
+        clause = " ".join(f"The regulated entity shall report cyber incident class {i} to the "
+                          f"supervisory authority within six hours of detection." for i in range(6))
+        other = " ".join(f"Providers operating data centre {i} shall keep logs for one hundred and "
+                         f"eighty days." for i in range(6))
+        agent.analyze_changes({"snapshot_id": "cert-1", "source": "cert", "sha256": "a",
+                               "text": f"1. {clause}\n\n2. {other}"})
+        result = agent.analyze_changes({
+            "snapshot_id": "sebi-1", "source": "sebi", "sha256": "b",
+            "text": "Circular on the resilience of market infrastructure institutions and their vendors."
+                    f"\n\n1. {clause}\n\n8. {other}",
+        })
+
+        assert result["near_duplicate_of"] is None
+        assert [(d["duplicate_of"]["snapshot_id"], d["similarity"] == 1.0)
+                for d in result["duplicate_sections"]] == [("cert-1", True), ("cert-1", False)]
+
+    def test_disabled(self, config_path):
+        agent = DiffAgent(detect_duplicates=False, sources_config_path=config_path)
+        result = agent.analyze_changes({"snapshot_id": "s1", "source": "rbi", "sha256": "a", "text": regulation()})
+        assert "near_duplicate_of" not in result
+
+
+class TestStructuralDiff:
+    """Test structural_diff_merkle on fingerprints stored out of band"""
+
+    @staticmethod
+    def page(rows):
+        return "<html><body><table>" + "".join(f"<tr><td>Circular {r}</td></tr>" for r in rows) + "</table></body></html>"
+
+    def test_summaries_load_trees_only_when_roots_differ(self, tmp_path):
+        store = LocalBlobStore(str(tmp_path / "blobs"))
+        loads = []
+
+        def summary(html):
+            tree = fingerprint_html(html)
+            return fingerprint_summary(tree, store.put(encode_fingerprint(tree)), store.kind)
+
+        def load(ref):
+            loads.append(ref)
+            return store.get(ref)
+
+        old = summary(self.page(range(500)))
+        same = tools.structural_diff_merkle(old, summary(self.page(range(500))), load=load)
+        assert not same["has_structural_change"] and loads == []
+
+        result = tools.structural_diff_merkle(old, summary(self.page([-1] + list(range(500)))), load=load)
+        assert result["added_tags"] == {"tr": 1, "td": 1}
+        assert result["removed_tags"] == {}
+        assert (result["old_tag_count"], result["new_tag_count"]) == (1003, 1005)
+        assert result["nodes_visited"] < 10
+
+
+class TestTextDiff:
+    """Test text_diff output"""
+
+    def test_counts_and_samples(self):
+        result = tools.text_diff("a\nb\nc\n", "a\nB\nc\nd\n")
+
+        assert result["added_lines"] == 2
+        assert result["removed_lines"] == 1
+        assert result["total_changes"] == 3
+        assert result["sample_added"] == ["+B", "+d"]
+        assert result["sample_removed"] == ["-b"]
+        assert 0 < result["similarity_ratio"] < 1
+
+    def test_no_change(self):
+        result = tools.text_diff("same\ntext", "same\ntext")
+
+        assert result["total_changes"] == 0
+        assert result["similarity_ratio"] == 1.0
+
+    def test_new_obligations_ignore_moved_lines(self):
+        old = "Banks shall report fraud.\nIntro."
+        new = "Intro.\nBanks shall report fraud.\nEntities must verify KYC annually."
+
+        assert tools.detect_new_obligations(old, new) == ["entities must verify kyc annually."]
+
+    def test_changed_sections_one_per_hunk(self):
+        old = "\n".join(f"clause {i}" for i in range(30))
+        new = old.replace("clause 3\n", "clause 3 amended\n").replace("clause 25", "clause 25 amended")
+
+        sections = tools.extract_changed_sections(old, new, context_lines=1)
+
+        assert len(sections) == 2
+        assert sections[0]["context"] == ["clause 2", "clause 3", "clause 3 amended", "clause 4"]
+
+
+class TestDiffAgent:
+    """Test DiffAgent.analyze_changes"""
+
+    def test_documents_diffed_once(self, monkeypatch, config_path):
+        calls = []
+        real = tools.diff_texts
+        monkeypatch.setattr(tools, "diff_texts", lambda *a: calls.append(a) or real(*a))
+
+        previous = {"snapshot_id": "s1", "source": "rbi", "sha256": "a",
+                    "text": "Intro.\nBanks may report fraud."}
+        current = {"snapshot_id": "s2", "source": "rbi", "sha256": "b",
+                   "text": "Intro.\nBanks shall report fraud within 7 days."}
+
+        result = DiffAgent(sources_config_path=config_path).analyze_changes(current, previous)
+
+        assert len(calls) == 1
+        assert result["new_obligations"] == ["banks shall report fraud within 7 days."]
+        assert result["changed_sections_count"] == 1
+        assert "1 changed sections." in result["summary"]
+
+    def test_section_index_mode(self, monkeypatch, config_path):
+        agent = DiffAgent(section_index=True, sources_config_path=config_path)
+        previous = {"snapshot_id": "s1", "source": "rbi", "sha256": "a", "text": regulation()}
+        agent.analyze_changes(previous)
+        assert len(previous["sections"]) == 300
+
+        indexed = []
+        real = tools.section_index
+        monkeypatch.setattr(tools, "section_index", lambda text: indexed.append(text) or real(text))
+
+        current = {"snapshot_id": "s2", "source": "rbi", "sha256": "b", "text": regulation(amended=7)}
+        result = agent.analyze_changes(current, previous)
+
+        # The previous version is not re-chunked
+        assert indexed == [current["text"]]
+        assert result["diff_stats"]["total_changes"] == 2
+        assert result["new_obligations"] == [
+            "7. the regulated entity shall maintain record type 7 for five years "
+            "and report it to the reserve bank within 7 days."
+        ]
+
+    def test_previous_version_from_history(self, config_path):
+        agent = DiffAgent(version_history=InMemoryVersionHistory(), sources_config_path=config_path)
+        first = {"snapshot_id": "s1", "source": "rbi", "sha256": "a", "text": regulation(), "raw_html": "<p/>"}
+        second = {"snapshot_id": "s2", "source": "rbi", "sha256": "b", "text": regulation(amended=3)}
+
+        assert agent.analyze_changes(first)["is_first_fetch"]
+        result = agent.analyze_changes(second)
+
+        assert result["change_detected"]
+        assert result["diff_stats"]["total_changes"] == 2
+        previous = agent.previous_version("rbi")
+        assert previous["snapshot_id"] == "s2"
+        assert "raw_html" not in agent.version_history.get("rbi", 0).meta
+
+        # Unchanged content is not stored again
+        agent.analyze_changes({**second, "snapshot_id": "s3"})
+        assert agent.version_history.version_count("rbi") == 2
+
+    def test_no_config_needed(self, monkeypatch, tmp_path):
+        """Test the agent starts outside the repo root with in-memory stores"""
+        monkeypatch.chdir(tmp_path)
+        
+        agent = DiffAgent()
+        
+        assert isinstance(agent.version_history, InMemoryVersionHistory)
+        assert isinstance(agent.duplicate_index, InMemoryLSHIndex)
+        assert agent.embedding_cache.path is None
+        assert list(tmp_path.iterdir()) == []
+    
+    def test_history_from_settings_survives_restart(self, tmp_path):
+        config_path = tmp_path / "sources.yaml"
+        config_path.write_text(f"sources: []\nsettings:\n  version_history_path: {tmp_path / 'history.db'}\n"
+                               "  lsh_index_backend: memory\n")
+        snapshot = {"snapshot_id": "s1", "source": "rbi", "sha256": "a", "text": regulation()}
+        DiffAgent(sources_config_path=str(config_path)).analyze_changes(snapshot)
+
+        restarted = DiffAgent(sources_config_path=str(config_path))
+        assert isinstance(restarted.version_history, SQLiteVersionHistory)
+        assert restarted.previous_version("rbi")["snapshot_id"] == "s1"
+
+
+class TestParallelBatch:
+    """Test analyze_batch in a process pool"""
+
+    @staticmethod
+    def batch():
+        big = regulation(clauses=2000)  # > 64 KB: passed to workers by file
+        snapshots = [
+            {"snapshot_id": f"{source}-{version}", "source": source, "sha256": f"{source}{version}",
+             "text": regulation(clauses=100 + i, amended=version) if i else
+             big.replace(" 9. The", f" 9. {version} The")}
+            for i, source in enumerate(["rbi", "sebi", "irdai", "pfrda"])
+            for version in (1, 2)
+        ]
+        # Same source twice in one batch, a snapshot without a source, an
+        # unchanged one
+        snapshots += [
+            {"snapshot_id": "rbi-3", "source": "rbi", "sha256": "rbi3", "text": big},
+            {"snapshot_id": "orphan", "sha256": "x", "text": "shall"},
+            {"snapshot_id": "sebi-again", "source": "sebi", "sha256": "sebi2", "text": snapshots[3]["text"]},
+        ]
+        previous = [{"snapshot_id": "irdai-0", "source": "irdai", "sha256": "irdai0",
+                     "text": regulation(clauses=102)}]
+        return snapshots, previous
+
+    @pytest.mark.parametrize("section_index", [False, True])
+    def test_parallel_matches_serial(self, section_index, config_path):
+        outputs, histories = [], []
+        for workers in (1, 2):
+            agent = DiffAgent(section_index=section_index, batch_workers=workers,
+                              sources_config_path=config_path)
+            for round_ in range(2):
+                snapshots, previous = self.batch()
+                output = agent.analyze_batch(snapshots, previous if round_ else None)
+            for analysis in output["analyses"]:
+                analysis.pop("analyzed_at", None)
+            output.pop("timestamp")
+            outputs.append(output)
+            histories.append({
+                source: [agent.version_history.get(source, v).meta["snapshot_id"]
+                         for v in range(agent.version_history.version_count(source))]
+                for source in ("rbi", "sebi", "irdai", "pfrda")
+            })
+            if section_index:
+                assert all("sections" in snapshot for snapshot in snapshots)
+
+        assert outputs[0] == outputs[1]
+        assert histories[0] == histories[1]
+        assert outputs[1]["changes_detected"] > 0
+        assert any(a.get("duplicate_sections") for a in outputs[1]["analyses"])
+
+    def test_sections_embedded_in_parent(self, model, config_path):
+        agent = DiffAgent(batch_workers=2, sources_config_path=config_path)
+        for version in (0, 1):
+            agent.analyze_batch([
+                {"snapshot_id": f"{source}-{version}", "source": source, "sha256": f"{source}{version}",
+                 "text": regulation(clauses=100, amended=amended if version else None)}
+                for source, amended in (("rbi", 5), ("sebi", 7))
+            ])
+
+        # Workers do not embed: the parent's model and cache did
+        assert len(model.encoded) == 4
+        assert len(agent.embedding_cache) == 4
@@ -0,0 +1,47 @@
+"""
+Unit tests for Agent 4 (Legal Intelligence LLM).
+"""
+
+from agents.agent_4_legal import tools
+from agents.agent_4_legal.agent import LegalAgent
+
+
+class TestConstruction:
+    """Test the agent's default stores"""
+
+    def test_no_config_needed(self, monkeypatch, tmp_path):
+        """Test the agent starts outside the repo root and writes no files"""
+        monkeypatch.chdir(tmp_path)
+
+        agent = LegalAgent()
+
+        assert agent.result_cache.path is None
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestNearDuplicateLinking:
+    """Test that near-duplicates from Agent 3 are linked, not re-extracted"""
+
+    def test_duplicate_reuses_earlier_extraction(self, monkeypatch, tmp_path):
+        calls = []
+        real = tools.llm_extract_obligations
+        monkeypatch.setattr(tools, "llm_extract_obligations", lambda *a, **k: calls.append(a) or real(*a, **k))
+
+        config_path = tmp_path / "sources.yaml"
+        config_path.write_text(f"sources: []\nsettings:\n  extraction_cache_path: {tmp_path / 'results.db'}\n")
+        original = LegalAgent(sources_config_path=str(config_path)).extract_obligations({
+            "snapshot_id": "rbi-1", "source": "RBI", "change_detected": True,
+            "summary": "Banks shall report cyber incidents within 6 hours.",
+            "change_types": ["content"], "severity": "HIGH",
+        })
+        # After a restart the earlier result still resolves
+        linked = LegalAgent(sources_config_path=str(config_path)).extract_obligations({
+            "snapshot_id": "press-1", "source": "RBI Press", "change_detected": False,
+            "is_first_fetch": True, "skip_llm_extraction": True,
+            "near_duplicate_of": {"snapshot_id": "rbi-1", "source": "RBI", "similarity": 0.97},
+        })
+
+        assert len(calls) == 1
+        assert linked["linked_to"]["snapshot_id"] == "rbi-1"
+        assert linked["obligations_extracted"] == original["obligations_extracted"]
+        assert linked["obligations_count"] == original.get("obligations_count", 0)
@@ -0,0 +1,61 @@
+"""
+Unit tests for Agent 9 (ZK + Cardano).
+"""
+
+from agents.agent_9_zk.agent import ZKCardanoAgent
+from utils.merkle import InclusionProof, verify_inclusion
+from utils.proof_codec import decode_proof
+
+
+def make_obligations(n):
+    return [
+        {"id": f"OBL-{i}", "text": f"Banks shall file return {i} quarterly", "severity": "HIGH"}
+        for i in range(n)
+    ]
+
+
+class TestObligationLog:
+    """Test the running obligation log and its inclusion proofs"""
+
+    def test_appended_obligation_proves_against_root(self):
+        agent = ZKCardanoAgent()
+        obligations = make_obligations(5)
+
+        first = agent.append_obligations(obligations[:3])
+        second = agent.append_obligations(obligations[3:])
+        proof = agent.prove_obligation(second["leaf_indexes"][0])
+
+        assert first["leaf_indexes"] == [0, 1, 2]
+        assert second["leaf_indexes"] == [3, 4]
+        assert second["merkle_root"] == agent.generate_merkle_root(obligations)
+        assert proof["merkle_root"] == second["merkle_root"]
+        assert verify_inclusion(
+            proof["merkle_root"], agent.obligation_digest(obligations[3]), InclusionProof.from_dict(proof)
+        )
+
+    def test_altered_obligation_does_not_verify(self):
+        agent = ZKCardanoAgent()
+        obligations = make_obligations(4)
+        agent.append_obligations(obligations)
+        proof = agent.prove_obligation(2)
+
+        altered = {**obligations[2], "text": "Banks may file return 2 annually"}
+
+        assert not verify_inclusion(
+            proof["merkle_root"], agent.obligation_digest(altered), InclusionProof.from_dict(proof)
+        )
+
+
+class TestAuditReport:
+    """Test audit report export"""
+
+    def test_export_round_trips(self):
+        agent = ZKCardanoAgent()
+        obligations = make_obligations(3)
+        root = agent.append_obligations(obligations)["merkle_root"]
+        report = agent.generate_audit_report("ab" * 32, root, obligations)
+
+        exported = agent.export_audit_report(report)
+
+        assert isinstance(exported, bytes)
+        assert decode_proof(exported) == report
@@ -0,0 +1,103 @@
+"""
+Content-addressed blob stores for event payloads that are too large to put
+on the event bus (claim-check pattern).
+
+- LocalBlobStore: files named by SHA-256 under a directory (single host /
+  shared volume)
+- IPFSBlobStore: blobs added to IPFS, referenced by CID
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class BlobStore(ABC):
+    """Put bytes, get back an opaque reference; get bytes by reference"""
+
+    kind: str = ""
+
+    @abstractmethod
+    def put(self, data: bytes) -> str:
+        """Store data and return its reference"""
+
+    @abstractmethod
+    def get(self, ref: str) -> bytes:
+        """Load data by reference"""
+
+
+class LocalBlobStore(BlobStore):
+    """Blobs stored as <root>/<sha256[:2]>/<sha256>; identical data is stored once"""
+
+    kind = "local"
+
+    def __init__(self, root: str = "data/blobs"):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        logger.info(f"Local blob store: {self.root}")
+
+    def _path(self, ref: str) -> Path:
+        if len(ref) != 64 or not all(c in '0123456789abcdef' for c in ref):
+            raise ValueError(f"Invalid blob reference: {ref}")
+        return self.root / ref[:2] / ref
+
+    def put(self, data: bytes) -> str:
+        ref = hashlib.sha256(data).hexdigest()
+        path = self._path(ref)
+        if path.exists():
+            return ref
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return ref
+
+    def get(self, ref: str) -> bytes:
+        return self._path(ref).read_bytes()
+
+
+class IPFSBlobStore(BlobStore):
+    """Blobs stored in IPFS through utils.ipfs_client.IPFSClient"""
+
+    kind = "ipfs"
+
+    def __init__(self, ipfs_client):
+        self.ipfs_client = ipfs_client
+
+    def put(self, data: bytes) -> str:
+        return self.ipfs_client.add(data)
+
+    def get(self, ref: str) -> bytes:
+        return self.ipfs_client.get(ref)
+
+
+def create_blob_store(ipfs_client=None) -> BlobStore:
+    """
+    Build the blob store selected by utils.config.
+
+    CLAIM_CHECK_STORE: local (default, files under BLOB_STORE_PATH) | ipfs
+    ipfs_client: Client for the ipfs store (default: built from utils.config)
+    """
+    from utils.config import config
+
+    store = config.redis.claim_check_store
+    if store == 'local':
+        return LocalBlobStore(config.redis.blob_store_path)
+    if store == 'ipfs':
+        if ipfs_client is None:
+            from utils.ipfs_client import IPFSClient
+            ipfs_client = IPFSClient(
+                api_host=config.ipfs.api_host,
+                api_port=config.ipfs.api_port,
+                gateway_url=config.ipfs.gateway_url,
+            )
+        return IPFSBlobStore(ipfs_client)
+
+    raise ValueError(f"Unknown blob store: {store}")
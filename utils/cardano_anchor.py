@@ -3,12 +3,13 @@ Cardano blockchain anchoring for immutable audit trail.
 Uses Blockfrost API for mainnet transactions.
 """
 
-import requests
 import hashlib
 import json
 from datetime import datetime
 from typing import Dict, Optional
 
+from utils.http_client import get_session
+
 
 class CardanoAnchor:
     """
@@ -155,7 +156,7 @@ class CardanoAnchor:
             
             # Get transaction metadata
             url = f"{self.base_url}/txs/{tx_hash}/metadata"
-            response = requests.get(url, headers=headers)
+            response = get_session().get(url, headers=headers)
             
             if response.status_code == 200:
                 metadata = response.json()
@@ -0,0 +1,329 @@
+"""
+Content-defined chunk storage for snapshots.
+
+Sources are polled every few hours and most polls return a document that is
+identical, or differs by a paragraph, from the previous one. Uploading the
+whole document each time makes storage grow with the number of polls.
+
+Instead, snapshots are cut into variable-size chunks at content-defined
+boundaries (gear rolling hash, FastCDC-style normalized chunking). An edit
+only changes the chunks it touches; every other chunk hashes the same as
+before and is not uploaded again. Each snapshot is stored as a small
+manifest listing its chunk hashes / CIDs in order.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+_MASK_64 = (1 << 64) - 1
+
+# Fixed pseudo-random gear table (derived, not random, so boundaries are
+# stable across processes and releases)
+GEAR = [
+    int.from_bytes(hashlib.sha256(b'seraphs-gear-%d' % i).digest()[:8], 'big')
+    for i in range(256)
+]
+_GEAR_ARRAY = np.array(GEAR, dtype=np.uint64)
+
+
+def _top_bits_mask(bits: int) -> int:
+    """Mask over the top `bits` bits of the 64-bit gear hash"""
+    return ((1 << bits) - 1) << (64 - bits)
+
+
+def _gear_candidates(data, mask_strict: int, mask_loose: int, block: int = 1 << 20):
+    """
+    Offsets where the 64-byte-window gear hash passes each cut mask.
+
+    The hash is (h << 1) + GEAR[byte] mod 2**64, so a byte stops affecting it
+    64 steps later and h only depends on the last 64 bytes. The window hash is
+    built by doubling (1, 2, 4 ... 64 bytes) in a few vector passes instead of
+    one Python step per byte. Works on 1 MiB blocks to bound memory.
+
+    Returns:
+        (strict, loose) sorted offset arrays; the strict mask covers the
+        loose one, so strict hits are picked out of the loose hits
+    """
+    raw = np.frombuffer(data, dtype=np.uint8)
+    strict_found, loose_found = [], []
+    for offset in range(0, len(raw), block):
+        lead = min(offset, 63)
+        h = _GEAR_ARRAY[raw[offset - lead:offset + block]]
+        width = 1
+        while width < 64:
+            h[width:] += h[:-width] << np.uint64(width)
+            width *= 2
+        h = h[lead:]
+        loose = np.flatnonzero((h & np.uint64(mask_loose)) == 0)
+        strict = loose[(h[loose] & np.uint64(mask_strict)) == 0]
+        loose_found.append(loose + offset)
+        strict_found.append(strict + offset)
+    return np.concatenate(strict_found), np.concatenate(loose_found)
+
+
+def _first_in(candidates: np.ndarray, low: int, high: int) -> Optional[int]:
+    """First candidate offset in [low, high), if any"""
+    index = int(np.searchsorted(candidates, low))
+    if index < len(candidates) and candidates[index] < high:
+        return int(candidates[index])
+    return None
+
+
+def chunk_boundaries(
+    data: Union[bytes, bytearray, memoryview],
+    min_size: int = 2048,
+    avg_size: int = 8192,
+    max_size: int = 65536,
+) -> List[int]:
+    """
+    Find content-defined chunk boundaries.
+
+    Uses a gear rolling hash: h = (h << 1) + GEAR[byte]. A cut is made where
+    the top bits of h are zero. Before avg_size a stricter mask is used and
+    after it a looser one, which keeps chunk sizes close to avg_size.
+
+    The hash restarts at min_size into each chunk. Its first 63 steps see
+    fewer than 64 bytes and are computed directly; from then on it equals
+    the window hash, whose cut candidates are found in bulk with numpy.
+
+    Args:
+        data: Bytes to chunk
+        min_size: No cut before this many bytes into a chunk
+        avg_size: Target chunk size (power of two)
+        max_size: Forced cut after this many bytes
+
+    Returns:
+        End offsets of each chunk (last one == len(data))
+    """
+    bits = avg_size.bit_length() - 1
+    mask_strict = _top_bits_mask(bits + 2)
+    mask_loose = _top_bits_mask(bits - 2)
+    gear = GEAR
+    n = len(data)
+    cuts = []
+    start = 0
+
+    if n <= min_size:
+        return [n] if n else []
+
+    strict, loose = _gear_candidates(data, mask_strict, mask_loose)
+
+    while start < n:
+        end = min(start + max_size, n)
+        if end - start <= min_size:
+            cuts.append(end)
+            break
+
+        h = 0
+        cut = None
+        normal = min(start + avg_size, end)
+        i = start + min_size
+        warm = min(i + 63, end)
+
+        while i < warm:
+            h = ((h << 1) + gear[data[i]]) & _MASK_64
+            if not h & (mask_strict if i < normal else mask_loose):
+                cut = i + 1
+                break
+            i += 1
+
+        if cut is None:
+            hit = _first_in(strict, warm, normal)
+            if hit is None:
+                hit = _first_in(loose, max(warm, normal), end)
+            cut = end if hit is None else hit + 1
+
+        cuts.append(cut)
+        start = cut
+
+    return cuts
+
+
+class ChunkRef(BaseModel):
+    """One chunk of a snapshot"""
+    sha256: str
+    cid: str
+    size: int
+
+
+class ChunkManifest(BaseModel):
+    """Ordered chunk list that reassembles into one snapshot"""
+    sha256: str
+    size: int
+    chunks: List[ChunkRef]
+    new_chunks: int = 0
+    new_bytes: int = 0
+
+    @property
+    def chunk_hashes(self) -> List[str]:
+        return [chunk.sha256 for chunk in self.chunks]
+
+
+class ChunkStore:
+    """
+    Deduplicating snapshot store on top of IPFSClient.
+
+    Keeps an index of chunk hashes already uploaded (in memory, plus SQLite
+    when a path is given) so unchanged chunks cost a lookup, not an upload.
+    A snapshot whose full hash was stored before reuses its chunk list
+    without being re-chunked, and bodies up to min_chunked_size are stored
+    as a single chunk.
+    """
+
+    def __init__(
+        self,
+        ipfs_client,
+        index_path: Optional[str] = None,
+        min_size: int = 2048,
+        avg_size: int = 8192,
+        max_size: int = 65536,
+        min_chunked_size: int = 65536,
+    ):
+        self.ipfs_client = ipfs_client
+        self.min_size = min_size
+        self.avg_size = avg_size
+        self.max_size = max_size
+        self.min_chunked_size = min_chunked_size
+        self._known: Dict[str, str] = {}
+        self._manifests: Dict[str, List[ChunkRef]] = {}
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        if index_path:
+            Path(index_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(index_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS chunks ("
+                "sha256 TEXT PRIMARY KEY, cid TEXT NOT NULL, size INTEGER NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS manifests ("
+                "sha256 TEXT PRIMARY KEY, chunks TEXT NOT NULL)"
+            )
+            self._db.commit()
+            logger.info(f"Chunk index: {index_path}")
+
+    def store(self, content: Union[str, bytes, bytearray, memoryview]) -> ChunkManifest:
+        """
+        Chunk content and upload the chunks not stored before.
+
+        Args:
+            content: Snapshot body (str is UTF-8 encoded)
+
+        Returns:
+            ChunkManifest (new_chunks / new_bytes count what was uploaded)
+        """
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        data = memoryview(content).cast('B')
+        content_hash = hashlib.sha256(data).hexdigest()
+
+        known = self._lookup_manifest(content_hash)
+        if known is not None:
+            logger.info(f"Snapshot unchanged: reusing {len(known)} stored chunks")
+            return ChunkManifest(sha256=content_hash, size=len(data), chunks=known)
+
+        if len(data) <= self.min_chunked_size:
+            boundaries = [len(data)]
+        else:
+            boundaries = chunk_boundaries(data, self.min_size, self.avg_size, self.max_size)
+
+        chunks = []
+        new_chunks = 0
+        new_bytes = 0
+        start = 0
+        for end in boundaries:
+            piece = data[start:end]
+            chunk_hash = hashlib.sha256(piece).hexdigest()
+            cid = self._lookup(chunk_hash)
+            if cid is None:
+                cid = self.ipfs_client.add(piece.tobytes())
+                self._remember(chunk_hash, cid, len(piece))
+                new_chunks += 1
+                new_bytes += len(piece)
+            chunks.append(ChunkRef(sha256=chunk_hash, cid=cid, size=len(piece)))
+            start = end
+
+        self._remember_manifest(content_hash, chunks)
+        manifest = ChunkManifest(
+            sha256=content_hash,
+            size=len(data),
+            chunks=chunks,
+            new_chunks=new_chunks,
+            new_bytes=new_bytes,
+        )
+        logger.info(
+            f"Chunked snapshot: {len(chunks)} chunks, {new_chunks} new "
+            f"({new_bytes}/{len(data)} bytes uploaded)"
+        )
+        return manifest
+
+    def put_manifest(self, manifest: ChunkManifest) -> str:
+        """Upload a manifest; its CID identifies the snapshot"""
+        return self.ipfs_client.add_json(
+            manifest.model_dump(include={'sha256', 'size', 'chunks'})
+        )
+
+    def load(self, manifest: ChunkManifest) -> bytes:
+        """Reassemble a snapshot from its chunks (verifies the hash)"""
+        content = b''.join(self.ipfs_client.get(chunk.cid) for chunk in manifest.chunks)
+        if hashlib.sha256(content).hexdigest() != manifest.sha256:
+            raise ValueError(f"Reassembled snapshot does not match {manifest.sha256}")
+        return content
+
+    def load_manifest(self, manifest_cid: str) -> ChunkManifest:
+        """Fetch a stored manifest by CID"""
+        return ChunkManifest.model_validate(self.ipfs_client.get_json(manifest_cid))
+
+    def _lookup(self, chunk_hash: str) -> Optional[str]:
+        with self._lock:
+            cid = self._known.get(chunk_hash)
+            if cid is None and self._db is not None:
+                row = self._db.execute(
+                    "SELECT cid FROM chunks WHERE sha256 = ?", (chunk_hash,)
+                ).fetchone()
+                if row:
+                    cid = self._known[chunk_hash] = row[0]
+            return cid
+
+    def _remember(self, chunk_hash: str, cid: str, size: int) -> None:
+        with self._lock:
+            self._known[chunk_hash] = cid
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO chunks (sha256, cid, size) VALUES (?, ?, ?)",
+                    (chunk_hash, cid, size),
+                )
+                self._db.commit()
+
+    def _lookup_manifest(self, content_hash: str) -> Optional[List[ChunkRef]]:
+        with self._lock:
+            chunks = self._manifests.get(content_hash)
+            if chunks is None and self._db is not None:
+                row = self._db.execute(
+                    "SELECT chunks FROM manifests WHERE sha256 = ?", (content_hash,)
+                ).fetchone()
+                if row:
+                    chunks = [ChunkRef.model_validate(chunk) for chunk in json.loads(row[0])]
+                    self._manifests[content_hash] = chunks
+            return chunks
+
+    def _remember_manifest(self, content_hash: str, chunks: List[ChunkRef]) -> None:
+        with self._lock:
+            self._manifests[content_hash] = chunks
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO manifests (sha256, chunks) VALUES (?, ?)",
+                    (content_hash, json.dumps([chunk.model_dump() for chunk in chunks])),
+                )
+                self._db.commit()
@@ -25,6 +25,10 @@ class RedisConfig(BaseModel):
     password: Optional[str] = None
     db: int = Field(default=0)
     stream_name: str = Field(default="seraphs:events")
+    # Payloads larger than this go to the blob store (0 = never)
+    claim_check_threshold: int = Field(default=256 * 1024)
+    claim_check_store: str = Field(default="local")  # local | ipfs
+    blob_store_path: str = Field(default="data/blobs")
 
 
 class IPFSConfig(BaseModel):
@@ -51,6 +55,17 @@ class LLMConfig(BaseModel):
     default_model: str = Field(default="claude-sonnet-3-5")
 
 
+class HTTPConfig(BaseModel):
+    """Shared outbound HTTP policy (see utils.http_client)"""
+    user_agent: str = Field(default="Seraphs-Bot/2.0 (Compliance Intelligence System)")
+    timeout: float = Field(default=30.0)
+    max_retries: int = Field(default=3)
+    backoff_factor: float = Field(default=0.5)
+    pool_hosts: int = Field(default=20)  # hosts kept in the pool
+    pool_per_host: int = Field(default=10)  # keep-alive connections per host
+    http2: bool = Field(default=False)  # needs the h2 package
+
+
 class Config(BaseModel):
     """Main application configuration"""
     environment: str = Field(default="development")
@@ -60,6 +75,7 @@ class Config(BaseModel):
     ipfs: IPFSConfig = Field(default_factory=IPFSConfig)
     database: DatabaseConfig = Field(default_factory=DatabaseConfig)
     llm: LLMConfig = Field(default_factory=LLMConfig)
+    http: HTTPConfig = Field(default_factory=HTTPConfig)
 
 
 def load_config() -> Config:
@@ -79,6 +95,9 @@ def load_config() -> Config:
             password=os.getenv("REDIS_PASSWORD"),
             db=int(os.getenv("REDIS_DB", "0")),
             stream_name=os.getenv("REDIS_STREAM_NAME", "seraphs:events"),
+            claim_check_threshold=int(os.getenv("CLAIM_CHECK_THRESHOLD_BYTES", str(256 * 1024))),
+            claim_check_store=os.getenv("CLAIM_CHECK_STORE", "local"),
+            blob_store_path=os.getenv("BLOB_STORE_PATH", "data/blobs"),
         ),
         ipfs=IPFSConfig(
             api_host=os.getenv("IPFS_API_HOST", "localhost"),
@@ -97,9 +116,41 @@ def load_config() -> Config:
             anthropic_api_key=os.getenv("ANTHROPIC_API_KEY"),
             openai_api_key=os.getenv("OPENAI_API_KEY"),
         ),
+        http=HTTPConfig(
+            timeout=float(os.getenv("HTTP_TIMEOUT", "30")),
+            max_retries=int(os.getenv("HTTP_MAX_RETRIES", "3")),
+            backoff_factor=float(os.getenv("HTTP_BACKOFF_FACTOR", "0.5")),
+            pool_per_host=int(os.getenv("HTTP_POOL_PER_HOST", "10")),
+            http2=os.getenv("HTTP2", "false").lower() == "true",
+        ),
     )
 
 
+# Settings for agents created without a sources.yaml: every store they
+# build for themselves stays in process memory
+IN_MEMORY_SETTINGS: Dict[str, Any] = {
+    'version_history_backend': 'memory',
+    'lsh_index_backend': 'memory',
+    'verification_cache_backend': 'memory',
+}
+
+
+def load_agent_settings(config_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Settings that select an agent's stores.
+    
+    Args:
+        config_path: sources.yaml to read; None keeps every store in memory
+            (no file is read and nothing is written under data/)
+        
+    Returns:
+        The file's settings section, or IN_MEMORY_SETTINGS
+    """
+    if config_path is None:
+        return dict(IN_MEMORY_SETTINGS)
+    return load_sources_config(config_path).get('settings') or {}
+
+
 def load_sources_config(config_path: str = "config/sources.yaml") -> Dict[str, Any]:
     """
     Load regulatory sources configuration from YAML.
@@ -0,0 +1,239 @@
+"""
+Hierarchical (Merkle) fingerprints of HTML DOM trees.
+
+Every element gets a hash built from its tag, attributes, its own text and
+the hashes of its children, so the root hash commits to the whole document
+and equal hashes mean equal subtrees. Comparing two snapshots then only
+descends into subtrees whose hashes differ: localizing a change costs
+O(changed nodes x depth) instead of a diff over the full document.
+
+Fingerprint node shape (JSON-serializable):
+    {'tag': 'tr', 'hash': '9f2c...', 'children': [...]}
+'children' is omitted for leaf elements; the root also carries 'elements'
+(number of nodes in the tree).
+
+The full tree is about twice the size of the HTML, so it is not put in
+snapshot events: Agent 1 stores it in a blob store (encode_fingerprint)
+and the event carries fingerprint_summary(), the root hash plus the blob
+reference. Equal root hashes need nothing more; otherwise Agent 3 loads
+both trees (decode_fingerprint) and descends only where they differ.
+"""
+
+import difflib
+import hashlib
+import json
+import zlib
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+# Subtrees that carry no document content
+SKIP_TAGS = frozenset({'script', 'style', 'noscript', 'template'})
+
+HASH_CHARS = 16
+
+
+def _own_content(element) -> str:
+    """Tag, sorted attributes and directly contained text of an element"""
+    attrs = '\x1f'.join(f"{k}={v}" for k, v in sorted(element.attrib.items()))
+    texts = [(element.text or '').strip()]
+    texts.extend((child.tail or '').strip() for child in element)
+    return f"{element.tag}\x1e{attrs}\x1e" + '\x1f'.join(t for t in texts if t)
+
+
+def _content_children(element):
+    """Child elements, skipping comments / processing instructions and SKIP_TAGS"""
+    return (
+        child for child in element
+        if isinstance(child.tag, str) and child.tag not in SKIP_TAGS
+    )
+
+
+def build_fingerprint(root) -> Dict:
+    """
+    Build the Merkle fingerprint of an lxml element tree.
+
+    Iterative post-order walk, so very deep documents do not hit the
+    recursion limit.
+
+    Args:
+        root: lxml element (e.g. from agent 1's tools.parse_html)
+
+    Returns:
+        Root fingerprint node
+    """
+    # Frames of [element, iterator over its content children, child nodes]
+    stack = [[root, _content_children(root), []]]
+    elements = 0
+
+    while True:
+        element, children_iter, children = stack[-1]
+        child = next(children_iter, None)
+        if child is not None:
+            stack.append([child, _content_children(child), []])
+            continue
+
+        stack.pop()
+        elements += 1
+        digest = hashlib.sha256(_own_content(element).encode('utf-8'))
+        for node in children:
+            digest.update(node['hash'].encode('ascii'))
+
+        node = {'tag': element.tag, 'hash': digest.hexdigest()[:HASH_CHARS]}
+        if children:
+            node['children'] = children
+
+        if not stack:
+            node['elements'] = elements
+            return node
+        stack[-1][2].append(node)
+
+
+def fingerprint_html(html, encoding: str = 'utf-8') -> Dict:
+    """Parse HTML (str / bytes) and build its fingerprint"""
+    from lxml import etree
+
+    if isinstance(html, str):
+        html, encoding = html.encode('utf-8'), 'utf-8'
+    root = etree.fromstring(html or b'<html></html>', parser=etree.HTMLParser(encoding=encoding))
+    if root is None:
+        root = etree.fromstring(b'<html></html>', parser=etree.HTMLParser())
+    return build_fingerprint(root)
+
+
+def encode_fingerprint(node: Dict) -> bytes:
+    """Compact, compressed serialization of a full fingerprint (for a blob store)"""
+    return zlib.compress(json.dumps(node, separators=(',', ':')).encode('utf-8'))
+
+
+def decode_fingerprint(data: bytes) -> Dict:
+    """Inverse of encode_fingerprint"""
+    return json.loads(zlib.decompress(data))
+
+
+def fingerprint_summary(node: Dict, ref: str, store: str) -> Dict:
+    """
+    What a snapshot carries instead of the full tree.
+
+    Args:
+        node: Root fingerprint node
+        ref: Blob store reference of encode_fingerprint(node)
+        store: Blob store kind (BlobStore.kind)
+    """
+    return {
+        'tag': node['tag'],
+        'hash': node['hash'],
+        'elements': element_count(node),
+        'ref': ref,
+        'store': store,
+    }
+
+
+def element_count(node: Dict) -> int:
+    """Number of nodes in a fingerprint ('elements' on the root, else counted)"""
+    if 'elements' in node:
+        return node['elements']
+    return sum(1 for _ in iter_nodes(node))
+
+
+def resolve_fingerprint(node: Dict, load: Optional[Callable[[str], bytes]]) -> Dict:
+    """
+    Full tree for a fingerprint or fingerprint_summary.
+
+    Args:
+        load: Blob store get() for summaries (not called for full trees)
+    """
+    if 'ref' not in node:
+        return node
+    if load is None:
+        raise ValueError("Fingerprint summary needs a blob store to load the tree")
+    return decode_fingerprint(load(node['ref']))
+
+
+def iter_nodes(node: Dict):
+    """Yield every node of a fingerprint (pre-order)"""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        yield current
+        stack.extend(reversed(current.get('children', ())))
+
+
+def tag_counts(node: Dict) -> Counter:
+    """Number of elements per tag in a fingerprint"""
+    return Counter(n['tag'] for n in iter_nodes(node))
+
+
+def diff_fingerprints(old: Dict, new: Dict, max_changes: Optional[int] = None) -> Dict:
+    """
+    Localize the differences between two fingerprints.
+
+    Children are aligned by hash (difflib on the child hash sequences), so an
+    inserted row shows up as one 'added' node rather than every following
+    sibling looking modified. Equal subtrees are never entered.
+
+    Args:
+        old: Fingerprint of the previous snapshot
+        new: Fingerprint of the current snapshot
+        max_changes: Stop after this many changes (None = no limit)
+
+    Returns:
+        Dict with changes (op, path, tag), nodes_visited and tag_delta
+        (net elements gained (+) / lost (-) per tag, counted over the
+        added, removed and replaced subtrees only)
+        op: 'added' | 'removed' | 'modified' (own text/attributes changed)
+            | 'replaced' (different tag at the same position)
+    """
+    changes: List[Dict] = []
+    tag_delta: Counter = Counter()
+    visited = 0
+    stack = [(old, new, f"/{new['tag']}")]
+
+    while stack:
+        if max_changes is not None and len(changes) >= max_changes:
+            break
+        a, b, path = stack.pop()
+        visited += 1
+
+        if a['hash'] == b['hash']:
+            continue
+        if a['tag'] != b['tag']:
+            changes.append({'op': 'replaced', 'path': path, 'tag': b['tag'], 'old_tag': a['tag']})
+            tag_delta.update(tag_counts(b))
+            tag_delta.subtract(tag_counts(a))
+            continue
+
+        a_children = a.get('children', [])
+        b_children = b.get('children', [])
+        matcher = difflib.SequenceMatcher(
+            None,
+            [c['hash'] for c in a_children],
+            [c['hash'] for c in b_children],
+            autojunk=False,
+        )
+
+        child_changes = False
+        for op, i1, i2, j1, j2 in matcher.get_opcodes():
+            if op == 'equal':
+                continue
+            child_changes = True
+            paired = min(i2 - i1, j2 - j1) if op == 'replace' else 0
+            for k in range(paired):
+                child = b_children[j1 + k]
+                stack.append((a_children[i1 + k], child, f"{path}/{child['tag']}[{j1 + k}]"))
+            for k in range(i1 + paired, i2):
+                changes.append({'op': 'removed', 'path': f"{path}/{a_children[k]['tag']}[{k}]",
+                                'tag': a_children[k]['tag']})
+                tag_delta.subtract(tag_counts(a_children[k]))
+            for k in range(j1 + paired, j2):
+                changes.append({'op': 'added', 'path': f"{path}/{b_children[k]['tag']}[{k}]",
+                                'tag': b_children[k]['tag']})
+                tag_delta.update(tag_counts(b_children[k]))
+
+        if not child_changes:
+            changes.append({'op': 'modified', 'path': path, 'tag': b['tag']})
+
+    return {
+        'changes': changes,
+        'nodes_visited': visited,
+        'tag_delta': {tag: count for tag, count in tag_delta.items() if count},
+    }
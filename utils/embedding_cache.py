@@ -0,0 +1,30 @@
+"""
+Chunk embedding cache for semantic change detection.
+
+Agent 3 embeds regulation sections to find the ones whose meaning changed.
+Between two versions almost every section is unchanged, and the sections
+of the previous version were already embedded when that version was new.
+Caching vectors by (model, section hash) means each distinct section is
+embedded once, ever.
+"""
+
+from typing import Optional
+
+from utils.sqlite_lru import SQLiteLRUCache
+
+
+class EmbeddingCache(SQLiteLRUCache):
+    """
+    key -> embedding bytes (float32 vector, see SemanticSimilarityEngine).
+
+    Keys are "<model name>:<section sha256>" (see SQLiteLRUCache).
+    """
+
+    table = "chunk_embedding"
+    key_column = "key"
+    value_column = "vector"
+    value_type = "BLOB"
+    label = "Embedding cache"
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 50000, max_rows: int = 500000):
+        super().__init__(path, max_entries, max_rows)
@@ -2,16 +2,24 @@
 Redis Streams Event Bus for inter-agent communication.
 
 All agents publish and subscribe to events via this centralized bus.
+
+Large payloads (multi-MB extracted text) can be kept off the stream with the
+claim-check pattern: above a size threshold the payload is written to a
+blob store and the event carries only a reference, size and hash.
 """
 
+import hashlib
 import json
 import logging
+import threading
 import uuid
+from collections import OrderedDict
 from datetime import datetime
 from typing import Any, Callable, Dict, List, Optional
 
 import redis
 from schemas.events import EventEnvelope, EventType
+from utils.blob_store import BlobStore
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +33,8 @@ class EventBus:
     - Message persistence (configurable retention)
     - Dead letter queue for failed messages
     - Automatic retry logic
+    - Claim check for payloads over claim_check_threshold bytes (when a
+      blob_store is given); consumers resolve them lazily, with an LRU cache
     """
     
     def __init__(
@@ -36,6 +46,9 @@ class EventBus:
         stream_name: str = "seraphs:events",
         dlq_stream: str = "seraphs:dlq",
         max_retries: int = 3,
+        blob_store: Optional[BlobStore] = None,
+        claim_check_threshold: int = 256 * 1024,
+        claim_cache_size: int = 64,
     ):
         self.redis_client = redis.Redis(
             host=redis_host,
@@ -48,6 +61,12 @@ class EventBus:
         self.dlq_stream = dlq_stream
         self.max_retries = max_retries
         
+        self.blob_store = blob_store
+        self.claim_check_threshold = claim_check_threshold
+        self.claim_cache_size = claim_cache_size
+        self._claim_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._claim_lock = threading.Lock()
+        
         logger.info(f"EventBus initialized: stream={stream_name}, host={redis_host}:{redis_port}")
     
     def publish(self, event: EventEnvelope) -> str:
@@ -62,6 +81,12 @@ class EventBus:
         """
         # Convert Pydantic model to dict, then to JSON string
         event_dict = event.model_dump(mode='json')
+        
+        if self.blob_store is not None and self.claim_check_threshold > 0:
+            payload_json = json.dumps(event_dict['payload'], default=str)
+            if len(payload_json) > self.claim_check_threshold:
+                event_dict = self._check_in(event_dict, payload_json)
+        
         event_json = {
             "data": json.dumps(event_dict, default=str)
         }
@@ -75,6 +100,74 @@ class EventBus:
         
         return message_id
     
+    def _check_in(self, event_dict: Dict[str, Any], payload_json: str) -> Dict[str, Any]:
+        """
+        Move a payload to the blob store, leaving a claim check.
+        
+        Short top-level scalar fields (snapshot_id etc.) stay inline so
+        consumers can route or filter without fetching the blob.
+        """
+        data = payload_json.encode('utf-8')
+        ref = self.blob_store.put(data)
+        
+        event_dict['payload'] = {
+            key: value for key, value in event_dict['payload'].items()
+            if value is None
+            or isinstance(value, (bool, int, float))
+            or (isinstance(value, str) and len(value) <= 256)
+        }
+        event_dict['metadata'] = {
+            **event_dict.get('metadata', {}),
+            'claim_check': {
+                'ref': ref,
+                'store': self.blob_store.kind,
+                'size': len(data),
+                'sha256': hashlib.sha256(data).hexdigest(),
+            },
+        }
+        
+        logger.info(f"Claim check: event={event_dict['event_id']} payload={len(data)} bytes ref={ref}")
+        return event_dict
+    
+    def resolve_payload(self, event: EventEnvelope) -> Dict[str, Any]:
+        """
+        Full payload of an event, fetching it from the blob store if the
+        event carries a claim check. Recently resolved payloads are cached.
+        
+        Raises:
+            ValueError: If the fetched blob does not match the claim's hash
+        """
+        claim = event.metadata.get('claim_check')
+        if not claim:
+            return event.payload
+        if self.blob_store is None:
+            raise ValueError(f"Event {event.event_id} has a claim check but no blob store is configured")
+        
+        ref = claim['ref']
+        with self._claim_lock:
+            if ref in self._claim_cache:
+                self._claim_cache.move_to_end(ref)
+                return self._claim_cache[ref]
+        
+        data = self.blob_store.get(ref)
+        if hashlib.sha256(data).hexdigest() != claim['sha256']:
+            raise ValueError(f"Claim check {ref} failed hash verification")
+        payload = json.loads(data)
+        
+        with self._claim_lock:
+            self._claim_cache[ref] = payload
+            while len(self._claim_cache) > self.claim_cache_size:
+                self._claim_cache.popitem(last=False)
+        
+        return payload
+    
+    def resolve(self, event: EventEnvelope) -> EventEnvelope:
+        """Copy of the event with its claim-checked payload filled in"""
+        if not event.metadata.get('claim_check'):
+            return event
+        metadata = {k: v for k, v in event.metadata.items() if k != 'claim_check'}
+        return event.model_copy(update={'payload': self.resolve_payload(event), 'metadata': metadata})
+    
     def subscribe(
         self,
         consumer_group: str,
@@ -82,6 +175,7 @@ class EventBus:
         event_types: Optional[List[EventType]] = None,
         callback: Optional[Callable[[EventEnvelope], None]] = None,
         block_ms: int = 5000,
+        resolve_claim_checks: bool = True,
     ) -> None:
         """
         Subscribe to events from the stream.
@@ -92,6 +186,9 @@ class EventBus:
             event_types: Filter to specific event types (None = all)
             callback: Function to call for each event
             block_ms: Milliseconds to block waiting for messages
+            resolve_claim_checks: Fetch claim-checked payloads before calling
+                back. Pass False to receive the stub and call
+                resolve_payload() only when the payload is needed.
         """
         # Create consumer group if it doesn't exist
         try:
@@ -129,7 +226,8 @@ class EventBus:
                             msg_data,
                             consumer_group,
                             event_types,
-                            callback
+                            callback,
+                            resolve_claim_checks,
                         )
             
             except KeyboardInterrupt:
@@ -145,6 +243,7 @@ class EventBus:
         consumer_group: str,
         event_types: Optional[List[EventType]],
         callback: Optional[Callable],
+        resolve_claim_checks: bool = True,
     ) -> None:
         """Process a single message from the stream"""
         try:
@@ -160,8 +259,10 @@ class EventBus:
             
             logger.debug(f"Processing event: {event.event_type} ({msg_id})")
             
-            # Call handler
+            # Call handler (claim checks are only fetched for events we keep)
             if callback:
+                if resolve_claim_checks:
+                    event = self.resolve(event)
                 callback(event)
             
             # Acknowledge successful processing
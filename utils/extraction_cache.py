@@ -0,0 +1,35 @@
+"""
+Agent 4 extraction results by snapshot id.
+
+When Agent 3 flags a snapshot as a near-duplicate of one processed
+earlier (a circular republished on another page), Agent 4 links to the
+earlier extraction instead of calling the LLM again. Results are kept
+in SQLite so the link still resolves after a restart.
+"""
+
+import json
+from typing import Dict, Optional
+
+from utils.sqlite_lru import SQLiteLRUCache
+
+
+class ExtractionResultCache(SQLiteLRUCache):
+    """snapshot_id -> LegalAgent.extract_obligations result (see SQLiteLRUCache)"""
+
+    table = "extraction_result"
+    key_column = "snapshot_id"
+    value_column = "result"
+    value_type = "TEXT"
+    label = "Extraction result cache"
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 5000, max_rows: int = 50000):
+        super().__init__(path, max_entries, max_rows)
+
+    def get(self, snapshot_id: str) -> Optional[Dict]:
+        """Stored result of a snapshot (None if never extracted)"""
+        found = self.get_many([snapshot_id])
+        return json.loads(found[snapshot_id]) if snapshot_id in found else None
+
+    def put(self, result: Dict) -> None:
+        """Store a result under its snapshot_id"""
+        self.put_many({result["snapshot_id"]: json.dumps(result, default=str)})
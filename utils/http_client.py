@@ -0,0 +1,226 @@
+"""
+Shared, pooled HTTP clients.
+
+Ingestion, authenticity and oracle tools all talk to the same handful of
+regulator and API hosts. Calling module-level requests.get() opens a fresh
+TCP + TLS connection every time; a single snapshot used to repeat the
+handshake to the same domain five or more times.
+
+This module owns one process-wide requests.Session (keep-alive pools per
+host, retries with exponential backoff on connection errors / 429 / 5xx)
+and builds httpx.AsyncClients with the same policy (optionally HTTP/2).
+User-Agent and default timeout are applied everywhere.
+
+tls_evidence() reads the peer certificate chain, cipher and protocol off a
+response's live TLS connection, so the fetch that produced a snapshot also
+proves where it came from (agent 2 verifies from this instead of
+re-downloading).
+"""
+
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils.config import HTTPConfig
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_http_config: Optional[HTTPConfig] = None
+
+
+def _config() -> HTTPConfig:
+    """Active HTTP policy (from utils.config unless configure_http was called)"""
+    if _http_config is not None:
+        return _http_config
+    from utils.config import config
+    return config.http
+
+
+class _PolicySession(requests.Session):
+    """Session that applies a default timeout when the caller gives none"""
+
+    def __init__(self, timeout: float):
+        super().__init__()
+        self.default_timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.default_timeout)
+        return super().request(method, url, **kwargs)
+
+
+def build_session(http_config: HTTPConfig) -> requests.Session:
+    """Create a requests.Session with pooling, retries and default headers"""
+    retry = Retry(
+        total=http_config.max_retries,
+        backoff_factor=http_config.backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({'GET', 'HEAD', 'OPTIONS'}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=http_config.pool_hosts,
+        pool_maxsize=http_config.pool_per_host,
+        max_retries=retry,
+    )
+
+    session = _PolicySession(http_config.timeout)
+    session.headers['User-Agent'] = http_config.user_agent
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """The process-wide pooled session (created on first use)"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session(_config())
+                logger.info("Shared HTTP session created")
+    return _session
+
+
+def configure_http(http_config: HTTPConfig) -> None:
+    """Replace the HTTP policy; the shared session is rebuilt on next use"""
+    global _session, _http_config
+    with _session_lock:
+        _http_config = http_config
+        old, _session = _session, None
+    if old is not None:
+        old.close()
+
+
+def http2_available() -> bool:
+    """True if the optional h2 package (needed for httpx HTTP/2) is installed"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def create_async_client(
+    max_connections: Optional[int] = None,
+    timeout: Optional[float] = None,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> httpx.AsyncClient:
+    """
+    Build an httpx.AsyncClient with the shared policy.
+
+    AsyncClients are bound to the event loop they are used on, so unlike
+    get_session() each async sweep creates (and closes) its own client.
+
+    Args:
+        max_connections: Total pool size (default: config pool_hosts x pool_per_host)
+        timeout: Default timeout (default: config timeout)
+        transport: Custom transport (tests); replaces the retrying one
+    """
+    http_config = _config()
+    http2 = http_config.http2 and http2_available()
+    if http_config.http2 and not http2:
+        logger.warning("HTTP/2 requested but the h2 package is not installed; using HTTP/1.1")
+
+    if max_connections is None:
+        max_connections = http_config.pool_hosts * http_config.pool_per_host
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+    )
+    if transport is None:
+        # httpx retries failed connects only; status-based retries stay
+        # with the caller
+        transport = httpx.AsyncHTTPTransport(
+            retries=http_config.max_retries, http2=http2, limits=limits
+        )
+
+    return httpx.AsyncClient(
+        transport=transport,
+        limits=limits,
+        timeout=timeout if timeout is not None else http_config.timeout,
+        headers={'User-Agent': http_config.user_agent},
+        follow_redirects=True,
+    )
+
+
+def _ssl_object(response) -> Optional[Any]:
+    """The SSLSocket / SSLObject behind a requests or httpx response"""
+    if isinstance(response, httpx.Response):
+        stream = response.extensions.get('network_stream')
+        return stream.get_extra_info('ssl_object') if stream is not None else None
+
+    # requests: only reachable while a stream=True body is still unread,
+    # before urllib3 hands the connection back to the pool
+    raw = getattr(response, 'raw', None)
+    connection = getattr(raw, 'connection', None) or getattr(raw, '_connection', None)
+    sock = getattr(connection, 'sock', None)
+    if sock is None:
+        # Connection: close detaches the socket from the connection; the
+        # body reader (http.client fp -> SocketIO) still holds it
+        reader = getattr(getattr(raw, '_fp', None), 'fp', None)
+        sock = getattr(getattr(reader, 'raw', None), '_sock', None)
+    return sock
+
+
+def tls_evidence(response) -> Optional[Dict[str, Any]]:
+    """
+    Capture TLS evidence from a response's connection.
+
+    Args:
+        response: requests.Response (stream=True, body not yet read) or
+            httpx.Response
+
+    Returns:
+        {'host', 'protocol', 'cipher', 'peer_cert_sha256', 'cert_chain_sha256',
+        'subject', 'issuer', 'not_after', 'subject_alt_names', 'verified',
+        'captured_at'}, or None for plain HTTP or when the connection is gone
+    """
+    url = str(response.url)
+    if urlparse(url).scheme != 'https':
+        return None
+
+    try:
+        ssl_obj = _ssl_object(response)
+        if ssl_obj is None:
+            return None
+        leaf = ssl_obj.getpeercert(binary_form=True)
+        if not leaf:
+            return None
+        # Parsed form is empty unless the chain was validated
+        info = ssl_obj.getpeercert() or {}
+        # Full chain needs Python 3.13+; older interpreters expose the leaf only
+        chain = ssl_obj.get_verified_chain() if hasattr(ssl_obj, 'get_verified_chain') else [leaf]
+        cipher = ssl_obj.cipher()
+    except Exception as e:
+        logger.warning("TLS evidence unavailable for %s: %s", url, e)
+        return None
+
+    def _name(rdns) -> str:
+        return ', '.join(f"{k}={v}" for rdn in rdns for k, v in rdn)
+
+    return {
+        'host': urlparse(url).hostname,
+        'protocol': ssl_obj.version(),
+        'cipher': cipher[0] if cipher else None,
+        'peer_cert_sha256': hashlib.sha256(leaf).hexdigest(),
+        'cert_chain_sha256': [hashlib.sha256(cert).hexdigest() for cert in chain],
+        'subject': _name(info.get('subject', ())),
+        'issuer': _name(info.get('issuer', ())),
+        'not_after': info.get('notAfter'),
+        'subject_alt_names': [v for k, v in info.get('subjectAltName', ()) if k == 'DNS'],
+        'verified': bool(info),
+        'captured_at': datetime.utcnow().isoformat() + "Z",
+    }
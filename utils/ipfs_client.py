@@ -6,7 +6,7 @@ All regulatory snapshots and proofs are stored in IPFS for immutability.
 
 import hashlib
 import logging
-from typing import Optional, Union
+from typing import BinaryIO, Optional, Union
 
 import ipfshttpclient
 
@@ -67,6 +67,31 @@ class IPFSClient:
             logger.error(f"Failed to add to IPFS: {e}", exc_info=True)
             raise
     
+    def add_stream(self, stream: BinaryIO) -> str:
+        """
+        Add a file-like object to IPFS, streaming it in chunks.
+        
+        Unlike add(), the content is never materialized as one bytes
+        object, which matters for large PDFs held in temp files / mmaps.
+        
+        Args:
+            stream: Readable binary file-like object (positioned at start)
+            
+        Returns:
+            IPFS CID (Content Identifier)
+        """
+        try:
+            res = self.client.add(stream)
+            cid = res['Hash']
+            
+            logger.info(f"Added stream to IPFS: CID={cid}, size={res.get('Size')} bytes")
+            
+            return cid
+        
+        except Exception as e:
+            logger.error(f"Failed to add stream to IPFS: {e}", exc_info=True)
+            raise
+    
     def add_json(self, data: dict) -> str:
         """
         Add JSON object to IPFS.
@@ -0,0 +1,299 @@
+"""
+Linear-time line diff for regulatory text.
+
+difflib.SequenceMatcher over whole documents is quadratic in the worst case
+and takes minutes on multi-MB regulations. Here every line is interned as
+an integer, so comparisons are int compares, and the diff is a patience
+diff:
+
+1. strip the common prefix and suffix
+2. anchor on lines that occur exactly once on both sides, keeping the
+   longest increasing run of them (O(n log n))
+3. recurse into the gaps between anchors
+4. gaps with no unique common line (blank lines, repeated boilerplate)
+   fall back to Myers' O(ND) diff, capped at max_cost edits; past the cap
+   the gap is reported as a plain replace
+
+For typical amendments this is O(n log n) overall and never worse than
+O(n log n + gaps x max_cost^2).
+
+Text is split into segments: lines, with long lines (normalize_text output
+is one line per document) further split after sentence punctuation, so
+an amended clause is a changed segment and not a changed document.
+"""
+
+import re
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+Opcode = Tuple[str, int, int, int, int]  # same shape as SequenceMatcher.get_opcodes()
+
+# Lines longer than this are split into sentences
+LONG_LINE = 400
+_SENTENCE_END = re.compile(r'(?<=[.;:!?])\s+')
+
+DEFAULT_MAX_COST = 200
+
+
+def split_segments(text: str) -> List[str]:
+    """Lines, with long lines split after sentence-ending punctuation"""
+    segments = []
+    for line in text.splitlines():
+        if len(line) > LONG_LINE:
+            segments.extend(_SENTENCE_END.split(line))
+        else:
+            segments.append(line)
+    return segments
+
+
+def _intern(old: Sequence[str], new: Sequence[str]) -> Tuple[List[int], List[int]]:
+    ids: Dict[str, int] = {}
+    a = [ids.setdefault(line, len(ids)) for line in old]
+    b = [ids.setdefault(line, len(ids)) for line in new]
+    return a, b
+
+
+def _unique_anchors(a: List[int], b: List[int], alo: int, ahi: int, blo: int, bhi: int) -> List[Tuple[int, int]]:
+    """Longest increasing run of lines unique on both sides (patience sorting)"""
+    a_count: Dict[int, int] = {}
+    a_pos: Dict[int, int] = {}
+    for i in range(alo, ahi):
+        a_count[a[i]] = a_count.get(a[i], 0) + 1
+        a_pos[a[i]] = i
+    b_count: Dict[int, int] = {}
+    b_pos: Dict[int, int] = {}
+    for j in range(blo, bhi):
+        if a_count.get(b[j]) == 1:
+            b_count[b[j]] = b_count.get(b[j], 0) + 1
+            b_pos[b[j]] = j
+
+    pairs = sorted(
+        (a_pos[line], j) for line, j in b_pos.items() if b_count[line] == 1
+    )
+    if not pairs:
+        return []
+
+    # LIS over b positions, with back-pointers
+    tails: List[int] = []  # b position ending the best run of each length
+    tail_index: List[int] = []
+    back = [-1] * len(pairs)
+    for index, (_, j) in enumerate(pairs):
+        k = bisect_left(tails, j)
+        if k == len(tails):
+            tails.append(j)
+            tail_index.append(index)
+        else:
+            tails[k] = j
+            tail_index[k] = index
+        back[index] = tail_index[k - 1] if k else -1
+
+    run = []
+    index = tail_index[-1]
+    while index != -1:
+        run.append(pairs[index])
+        index = back[index]
+    run.reverse()
+    return run
+
+
+def _myers(a: List[int], b: List[int], alo: int, ahi: int, blo: int, bhi: int,
+           max_cost: int, matches: List[Tuple[int, int]]) -> None:
+    """Append the matches of a shortest edit script, or none past max_cost"""
+    n, m = ahi - alo, bhi - blo
+    offset = min(n + m, max_cost) + 1
+    v = [0] * (2 * offset + 2)
+    trace = []
+
+    for d in range(min(n + m, max_cost) + 1):
+        trace.append(v[offset - d:offset + d + 2])
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[alo + x] == b[blo + y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                _backtrack(trace, d, k, x, alo, blo, matches)
+                return
+    # Too different: leave the gap as a replace
+
+
+def _backtrack(trace, d: int, k: int, x: int, alo: int, blo: int,
+               matches: List[Tuple[int, int]]) -> None:
+    """Recover diagonal (matching) runs from the saved V arrays"""
+    found = []
+    for step in range(d, 0, -1):
+        prev = trace[step]  # V before round `step`, covering k in [-step, step + 1]
+        base = step
+        if k == -step or (k != step and prev[base + k - 1] < prev[base + k + 1]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = prev[base + prev_k]
+        # Snake from the end of the edit at step down to (x, y)
+        start_x = prev_x if prev_k == k + 1 else prev_x + 1
+        while x > start_x:
+            x -= 1
+            found.append((alo + x, blo + x - k))
+        x, k = prev_x, prev_k
+    # Leading snake of round 0
+    while x > 0:
+        x -= 1
+        found.append((alo + x, blo + x - k))
+    matches.extend(reversed(found))
+
+
+def _match(a: List[int], b: List[int], alo: int, ahi: int, blo: int, bhi: int,
+           max_cost: int, matches: List[Tuple[int, int]]) -> None:
+    """Append matching (i, j) pairs for a[alo:ahi] vs b[blo:bhi], in order"""
+    while alo < ahi and blo < bhi and a[alo] == b[blo]:
+        matches.append((alo, blo))
+        alo += 1
+        blo += 1
+    tail = []
+    while alo < ahi and blo < bhi and a[ahi - 1] == b[bhi - 1]:
+        ahi -= 1
+        bhi -= 1
+        tail.append((ahi, bhi))
+
+    if alo < ahi and blo < bhi:
+        anchors = _unique_anchors(a, b, alo, ahi, blo, bhi)
+        if anchors:
+            for i, j in anchors:
+                _match(a, b, alo, i, blo, j, max_cost, matches)
+                matches.append((i, j))
+                alo, blo = i + 1, j + 1
+            _match(a, b, alo, ahi, blo, bhi, max_cost, matches)
+        else:
+            _myers(a, b, alo, ahi, blo, bhi, max_cost, matches)
+
+    matches.extend(reversed(tail))
+
+
+def _opcodes(matches: List[Tuple[int, int]], n: int, m: int) -> List[Opcode]:
+    opcodes: List[Opcode] = []
+    i = j = 0
+    for mi, mj in matches + [(n, m)]:
+        if i < mi and j < mj:
+            opcodes.append(('replace', i, mi, j, mj))
+        elif i < mi:
+            opcodes.append(('delete', i, mi, j, j))
+        elif j < mj:
+            opcodes.append(('insert', i, i, j, mj))
+        if mi < n:
+            if opcodes and opcodes[-1][0] == 'equal' and opcodes[-1][2] == mi:
+                tag, i1, _, j1, _ = opcodes.pop()
+                opcodes.append(('equal', i1, mi + 1, j1, mj + 1))
+            else:
+                opcodes.append(('equal', mi, mi + 1, mj, mj + 1))
+        i, j = mi + 1, mj + 1
+    return opcodes
+
+
+@dataclass
+class LineDiff:
+    """Result of diff_lines: the two segment lists and their opcodes"""
+    old: List[str]
+    new: List[str]
+    opcodes: List[Opcode]
+
+    def added(self) -> Iterator[str]:
+        """New segments (from insert / replace opcodes), in order"""
+        for tag, _, _, j1, j2 in self.opcodes:
+            if tag in ('insert', 'replace'):
+                yield from self.new[j1:j2]
+
+    def removed(self) -> Iterator[str]:
+        """Old segments (from delete / replace opcodes), in order"""
+        for tag, i1, i2, _, _ in self.opcodes:
+            if tag in ('delete', 'replace'):
+                yield from self.old[i1:i2]
+
+    @property
+    def added_count(self) -> int:
+        return sum(j2 - j1 for tag, _, _, j1, j2 in self.opcodes if tag in ('insert', 'replace'))
+
+    @property
+    def removed_count(self) -> int:
+        return sum(i2 - i1 for tag, i1, i2, _, _ in self.opcodes if tag in ('delete', 'replace'))
+
+    def hunks(self, context: int = 2) -> List[List[Opcode]]:
+        """
+        Group changes into hunks with up to `context` equal segments on each
+        side, like SequenceMatcher.get_grouped_opcodes(); changes closer than
+        2 x context share a hunk
+        """
+        changed = [i for i, op in enumerate(self.opcodes) if op[0] != 'equal']
+        if not changed:
+            return []
+
+        hunks: List[List[Opcode]] = []
+        group: List[Opcode] = []
+        for index, (tag, i1, i2, j1, j2) in enumerate(self.opcodes):
+            if tag != 'equal':
+                group.append((tag, i1, i2, j1, j2))
+                continue
+            first, last = index < changed[0], index > changed[-1]
+            if group and not first and i2 - i1 > 2 * context and not last:
+                # Close the current hunk, open the next one
+                group.append(('equal', i1, i1 + context, j1, j1 + context))
+                hunks.append(group)
+                group = [('equal', i2 - context, i2, j2 - context, j2)]
+            elif first:
+                keep = min(context, i2 - i1)
+                group.append(('equal', i2 - keep, i2, j2 - keep, j2))
+            elif last:
+                keep = min(context, i2 - i1)
+                group.append(('equal', i1, i1 + keep, j1, j1 + keep))
+            else:
+                group.append((tag, i1, i2, j1, j2))
+        hunks.append(group)
+        return [[op for op in hunk if op[1] < op[2] or op[3] < op[4]] for hunk in hunks]
+
+    @property
+    def hunk_count(self) -> int:
+        return len(self.hunks(0))
+
+    def ratio(self) -> float:
+        """
+        Similarity in [0, 1]: 2 x matched chars / total chars, like
+        SequenceMatcher.ratio() but with lines as the matching unit
+        """
+        total = sum(len(s) + 1 for s in self.old) + sum(len(s) + 1 for s in self.new)
+        if not total:
+            return 1.0
+        matched = sum(
+            len(s) + 1
+            for tag, i1, i2, _, _ in self.opcodes if tag == 'equal'
+            for s in self.old[i1:i2]
+        )
+        return 2 * matched / total
+
+
+def diff_lines(old: Sequence[str], new: Sequence[str], max_cost: int = DEFAULT_MAX_COST) -> LineDiff:
+    """
+    Diff two sequences of lines.
+
+    Args:
+        old: Previous lines
+        new: Current lines
+        max_cost: Edit budget for the Myers fallback in gaps without
+            unique anchors; larger gaps are reported as replace
+
+    Returns:
+        LineDiff with SequenceMatcher-style opcodes
+    """
+    a, b = _intern(old, new)
+    matches: List[Tuple[int, int]] = []
+    _match(a, b, 0, len(a), 0, len(b), max_cost, matches)
+    return LineDiff(list(old), list(new), _opcodes(matches, len(a), len(b)))
+
+
+def diff_texts(old_text: str, new_text: str, max_cost: int = DEFAULT_MAX_COST) -> LineDiff:
+    """diff_lines over split_segments() of each text"""
+    return diff_lines(split_segments(old_text), split_segments(new_text), max_cost)
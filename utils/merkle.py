@@ -0,0 +1,176 @@
+"""
+Append-only Merkle accumulator (Merkle mountain range) with inclusion proofs.
+
+Used for snapshot hashes (Agent 2) and obligations (Agent 9). Leaves are
+32-byte digests; nothing is hex-concatenated. Hashing is domain separated
+as in RFC 6962, so a leaf can never be passed off as an inner node:
+
+    leaf = sha256(0x00 || digest)
+    node = sha256(0x01 || left || right)
+
+The tree is kept as a list of perfect subtrees ("mountains", one per set
+bit of the leaf count). Appending a leaf merges equal-height mountains,
+so it costs O(log n) hashes and nothing already seen is rehashed. The
+root bags the mountain peaks right to left. An inclusion proof is the
+sibling path up to the leaf's peak plus the list of peaks: O(log n).
+"""
+
+import hashlib
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Union
+
+Digest = Union[bytes, str]  # raw 32 bytes or 64 hex chars
+
+EMPTY_ROOT = hashlib.sha256(b"").digest()
+
+
+def parse_digest(value: Digest) -> bytes:
+    """Normalize a hex or raw digest to 32 raw bytes"""
+    raw = bytes.fromhex(value) if isinstance(value, str) else bytes(value)
+    if len(raw) != 32:
+        raise ValueError(f"Expected a 32-byte digest, got {len(raw)} bytes")
+    return raw
+
+
+def hash_leaf(digest: Digest) -> bytes:
+    return hashlib.sha256(b"\x00" + parse_digest(digest)).digest()
+
+
+def hash_node(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+
+def bag_peaks(peaks: List[bytes]) -> bytes:
+    """Fold mountain peaks (left to right) into a single root"""
+    if not peaks:
+        return EMPTY_ROOT
+    root = peaks[-1]
+    for peak in reversed(peaks[:-1]):
+        root = hash_node(peak, root)
+    return root
+
+
+@dataclass
+class InclusionProof:
+    """Proof that leaf leaf_index is in an accumulator of leaf_count leaves"""
+    leaf_index: int
+    leaf_count: int
+    path: List[bytes] = field(default_factory=list)  # siblings, bottom up
+    peaks: List[bytes] = field(default_factory=list)  # left to right
+
+    def to_dict(self) -> Dict:
+        return {
+            "leaf_index": self.leaf_index,
+            "leaf_count": self.leaf_count,
+            "path": [h.hex() for h in self.path],
+            "peaks": [h.hex() for h in self.peaks],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "InclusionProof":
+        return cls(
+            leaf_index=data["leaf_index"],
+            leaf_count=data["leaf_count"],
+            path=[bytes.fromhex(h) for h in data["path"]],
+            peaks=[bytes.fromhex(h) for h in data["peaks"]],
+        )
+
+
+def _mountains(leaf_count: int) -> List[int]:
+    """Mountain heights, left (tallest) to right"""
+    return [h for h in reversed(range(leaf_count.bit_length())) if leaf_count >> h & 1]
+
+
+class MerkleAccumulator:
+    """
+    Append-only Merkle mountain range over 32-byte digests.
+
+    levels[h] holds the hashes of every complete subtree of height h, in
+    order, so peaks and proof paths are plain index lookups.
+    """
+
+    def __init__(self, leaves: Iterable[Digest] = ()):
+        self.levels: List[List[bytes]] = [[]]
+        self.extend(leaves)
+
+    def __len__(self) -> int:
+        return len(self.levels[0])
+
+    def append(self, digest: Digest) -> int:
+        """Add a leaf; returns its index. O(log n) hashes."""
+        self.levels[0].append(hash_leaf(digest))
+        height = 0
+        # A level with an even count just completed a pair
+        while len(self.levels[height]) % 2 == 0:
+            if height + 1 == len(self.levels):
+                self.levels.append([])
+            pair = self.levels[height][-2:]
+            self.levels[height + 1].append(hash_node(pair[0], pair[1]))
+            height += 1
+        return len(self) - 1
+
+    def extend(self, digests: Iterable[Digest]) -> None:
+        for digest in digests:
+            self.append(digest)
+
+    def peaks(self) -> List[bytes]:
+        """Mountain peaks, left to right"""
+        n = len(self)
+        return [self.levels[h][(n >> h) - 1] for h in _mountains(n)]
+
+    def root(self) -> bytes:
+        return bag_peaks(self.peaks())
+
+    def root_hex(self) -> str:
+        return self.root().hex()
+
+    def proof(self, leaf_index: int) -> InclusionProof:
+        """Inclusion proof for a leaf against the current root"""
+        if not 0 <= leaf_index < len(self):
+            raise IndexError(f"Leaf {leaf_index} out of range (size {len(self)})")
+
+        # Find the mountain holding the leaf
+        start = 0
+        for height in _mountains(len(self)):
+            if leaf_index < start + (1 << height):
+                break
+            start += 1 << height
+
+        path = []
+        index = leaf_index
+        for level in range(height):
+            path.append(self.levels[level][index ^ 1])
+            index >>= 1
+
+        return InclusionProof(
+            leaf_index=leaf_index,
+            leaf_count=len(self),
+            path=path,
+            peaks=self.peaks(),
+        )
+
+
+def verify_inclusion(root: Digest, digest: Digest, proof: InclusionProof) -> bool:
+    """Check that digest is leaf proof.leaf_index of the tree with this root"""
+    if not 0 <= proof.leaf_index < proof.leaf_count:
+        return False
+
+    mountains = _mountains(proof.leaf_count)
+    if len(proof.peaks) != len(mountains):
+        return False
+
+    start = 0
+    for position, height in enumerate(mountains):
+        if proof.leaf_index < start + (1 << height):
+            break
+        start += 1 << height
+    if len(proof.path) != height:
+        return False
+
+    node = hash_leaf(digest)
+    index = proof.leaf_index
+    for sibling in proof.path:
+        node = hash_node(sibling, node) if index & 1 else hash_node(node, sibling)
+        index >>= 1
+
+    return node == proof.peaks[position] and bag_peaks(proof.peaks) == parse_digest(root)
@@ -0,0 +1,24 @@
+"""
+Page-level text cache for PDF extraction.
+
+Re-issued circulars usually amend a handful of pages. Caching extracted text
+by the hash of each page's content stream means only the changed pages are
+run through the (slow) PDF text extractor again.
+"""
+
+from typing import Optional
+
+from utils.sqlite_lru import SQLiteLRUCache
+
+
+class PageTextCache(SQLiteLRUCache):
+    """page_hash -> extracted text (see SQLiteLRUCache)"""
+
+    table = "page_text"
+    key_column = "page_hash"
+    value_column = "text"
+    value_type = "TEXT"
+    label = "PDF page cache"
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 20000, max_rows: int = 200000):
+        super().__init__(path, max_entries, max_rows)
@@ -0,0 +1,70 @@
+"""
+Compact canonical binary encoding for proof bundles and audit artifacts.
+
+Proof bundles are mostly hex digests (snapshot hashes, Merkle roots and
+paths, certificate fingerprints) under the same few field names, repeated
+for every verification. As JSON text each 32-byte digest costs 66 bytes
+and each key is spelled out every time.
+
+encode_proof() writes deterministic CBOR (RFC 8949 core deterministic
+encoding, sorted keys) with:
+- hex digests stored as raw bytes under tag 23 ("expected conversion to
+  base16"), so they decode back to the identical lowercase hex string
+- repeated keys and strings replaced by back-references (stringref,
+  tags 25 / 256)
+
+decode_proof() returns exactly the JSON-compatible structure that was
+encoded: encode -> decode is lossless, and equal inputs give equal bytes,
+so the encoding can be content-addressed.
+"""
+
+import re
+from typing import Any
+
+import cbor2
+
+# Tag 23: byte string expected to be shown as base16 (RFC 8949 3.4.5.2)
+HEX_TAG = 23
+
+# Lowercase, even-length hex of at least 16 bytes (digests, fingerprints,
+# tx hashes); shorter strings gain little and are often not hashes
+_HEX = re.compile(r'(?:[0-9a-f]{2}){16,}')
+
+
+def _pack(value: Any) -> Any:
+    """Replace hex strings with tagged raw bytes, recursively"""
+    if isinstance(value, str):
+        if len(value) >= 32 and _HEX.fullmatch(value):
+            return cbor2.CBORTag(HEX_TAG, bytes.fromhex(value))
+        return value
+    if isinstance(value, dict):
+        return {k: _pack(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_pack(v) for v in value]
+    return value
+
+
+def _hex_tag(*args):
+    """tag_hook: tag 23 bytes -> hex string (cbor2 < 6 passes (decoder, tag), 6 passes (tag, immutable))"""
+    tag = next(arg for arg in args if isinstance(arg, cbor2.CBORTag))
+    if tag.tag == HEX_TAG and isinstance(tag.value, bytes):
+        return tag.value.hex()
+    return tag
+
+
+def encode_proof(obj: Any) -> bytes:
+    """
+    Encode a JSON-compatible proof structure as canonical CBOR.
+
+    Args:
+        obj: dicts with string keys, lists, str, int, float, bool, None
+
+    Returns:
+        Deterministic CBOR bytes
+    """
+    return cbor2.dumps(_pack(obj), canonical=True, string_referencing=True)
+
+
+def decode_proof(data: bytes) -> Any:
+    """Decode encode_proof() output back to the original JSON structure"""
+    return cbor2.loads(data, tag_hook=_hex_tag)
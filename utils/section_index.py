@@ -0,0 +1,196 @@
+"""
+Section index for regulatory text.
+
+A master direction is hundreds of clauses, and an amendment usually touches
+one or two. Diffing the whole document every time costs work proportional
+to its size; hashing it into sections first lets identical sections be
+skipped before any diff runs.
+
+section_index() cuts text into stable sections and hashes each one:
+- paragraph breaks (blank lines)
+- headings (CHAPTER / PART / SECTION / ANNEX ... followed by a number)
+- numbered clauses ("12. The", "4.2) Banks"), which is what survives
+  Agent 1's normalize_text, since that collapses a document onto one line
+- sections under MIN_SECTION chars (bare headings) join the next one
+- sections over MAX_SECTION chars are cut after content-defined sentences
+  (sentence hash), so a cut point does not move when text before it changes
+
+Every cut depends only on nearby text, so an edit changes the hash of
+the sections it touches and no others. The index is a list of plain dicts
+({"hash", "start", "end"}) so it can be stored with the snapshot and
+reused as the previous version's index on the next run.
+
+diff_sections() matches the two section lists by hash (patience diff over
+hashes) and runs the line diff only on sections that differ.
+"""
+
+import hashlib
+import re
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from utils.line_diff import DEFAULT_MAX_COST, LineDiff, Opcode, diff_lines, split_segments
+
+MIN_SECTION = 64
+MAX_SECTION = 4096
+
+# Size after which an oversized section may be cut at a sentence whose
+# crc32 has its low 3 bits zero (~1 in 8 sentences)
+_CUT_AFTER = 512
+_CUT_MASK = (1 << 3) - 1
+
+_PARAGRAPH = re.compile(r'\n[ \t]*\n\s*')
+_HEADING_OR_CLAUSE = re.compile(
+    r'(?<!\S)(?:'
+    r'(?:CHAPTER|PART|SECTION|ANNEX|SCHEDULE|APPENDIX|ARTICLE|'
+    r'Chapter|Part|Section|Annex|Schedule|Appendix|Article)\s+[0-9IVXLC]+\b'
+    r'|\d{1,4}(?:\.\d{1,3})*[.)]\s+(?=[A-Z("\'])'
+    r'|#{1,6}\s'
+    r')'
+)
+_SENTENCE_END = re.compile(r'[.;:!?]\s+')
+
+
+def _boundaries(text: str) -> List[int]:
+    """Start offsets of paragraphs, headings and numbered clauses"""
+    starts = {0}
+    starts.update(match.end() for match in _PARAGRAPH.finditer(text))
+    starts.update(match.start() for match in _HEADING_OR_CLAUSE.finditer(text))
+    return sorted(start for start in starts if start < len(text))
+
+
+def _cut_long(text: str, start: int, end: int) -> List[Tuple[int, int]]:
+    """Cut text[start:end] after content-defined sentence ends"""
+    pieces = []
+    piece_start = sentence_start = start
+    for match in _SENTENCE_END.finditer(text, start, end):
+        cut = match.end()
+        sentence = text[sentence_start:cut]
+        sentence_start = cut
+        size = cut - piece_start
+        if size >= MAX_SECTION or (
+            size >= _CUT_AFTER and zlib.crc32(sentence.encode()) & _CUT_MASK == 0
+        ):
+            pieces.append((piece_start, cut))
+            piece_start = cut
+    if piece_start < end:
+        pieces.append((piece_start, end))
+    return pieces
+
+
+def split_sections(text: str) -> List[Tuple[int, int]]:
+    """
+    Cut text into sections.
+
+    Args:
+        text: Document text
+
+    Returns:
+        Contiguous (start, end) offsets covering the whole text
+    """
+    starts = _boundaries(text)
+    spans = []
+    pending = None  # start of a short section waiting to join the next
+    for index, start in enumerate(starts):
+        end = starts[index + 1] if index + 1 < len(starts) else len(text)
+        if pending is not None:
+            start, pending = pending, None
+        if end - start < MIN_SECTION and index + 1 < len(starts):
+            pending = start
+            continue
+        if end - start > MAX_SECTION:
+            spans.extend(_cut_long(text, start, end))
+        else:
+            spans.append((start, end))
+    return spans
+
+
+def _section_hash(section: str) -> str:
+    return hashlib.sha256(section.encode()).hexdigest()
+
+
+def section_index(text: str) -> List[Dict]:
+    """
+    Build the section index of a document.
+
+    Args:
+        text: Document text
+
+    Returns:
+        [{"hash": sha256 of the stripped section, "start", "end"}, ...]
+    """
+    return [
+        {"hash": _section_hash(text[start:end].strip()), "start": start, "end": end}
+        for start, end in split_sections(text)
+    ]
+
+
+def _append(opcodes: List[Opcode], opcode: Opcode) -> None:
+    """Append, merging consecutive equal runs"""
+    tag, i1, i2, j1, j2 = opcode
+    if tag == 'equal' and opcodes and opcodes[-1][0] == 'equal':
+        _, pi1, _, pj1, _ = opcodes.pop()
+        opcode = ('equal', pi1, i2, pj1, j2)
+    opcodes.append(opcode)
+
+
+def diff_sections(
+    old_text: str,
+    new_text: str,
+    old_index: Optional[List[Dict]] = None,
+    new_index: Optional[List[Dict]] = None,
+    max_cost: int = DEFAULT_MAX_COST,
+) -> LineDiff:
+    """
+    Diff two documents, skipping sections whose hashes match.
+
+    Unchanged sections appear in the result as single equal segments;
+    changed sections are split into lines / sentences and diffed with
+    utils.line_diff.
+
+    Args:
+        old_text: Previous text
+        new_text: Current text
+        old_index: section_index(old_text), e.g. stored with the previous
+            snapshot (computed if omitted)
+        new_index: section_index(new_text) (computed if omitted)
+        max_cost: Myers edit budget, see diff_lines
+
+    Returns:
+        LineDiff over section / segment lists
+    """
+    if old_index is None:
+        old_index = section_index(old_text)
+    if new_index is None:
+        new_index = section_index(new_text)
+
+    def section_text(text: str, section: Dict) -> str:
+        return text[section["start"]:section["end"]].strip()
+
+    by_hash = diff_lines([s["hash"] for s in old_index], [s["hash"] for s in new_index])
+
+    old: List[str] = []
+    new: List[str] = []
+    opcodes: List[Opcode] = []
+    for tag, i1, i2, j1, j2 in by_hash.opcodes:
+        if tag == 'equal':
+            # Same hash, same text: no need to look inside
+            sections = [section_text(old_text, s) for s in old_index[i1:i2]]
+            _append(opcodes, ('equal', len(old), len(old) + len(sections),
+                              len(new), len(new) + len(sections)))
+            old.extend(sections)
+            new.extend(sections)
+            continue
+
+        old_segments = [segment for s in old_index[i1:i2]
+                        for segment in split_segments(section_text(old_text, s))]
+        new_segments = [segment for s in new_index[j1:j2]
+                        for segment in split_segments(section_text(new_text, s))]
+        sub = diff_lines(old_segments, new_segments, max_cost)
+        for sub_tag, si1, si2, sj1, sj2 in sub.opcodes:
+            _append(opcodes, (sub_tag, len(old) + si1, len(old) + si2,
+                              len(new) + sj1, len(new) + sj2))
+        old.extend(old_segments)
+        new.extend(new_segments)
+
+    return LineDiff(old, new, opcodes)
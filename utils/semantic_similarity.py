@@ -4,7 +4,8 @@ Production-ready implementation with caching and optimization.
 """
 
 import hashlib
-from typing import List, Tuple
+import re
+from typing import Dict, List, Tuple
 import numpy as np
 
 # Try to import sentence transformers, fall back to Jaccard if not available
@@ -16,6 +17,32 @@ except ImportError:
     print("[WARNING] sentence-transformers not installed. Using Jaccard similarity.")
     print("[INFO] Install with: pip install sentence-transformers torch")
 
+# all-MiniLM-L6-v2 reads 256 word pieces; ~1000 chars of English stays under
+CHUNK_WINDOW_CHARS = 1000
+_SENTENCE_END = re.compile(r'(?<=[.;:!?])\s+')
+
+
+def _windows(text: str) -> List[str]:
+    """Split text into sentence windows of at most CHUNK_WINDOW_CHARS"""
+    if len(text) <= CHUNK_WINDOW_CHARS:
+        return [text]
+    windows, current = [], ""
+    for sentence in _SENTENCE_END.split(text):
+        while len(sentence) > CHUNK_WINDOW_CHARS:
+            if current:
+                windows.append(current)
+                current = ""
+            windows.append(sentence[:CHUNK_WINDOW_CHARS])
+            sentence = sentence[CHUNK_WINDOW_CHARS:]
+        if current and len(current) + 1 + len(sentence) > CHUNK_WINDOW_CHARS:
+            windows.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        windows.append(current)
+    return windows
+
 
 class SemanticSimilarityEngine:
     """
@@ -74,6 +101,56 @@ class SemanticSimilarityEngine:
         
         return embedding
     
+    def embed_chunks(self, chunks: Dict[str, str], cache=None) -> Dict[str, np.ndarray]:
+        """
+        Embed document chunks (sections), reusing cached vectors.
+
+        Chunks longer than the model's input window would be silently
+        truncated, so they are split into sentence windows of at most
+        CHUNK_WINDOW_CHARS, embedded in the same batch and averaged.
+
+        Args:
+            chunks: chunk hash (sha256 of the text) -> chunk text
+            cache: Optional utils.embedding_cache.EmbeddingCache
+
+        Returns:
+            chunk hash -> unit-length float32 vector
+        """
+        keys = {chunk_hash: f"{self.model_name}:{chunk_hash}" for chunk_hash in chunks}
+        cached = cache.get_many(keys.values()) if cache is not None else {}
+
+        vectors: Dict[str, np.ndarray] = {
+            chunk_hash: np.frombuffer(cached[key], dtype=np.float32)
+            for chunk_hash, key in keys.items() if key in cached
+        }
+        todo = [chunk_hash for chunk_hash in chunks if chunk_hash not in vectors]
+        if not todo:
+            return vectors
+
+        windows: List[str] = []
+        owners: List[int] = []
+        for index, chunk_hash in enumerate(todo):
+            for window in _windows(chunks[chunk_hash]):
+                windows.append(window)
+                owners.append(index)
+
+        if self.model:
+            encoded = self.model.encode(windows, convert_to_numpy=True)
+        else:
+            encoded = np.array([self._simple_embedding(window) for window in windows])
+
+        sums = np.zeros((len(todo), encoded.shape[1]), dtype=np.float32)
+        np.add.at(sums, owners, encoded.astype(np.float32))
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        sums /= np.where(norms == 0, 1, norms)
+
+        new_vectors = {chunk_hash: sums[index] for index, chunk_hash in enumerate(todo)}
+        vectors.update(new_vectors)
+        if cache is not None:
+            cache.put_many({keys[chunk_hash]: vector.tobytes() for chunk_hash, vector in new_vectors.items()})
+
+        return vectors
+
     def _simple_embedding(self, text: str) -> np.ndarray:
         """Fallback: simple word-count based embedding"""
         words = text.lower().split()
@@ -0,0 +1,160 @@
+"""
+Key-value cache: an in-memory LRU in front of an optional SQLite table.
+
+Used for derived data that is expensive to recompute and keyed by a
+content hash (PDF page text, section embeddings), so entries never go
+stale and a restart or another process can reuse them. Both layers are
+bounded: the SQLite table keeps at most max_rows entries, dropping the
+least recently used ones.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteLRUCache:
+    """
+    key -> value.
+
+    Keeps an in-memory LRU of recent entries; when a path is given, entries
+    are also written to a SQLite file so the cache survives restarts and is
+    shared by worker processes. Subclasses name the table and its columns.
+
+    Each row records when it was last written or read from disk. Once the
+    table grows past max_rows, the least recently used rows are deleted
+    down to prune_to (90% of max_rows) so pruning runs once per batch of
+    puts, not on every put.
+    """
+
+    table = "cache"
+    key_column = "key"
+    value_column = "value"
+    value_type = "BLOB"
+    label = "Cache"
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 20000, max_rows: int = 200000):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.prune_to = max(1, int(max_rows * 0.9))
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._rows = 0  # upper bound on the table size since the last count
+
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+            self._db.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                f"{self.key_column} TEXT PRIMARY KEY, {self.value_column} {self.value_type} NOT NULL, "
+                f"last_used REAL NOT NULL DEFAULT 0)"
+            )
+            columns = {row[1] for row in self._db.execute(f"PRAGMA table_info({self.table})")}
+            if 'last_used' not in columns:
+                # Table written before disk eviction existed
+                self._db.execute(f"ALTER TABLE {self.table} ADD COLUMN last_used REAL NOT NULL DEFAULT 0")
+            self._db.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.table}_last_used ON {self.table} (last_used)"
+            )
+            self._db.commit()
+            self._rows = self._count()
+            logger.info(f"{self.label}: {path}")
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Look up several keys.
+
+        Returns:
+            Dict of key -> value for the keys that were cached
+        """
+        found: Dict[str, Any] = {}
+        missing = []
+
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+                else:
+                    missing.append(key)
+
+            if self._db is not None and missing:
+                hits = []
+                for start in range(0, len(missing), 500):
+                    batch = missing[start:start + 500]
+                    placeholders = ','.join('?' * len(batch))
+                    rows = self._db.execute(
+                        f"SELECT {self.key_column}, {self.value_column} FROM {self.table} "
+                        f"WHERE {self.key_column} IN ({placeholders})",
+                        batch,
+                    ).fetchall()
+                    for key, value in rows:
+                        found[key] = value
+                        hits.append(key)
+                        self._remember(key, value)
+
+                if hits:
+                    now = time.time()
+                    self._db.executemany(
+                        f"UPDATE {self.table} SET last_used = ? WHERE {self.key_column} = ?",
+                        ((now, key) for key in hits),
+                    )
+                    self._db.commit()
+
+        return found
+
+    def put_many(self, values: Dict[str, Any]) -> None:
+        """Store values for several keys"""
+        if not values:
+            return
+
+        with self._lock:
+            for key, value in values.items():
+                self._remember(key, value)
+
+            if self._db is not None:
+                now = time.time()
+                self._db.executemany(
+                    f"INSERT OR REPLACE INTO {self.table} "
+                    f"({self.key_column}, {self.value_column}, last_used) VALUES (?, ?, ?)",
+                    ((key, value, now) for key, value in values.items()),
+                )
+                self._rows += len(values)
+                if self._rows > self.max_rows:
+                    self._prune()
+                self._db.commit()
+
+    def _prune(self) -> None:
+        """Delete least recently used rows down to prune_to (caller holds the lock)"""
+        self._rows = self._count()
+        excess = self._rows - self.prune_to
+        if excess > 0 and self._rows > self.max_rows:
+            self._db.execute(
+                f"DELETE FROM {self.table} WHERE {self.key_column} IN ("
+                f"SELECT {self.key_column} FROM {self.table} ORDER BY last_used, rowid LIMIT ?)",
+                (excess,),
+            )
+            self._rows -= excess
+            logger.info(f"{self.label}: evicted {excess} rows")
+
+    def _count(self) -> int:
+        return self._db.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def _remember(self, key: str, value: Any) -> None:
+        """Add to the in-memory LRU (caller holds the lock)"""
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._memory)
@@ -0,0 +1,238 @@
+"""
+Per-domain cache for Agent 2's DNS, certificate and domain-reputation checks.
+
+Dozens of snapshots share a handful of regulator domains, and these checks
+depend only on the domain, so each one runs once per TTL instead of once
+per snapshot. Failures are cached too, for a shorter negative TTL, so an
+unreachable domain is not retried for every snapshot in a batch.
+
+Every entry for a domain is dropped when its certificate fingerprint
+changes (observe_certificate), so a re-keyed or swapped certificate is
+re-verified right away.
+
+get_or_check is single-flight per process: when several threads miss on
+the same (check, domain) at once, one runs the check and the others wait
+for its result.
+
+Backends:
+- InMemoryVerificationCache: one agent process
+- RedisVerificationCache: shared by several agent workers
+"""
+
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DNS = "dns"
+CERTIFICATE = "cert"
+REPUTATION = "reputation"
+KINDS = (DNS, CERTIFICATE, REPUTATION)
+
+DEFAULT_TTLS = {
+    DNS: 300,
+    CERTIFICATE: 3600,
+    REPUTATION: 86400,
+}
+DEFAULT_NEGATIVE_TTL = 60
+
+_FINGERPRINT = "fingerprint"
+
+
+class VerificationCache(ABC):
+    """TTL cache of check results, keyed by (check kind, domain)"""
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+    ):
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.negative_ttl = negative_ttl
+        self._inflight: Dict[str, threading.Lock] = {}
+        self._inflight_lock = threading.Lock()
+
+    @abstractmethod
+    def _load(self, key: str) -> Optional[str]:
+        """Raw value for key, or None if missing or expired"""
+
+    @abstractmethod
+    def _store(self, key: str, value: str, ttl: Optional[float]) -> None:
+        """Store value under key (ttl None = no expiry)"""
+
+    @abstractmethod
+    def _delete(self, keys: Iterable[str]) -> None:
+        """Remove keys"""
+
+    @staticmethod
+    def _key(kind: str, domain: str) -> str:
+        return f"{kind}:{domain.lower()}"
+
+    def get(self, kind: str, domain: str) -> Optional[Dict]:
+        """Cached result of a check, or None"""
+        raw = self._load(self._key(kind, domain))
+        return json.loads(raw) if raw is not None else None
+
+    def put(self, kind: str, domain: str, result: Dict, ok: bool = True) -> None:
+        """Cache a check result; failed checks (ok=False) use the negative TTL"""
+        ttl = self.ttls[kind] if ok else self.negative_ttl
+        self._store(self._key(kind, domain), json.dumps(result), ttl)
+
+    def get_or_check(
+        self,
+        kind: str,
+        domain: str,
+        check: Callable[[], Dict],
+        ok: Callable[[Dict], bool] = lambda result: result.get("valid", True),
+    ) -> Dict:
+        """Cached result, or run check() and cache what it returns"""
+        cached = self.get(kind, domain)
+        if cached is not None:
+            return cached
+
+        key = self._key(kind, domain)
+        with self._inflight_lock:
+            lock = self._inflight.setdefault(key, threading.Lock())
+        with lock:
+            # Another thread may have run the check while this one waited
+            cached = self.get(kind, domain)
+            if cached is not None:
+                return cached
+            result = check()
+            self.put(kind, domain, result, ok=ok(result))
+            return result
+
+    def invalidate(self, domain: str) -> None:
+        """Drop every cached check for a domain"""
+        self._delete(self._key(kind, domain) for kind in KINDS)
+
+    def observe_certificate(self, domain: str, fingerprint: Optional[str]) -> bool:
+        """
+        Record the certificate a domain presented.
+
+        Returns:
+            True if it differs from the one seen before (the domain's cached
+            checks were invalidated)
+        """
+        if not fingerprint:
+            return False
+        key = self._key(_FINGERPRINT, domain)
+        known = self._load(key)
+        if known == fingerprint:
+            return False
+
+        self._store(key, fingerprint, None)
+        if known is None:
+            return False
+        logger.info(f"Certificate changed for {domain}; dropping cached checks")
+        self.invalidate(domain)
+        return True
+
+
+class InMemoryVerificationCache(VerificationCache):
+    """Process-local cache"""
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__(ttls, negative_ttl)
+        self._entries: Dict[str, Tuple[str, Optional[float]]] = {}
+        self._lock = threading.Lock()
+        self._clock = clock
+
+    def _load(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires is not None and expires <= self._clock():
+                del self._entries[key]
+                return None
+            return value
+
+    def _store(self, key: str, value: str, ttl: Optional[float]) -> None:
+        expires = self._clock() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires)
+
+    def _delete(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+
+class RedisVerificationCache(VerificationCache):
+    """Redis-backed cache; expiry is left to Redis (SET ... PX)"""
+
+    def __init__(
+        self,
+        redis_host: str = "localhost",
+        redis_port: int = 6379,
+        redis_password: Optional[str] = None,
+        redis_db: int = 0,
+        prefix: str = "seraphs:verify",
+        ttls: Optional[Dict[str, float]] = None,
+        negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+    ):
+        super().__init__(ttls, negative_ttl)
+        import redis
+
+        self.redis_client = redis.Redis(
+            host=redis_host,
+            port=redis_port,
+            password=redis_password,
+            db=redis_db,
+            decode_responses=True,
+        )
+        self.prefix = prefix
+        logger.info(f"Verification cache: redis {redis_host}:{redis_port} prefix={prefix}")
+
+    def _load(self, key: str) -> Optional[str]:
+        return self.redis_client.get(f"{self.prefix}:{key}")
+
+    def _store(self, key: str, value: str, ttl: Optional[float]) -> None:
+        px = int(ttl * 1000) if ttl is not None else None
+        self.redis_client.set(f"{self.prefix}:{key}", value, px=px)
+
+    def _delete(self, keys: Iterable[str]) -> None:
+        keys = [f"{self.prefix}:{key}" for key in keys]
+        if keys:
+            self.redis_client.delete(*keys)
+
+
+def create_verification_cache(settings: Dict) -> VerificationCache:
+    """
+    Build the cache selected by sources.yaml settings.
+
+    settings.verification_cache_backend: memory (default) | redis
+    settings.verification_cache_ttls: seconds per check kind (dns, cert,
+        reputation); defaults in DEFAULT_TTLS
+    settings.verification_cache_negative_ttl: seconds for failed checks
+    Redis connection details come from utils.config (REDIS_* env vars).
+    """
+    backend = settings.get('verification_cache_backend', 'memory')
+    ttls = settings.get('verification_cache_ttls')
+    negative_ttl = settings.get('verification_cache_negative_ttl', DEFAULT_NEGATIVE_TTL)
+
+    if backend == 'memory':
+        return InMemoryVerificationCache(ttls, negative_ttl)
+    if backend == 'redis':
+        from utils.config import config
+        return RedisVerificationCache(
+            redis_host=config.redis.host,
+            redis_port=config.redis.port,
+            redis_password=config.redis.password,
+            redis_db=config.redis.db,
+            ttls=ttls,
+            negative_ttl=negative_ttl,
+        )
+
+    raise ValueError(f"Unknown verification cache backend: {backend}")
@@ -0,0 +1,307 @@
+"""
+Delta-compressed version history of regulatory texts for Agent 3.
+
+Agent 3 compares every snapshot with the previous version of the same
+source. Storing every version in full makes storage grow with
+(document size x number of versions), although most versions differ from
+the last by a clause or two.
+
+Per source this store keeps:
+- the head: the latest version as full text, so the previous version for
+  the next diff is a single read
+- older versions as reverse deltas (version k from version k + 1), so
+  storage grows with the amount of change
+- every keyframe_interval-th version as a full keyframe, so rebuilding
+  any version applies at most keyframe_interval - 1 deltas
+
+Deltas are made with utils.line_diff over lines / sentences (kept with
+their separators, so reconstruction is exact) and are lists of
+[start, end] copies from the newer text and literal inserted strings.
+Payloads are zlib-compressed.
+
+Backends:
+- SQLiteVersionHistory: local deployments (persistent)
+- InMemoryVersionHistory: tests and throwaway runs
+"""
+
+import json
+import logging
+import re
+import sqlite3
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from pydantic import BaseModel
+
+from utils.line_diff import diff_lines
+
+logger = logging.getLogger(__name__)
+
+KEYFRAME = 'key'
+DELTA = 'delta'
+
+Delta = List[Union[List[int], str]]
+
+# Split after newlines and after sentence punctuation + whitespace;
+# separators stay attached so ''.join(tokens) == text
+_TOKEN = re.compile(r'(?<=\n)|(?<=[.;:!?]\s)')
+
+
+def _tokens(text: str) -> List[str]:
+    return [token for token in _TOKEN.split(text) if token]
+
+
+def make_delta(source: str, target: str) -> Delta:
+    """
+    Delta that rebuilds target from source.
+
+    Returns:
+        List of [start, end] (copy source[start:end]) and str (insert)
+    """
+    src, tgt = _tokens(source), _tokens(target)
+    offsets = [0]
+    for token in src:
+        offsets.append(offsets[-1] + len(token))
+
+    delta: Delta = []
+    for tag, i1, i2, j1, j2 in diff_lines(src, tgt).opcodes:
+        if tag == 'equal':
+            delta.append([offsets[i1], offsets[i2]])
+        elif tag in ('insert', 'replace'):
+            delta.append(''.join(tgt[j1:j2]))
+    return delta
+
+
+def apply_delta(source: str, delta: Delta) -> str:
+    """Rebuild the target text of make_delta(source, target)"""
+    return ''.join(op if isinstance(op, str) else source[op[0]:op[1]] for op in delta)
+
+
+def _pack(value: Any) -> bytes:
+    return zlib.compress(json.dumps(value, separators=(',', ':'), default=str).encode())
+
+
+def _unpack(payload: bytes) -> Any:
+    return json.loads(zlib.decompress(payload))
+
+
+class StoredVersion(BaseModel):
+    """One version of one source"""
+    source_id: str
+    version: int  # 0 for the first version stored
+    text: str
+    meta: Dict[str, Any] = {}  # snapshot fields stored with the text (snapshot_id, sha256, ...)
+
+
+class VersionHistory(ABC):
+    """
+    Versions per source: full head, reverse deltas, periodic keyframes.
+
+    Backends store two kinds of record:
+    - head (source_id -> version, packed text, packed meta)
+    - row (source_id, version -> kind, packed payload, packed meta)
+    """
+
+    def __init__(self, keyframe_interval: int = 16):
+        """
+        Args:
+            keyframe_interval: Every this many versions is kept in full;
+                bounds the deltas applied to rebuild a version
+        """
+        if keyframe_interval < 1:
+            raise ValueError("keyframe_interval must be >= 1")
+        self.keyframe_interval = keyframe_interval
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def _get_head(self, source_id: str) -> Optional[Tuple[int, bytes, bytes]]:
+        """(version, packed text, packed meta) of the latest version"""
+
+    @abstractmethod
+    def _get_row(self, source_id: str, version: int) -> Optional[Tuple[str, bytes, bytes]]:
+        """(kind, packed payload, packed meta) of an older version"""
+
+    @abstractmethod
+    def _commit(self, source_id: str, head: Tuple[int, bytes, bytes],
+                row: Optional[Tuple[int, str, bytes, bytes]]) -> None:
+        """Atomically replace the head and add the row for the previous head"""
+
+    def append(self, source_id: str, text: str, meta: Optional[Dict] = None) -> int:
+        """
+        Store a new latest version.
+
+        The current head becomes a reverse delta against the new text, or
+        a keyframe every keyframe_interval versions.
+
+        Args:
+            source_id: Source the text belongs to
+            text: Full text of the new version
+            meta: JSON-serializable snapshot fields kept with it
+
+        Returns:
+            Version number of the new version
+        """
+        new_head_meta = _pack(meta or {})
+        with self._lock:
+            head = self._get_head(source_id)
+            if head is None:
+                self._commit(source_id, (0, _pack(text), new_head_meta), None)
+                return 0
+
+            version, packed_text, packed_meta = head
+            if version % self.keyframe_interval == 0:
+                row = (version, KEYFRAME, packed_text, packed_meta)
+            else:
+                previous = _unpack(packed_text)
+                row = (version, DELTA, _pack(make_delta(text, previous)), packed_meta)
+            self._commit(source_id, (version + 1, _pack(text), new_head_meta), row)
+            return version + 1
+
+    def latest(self, source_id: str) -> Optional[StoredVersion]:
+        """Latest version of a source (one read), None if never stored"""
+        head = self._get_head(source_id)
+        if head is None:
+            return None
+        version, packed_text, packed_meta = head
+        return StoredVersion(
+            source_id=source_id, version=version,
+            text=_unpack(packed_text), meta=_unpack(packed_meta),
+        )
+
+    def get(self, source_id: str, version: int) -> Optional[StoredVersion]:
+        """
+        Rebuild any stored version.
+
+        Reads rows upwards from `version` until a keyframe or the head,
+        then applies the reverse deltas back down (at most
+        keyframe_interval - 1 of them).
+        """
+        with self._lock:
+            head = self._get_head(source_id)
+            if head is None or not 0 <= version <= head[0]:
+                return None
+            if version == head[0]:
+                return StoredVersion(source_id=source_id, version=version,
+                                     text=_unpack(head[1]), meta=_unpack(head[2]))
+
+            deltas = []
+            meta = None
+            current = version
+            while True:
+                if current == head[0]:
+                    text = _unpack(head[1])
+                    break
+                kind, payload, packed_meta = self._get_row(source_id, current)
+                if meta is None:
+                    meta = _unpack(packed_meta)
+                if kind == KEYFRAME:
+                    text = _unpack(payload)
+                    break
+                deltas.append(_unpack(payload))
+                current += 1
+
+        for delta in reversed(deltas):
+            text = apply_delta(text, delta)
+        return StoredVersion(source_id=source_id, version=version, text=text, meta=meta)
+
+    def version_count(self, source_id: str) -> int:
+        """Number of versions stored for a source"""
+        head = self._get_head(source_id)
+        return head[0] + 1 if head else 0
+
+
+class InMemoryVersionHistory(VersionHistory):
+    """Process-local history (lost on restart)"""
+
+    def __init__(self, keyframe_interval: int = 16):
+        super().__init__(keyframe_interval)
+        self._heads: Dict[str, Tuple[int, bytes, bytes]] = {}
+        self._rows: Dict[Tuple[str, int], Tuple[str, bytes, bytes]] = {}
+
+    def _get_head(self, source_id):
+        return self._heads.get(source_id)
+
+    def _get_row(self, source_id, version):
+        return self._rows.get((source_id, version))
+
+    def _commit(self, source_id, head, row):
+        if row is not None:
+            version, kind, payload, meta = row
+            self._rows[(source_id, version)] = (kind, payload, meta)
+        self._heads[source_id] = head
+
+
+class SQLiteVersionHistory(VersionHistory):
+    """SQLite-backed history; one head row per source plus one row per older version"""
+
+    def __init__(self, path: str = "data/version_history.db", keyframe_interval: int = 16):
+        super().__init__(keyframe_interval)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._db_lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS version_head ("
+            "source_id TEXT PRIMARY KEY, version INTEGER NOT NULL, "
+            "text BLOB NOT NULL, meta BLOB NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS version_history ("
+            "source_id TEXT NOT NULL, version INTEGER NOT NULL, kind TEXT NOT NULL, "
+            "payload BLOB NOT NULL, meta BLOB NOT NULL, PRIMARY KEY (source_id, version))"
+        )
+        self._db.commit()
+        logger.info(f"Version history: sqlite {path} (keyframe every {keyframe_interval})")
+
+    def _get_head(self, source_id):
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT version, text, meta FROM version_head WHERE source_id = ?", (source_id,)
+            ).fetchone()
+        return tuple(row) if row else None
+
+    def _get_row(self, source_id, version):
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT kind, payload, meta FROM version_history WHERE source_id = ? AND version = ?",
+                (source_id, version),
+            ).fetchone()
+        return tuple(row) if row else None
+
+    def _commit(self, source_id, head, row):
+        with self._db_lock, self._db:
+            if row is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO version_history "
+                    "(source_id, version, kind, payload, meta) VALUES (?, ?, ?, ?, ?)",
+                    (source_id, *row),
+                )
+            self._db.execute(
+                "INSERT OR REPLACE INTO version_head (source_id, version, text, meta) "
+                "VALUES (?, ?, ?, ?)",
+                (source_id, *head),
+            )
+
+
+def create_version_history(settings: Dict) -> VersionHistory:
+    """
+    Build the history selected by sources.yaml settings.
+
+    settings.version_history_backend: sqlite (default) | memory
+    settings.version_history_path: SQLite file path
+    settings.version_history_keyframe_interval: default 16
+    """
+    backend = settings.get('version_history_backend', 'sqlite')
+    interval = settings.get('version_history_keyframe_interval', 16)
+
+    if backend == 'sqlite':
+        return SQLiteVersionHistory(
+            settings.get('version_history_path', 'data/version_history.db'), interval
+        )
+    if backend == 'memory':
+        return InMemoryVersionHistory(interval)
+
+    raise ValueError(f"Unknown version history backend: {backend}")
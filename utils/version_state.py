@@ -0,0 +1,180 @@
+"""
+Durable per-source version state for Agent 1.
+
+Keeps, for every regulatory source, the hash of the last published snapshot,
+the HTTP validators (ETag / Last-Modified) that came with it, when it was
+fetched and, for feeds, the items already published. Without this, every
+restart treats every source as a new version and re-triggers diff, LLM
+extraction and MAAD debate for unchanged documents.
+
+Backends:
+- SQLiteVersionStateStore: single worker / local deployments
+- RedisVersionStateStore: shared by several agent workers
+- InMemoryVersionStateStore: tests and throwaway runs
+"""
+
+import logging
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class VersionState(BaseModel):
+    """Last known version of one source"""
+    source_id: str
+    url: Optional[str] = None
+    last_hash: Optional[str] = None  # sha256 of the full snapshot body
+    region_hash: Optional[str] = None  # HTML: sha256 of the listing region
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: Optional[datetime] = None
+    seen_items: Dict[str, str] = {}  # RSS: item guid -> sha256 of item text
+
+    def validators(self) -> Dict[str, str]:
+        """HTTP validators for a conditional GET (only the ones known)"""
+        validators = {}
+        if self.etag:
+            validators['etag'] = self.etag
+        if self.last_modified:
+            validators['last_modified'] = self.last_modified
+        return validators
+
+
+class VersionStateStore(ABC):
+    """Storage backend for VersionState records, keyed by source_id"""
+
+    @abstractmethod
+    def get(self, source_id: str) -> Optional[VersionState]:
+        """Load the state for a source (None if never seen)"""
+
+    @abstractmethod
+    def put(self, state: VersionState) -> None:
+        """Insert or replace the state for state.source_id"""
+
+    @abstractmethod
+    def delete(self, source_id: str) -> None:
+        """Forget a source, so its next fetch counts as a first fetch"""
+
+
+class InMemoryVersionStateStore(VersionStateStore):
+    """Process-local store (state is lost on restart)"""
+
+    def __init__(self):
+        self._states: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def get(self, source_id: str) -> Optional[VersionState]:
+        with self._lock:
+            raw = self._states.get(source_id)
+        return VersionState.model_validate_json(raw) if raw else None
+
+    def put(self, state: VersionState) -> None:
+        with self._lock:
+            self._states[state.source_id] = state.model_dump_json()
+
+    def delete(self, source_id: str) -> None:
+        with self._lock:
+            self._states.pop(source_id, None)
+
+
+class SQLiteVersionStateStore(VersionStateStore):
+    """SQLite-backed store; one row per source holding the JSON record"""
+
+    def __init__(self, path: str = "data/version_state.db"):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS version_state ("
+            "source_id TEXT PRIMARY KEY, state TEXT NOT NULL)"
+        )
+        self._db.commit()
+        logger.info(f"Version state store: sqlite {path}")
+
+    def get(self, source_id: str) -> Optional[VersionState]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT state FROM version_state WHERE source_id = ?", (source_id,)
+            ).fetchone()
+        return VersionState.model_validate_json(row[0]) if row else None
+
+    def put(self, state: VersionState) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO version_state (source_id, state) VALUES (?, ?)",
+                (state.source_id, state.model_dump_json()),
+            )
+            self._db.commit()
+
+    def delete(self, source_id: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM version_state WHERE source_id = ?", (source_id,))
+            self._db.commit()
+
+
+class RedisVersionStateStore(VersionStateStore):
+    """Redis-backed store; one hash field per source under a single key"""
+
+    def __init__(
+        self,
+        redis_host: str = "localhost",
+        redis_port: int = 6379,
+        redis_password: Optional[str] = None,
+        redis_db: int = 0,
+        key: str = "seraphs:version_state",
+    ):
+        import redis
+
+        self.redis_client = redis.Redis(
+            host=redis_host,
+            port=redis_port,
+            password=redis_password,
+            db=redis_db,
+            decode_responses=True,
+        )
+        self.key = key
+        logger.info(f"Version state store: redis {redis_host}:{redis_port} key={key}")
+
+    def get(self, source_id: str) -> Optional[VersionState]:
+        raw = self.redis_client.hget(self.key, source_id)
+        return VersionState.model_validate_json(raw) if raw else None
+
+    def put(self, state: VersionState) -> None:
+        self.redis_client.hset(self.key, state.source_id, state.model_dump_json())
+
+    def delete(self, source_id: str) -> None:
+        self.redis_client.hdel(self.key, source_id)
+
+
+def create_version_state_store(settings: Dict) -> VersionStateStore:
+    """
+    Build the store selected by sources.yaml settings.
+
+    settings.version_state_backend: sqlite (default) | redis | memory
+    settings.version_state_path: SQLite file path
+    Redis connection details come from utils.config (REDIS_* env vars).
+    """
+    backend = settings.get('version_state_backend', 'sqlite')
+
+    if backend == 'sqlite':
+        return SQLiteVersionStateStore(settings.get('version_state_path', 'data/version_state.db'))
+    if backend == 'redis':
+        from utils.config import config
+        return RedisVersionStateStore(
+            redis_host=config.redis.host,
+            redis_port=config.redis.port,
+            redis_password=config.redis.password,
+            redis_db=config.redis.db,
+        )
+    if backend == 'memory':
+        return InMemoryVersionStateStore()
+
+    raise ValueError(f"Unknown version state backend: {backend}")